@@ -0,0 +1,333 @@
+"""
+Benchmark harness for the certificate pipelines.
+
+Generates a corpus of synthetic certificates, starts a stub Ollama server, runs each
+stage over the corpus and prints (or writes) a JSON report with p50/p95/p99 latency,
+throughput, peak RSS and per-stage breakdowns. Stages share one process, so a stage's
+peak_rss_mb_cumulative is the high-water mark of everything run so far, not of that
+stage alone; run a single stage (--stages) to measure it in isolation. Stages whose dependencies are missing
+are reported as skipped.
+
+    python -m benchmarks.run --images 40 --latency-ms 200 --out bench.json
+    python -m benchmarks.run --stages cipher,app_ocr --compare bench.json
+
+Stages: classify, main_ocr, main_llm, app_ocr, doctr, doctr_batched, extractor_llm, cipher
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from benchmarks.stub_ollama import StubOllama
+from benchmarks.synthetic import generate_corpus
+
+SAMPLE_OCR_TEXT = (
+    "VISVESVARAYA TECHNOLOGICAL UNIVERSITY\nCERTIFICATE\nThis is to certify that\nPraveen Kumar\n"
+    "has successfully completed the Bachelor of Engineering\nwith a CGPA of 9.20\n"
+    "Roll No: 1MS19CS001\nCertificate No: 34254435435\nDate of Issue: 01-01-2024\nRegistrar"
+)
+
+ALL_STAGES = ["classify", "main_ocr", "main_llm", "app_ocr", "doctr", "doctr_batched", "extractor_llm", "cipher"]
+
+
+# ---------------- Measurement helpers ----------------
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def summarize(latencies: list, wall: float, breakdown: dict = None) -> dict:
+    xs = sorted(latencies)
+    n = len(xs)
+
+    def pct(p):
+        return round(xs[min(n - 1, int(round(p / 100.0 * (n - 1))))] * 1000, 3)
+
+    report = {
+        "count": n,
+        "mean_ms": round(sum(xs) / n * 1000, 3),
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+        "max_ms": round(xs[-1] * 1000, 3),
+        "wall_s": round(wall, 3),
+        "items_per_sec": round(n / wall, 3) if wall > 0 else None,
+        "peak_rss_mb_cumulative": peak_rss_mb(),
+    }
+    if breakdown:
+        report["breakdown_mean_ms"] = {
+            stage: round(sum(values) / len(values) * 1000, 3) for stage, values in breakdown.items()
+        }
+    return report
+
+
+def timed(func, items, setup=None):
+    """Time func over items; `setup` runs before each call, outside the measurement."""
+    latencies = []
+    start = time.perf_counter()
+    for item in items:
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        func(item)
+        latencies.append(time.perf_counter() - t0)
+    return latencies, time.perf_counter() - start
+
+
+async def timed_async(coro_func, items, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(item):
+        async with semaphore:
+            t0 = time.perf_counter()
+            await coro_func(item)
+            latencies.append(time.perf_counter() - t0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(item) for item in items))
+    return latencies, time.perf_counter() - start
+
+
+# ---------------- Stages ----------------
+def bench_classify(paths, args):
+    import main
+
+    images = [open(p, "rb").read() for p in paths]
+    main.result_cache.clear()
+
+    async def run():
+        try:
+            return await timed_async(main.classify_certificate, images, args.concurrency)
+        finally:
+            await main.ollama_client.aclose()
+
+    return summarize(*asyncio.run(run()))
+
+
+def bench_main_ocr(paths, args):
+    import main
+
+    images = [open(p, "rb").read() for p in paths]
+    return summarize(*timed(main.ocr_image_bytes, images))
+
+
+def bench_main_llm(paths, args):
+    import main
+
+    text = SAMPLE_OCR_TEXT
+
+    async def run():
+        try:
+            return await timed_async(lambda _: main.call_ollama_text_model(text), range(len(paths)),
+                                     args.concurrency)
+        finally:
+            await main.ollama_client.aclose()
+
+    return summarize(*asyncio.run(run()))
+
+
+def bench_app_ocr(paths, args):
+    import pytesseract
+
+    # importing app points tesseract_cmd at a Windows install; don't leak that into later stages
+    tesseract_cmd = pytesseract.pytesseract.tesseract_cmd
+    try:
+        return _bench_app_ocr(paths, args)
+    finally:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+
+def _bench_app_ocr(paths, args):
+    import app
+
+    breakdown = {}
+
+    def one(path):
+        timings = {}
+        app.ocr_image(path, profile=args.profile, timings=timings, debug=False)
+        for stage, seconds in timings.items():
+            breakdown.setdefault(stage, []).append(seconds)
+
+    latencies, wall = timed(one, paths)
+    return summarize(latencies, wall, breakdown)
+
+
+def bench_doctr(paths, args):
+    from src.certificate_data_extraction import CertificateDataExtractor, warm_up
+
+    warm_up()
+    extractor = CertificateDataExtractor()
+    return summarize(*asyncio.run(timed_async(extractor.run_doctr, paths, 1)))
+
+
+def bench_doctr_batched(paths, args):
+    from src.certificate_data_extraction import CertificateDataExtractor, warm_up
+
+    warm_up()
+    extractor = CertificateDataExtractor()
+    return summarize(*asyncio.run(timed_async(extractor.run_doctr, paths, args.concurrency)))
+
+
+def bench_extractor_llm(paths, args):
+    from src.certificate_data_extraction import CertificateDataExtractor
+
+    extractor = CertificateDataExtractor()
+    text = SAMPLE_OCR_TEXT
+    return summarize(*asyncio.run(timed_async(extractor.train_llm, [text] * len(paths), args.concurrency)))
+
+
+def bench_cipher(paths, args):
+    from PIL import Image
+    from src.certificate_security import CertificateCipher
+    from src.certificate_security import certificate_hash
+
+    cipher = CertificateCipher()
+    password = "BenchmarkPassword123!"
+    payload = {"certificate_id": "34254435435", "name": "Praveen", "gpa": "9.2"}
+    images = [open(p, "rb").read() for p in paths]
+    report = {}
+
+    latencies, wall = timed(lambda _: cipher.encrypt(payload, password), range(len(paths)))
+    report["encrypt"] = summarize(latencies, wall)
+    tokens = [cipher.encrypt(payload, password) for _ in range(len(paths))]
+    # "cold" pays the PBKDF2 derivation on every call; "warm" reuses keys derived in a priming pass
+    report["decrypt_cold"] = summarize(*timed(lambda t: cipher.decrypt(t, password), tokens,
+                                              setup=certificate_hash._key_cache.clear))
+    for token in tokens:
+        cipher.decrypt(token, password)
+    report["decrypt_warm"] = summarize(*timed(lambda t: cipher.decrypt(t, password), tokens))
+
+    session = cipher.open_session(password)
+    report["session_encrypt"] = summarize(*timed(session.encrypt_image, images))
+    report["encrypt_image"] = summarize(*timed(lambda b: cipher.encrypt_image(b, password), images))
+    report["encrypt_image_raw"] = summarize(*timed(lambda b: cipher.encrypt_image(b, password, raw=True), images))
+    raw_tokens = [cipher.encrypt_image(b, password, raw=True) for b in images]
+    report["decrypt_image_raw_cold"] = summarize(*timed(lambda t: cipher.decrypt_image(t, password), raw_tokens,
+                                                        setup=certificate_hash._key_cache.clear))
+    for token in raw_tokens:
+        cipher.decrypt_image(token, password)
+    report["decrypt_image_raw_warm"] = summarize(*timed(lambda t: cipher.decrypt_image(t, password), raw_tokens))
+
+    decoded = [Image.open(p).convert("RGB") for p in paths]
+    report["add_watermark"] = summarize(*timed(cipher.add_watermark, decoded))
+    return report
+
+
+STAGE_FUNCS = {
+    "classify": bench_classify,
+    "main_ocr": bench_main_ocr,
+    "main_llm": bench_main_llm,
+    "app_ocr": bench_app_ocr,
+    "doctr": bench_doctr,
+    "doctr_batched": bench_doctr_batched,
+    "extractor_llm": bench_extractor_llm,
+    "cipher": bench_cipher,
+}
+
+
+# ---------------- Reporting ----------------
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(current: dict, baseline: dict, threshold_pct: float) -> list:
+    """Return human-readable regressions of p50/p95 beyond threshold_pct."""
+    regressions = []
+
+    def walk(cur, base, path):
+        if not isinstance(cur, dict) or not isinstance(base, dict):
+            return
+        if "p50_ms" in cur and "p50_ms" in base:
+            for key in ("p50_ms", "p95_ms"):
+                if base[key] and cur[key] > base[key] * (1 + threshold_pct / 100.0):
+                    change = (cur[key] / base[key] - 1) * 100
+                    regressions.append(f"{path}.{key}: {base[key]} -> {cur[key]} (+{change:.1f}%)")
+            return
+        for key in cur:
+            walk(cur[key], base.get(key), f"{path}.{key}" if path else key)
+
+    walk(current.get("stages", {}), baseline.get("stages", {}), "")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the certificate extraction pipelines")
+    ap.add_argument("--images", type=int, default=20, help="synthetic images in the corpus")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--corpus-dir", default=os.path.join(tempfile.gettempdir(), "certificate-bench"))
+    ap.add_argument("--stages", default=",".join(ALL_STAGES), help="comma separated stage names")
+    ap.add_argument("--latency-ms", type=float, default=200, help="stub Ollama time to first byte")
+    ap.add_argument("--token-delay-ms", type=float, default=0, help="stub Ollama delay between streamed pieces")
+    ap.add_argument("--concurrency", type=int, default=4, help="in-flight requests for async stages")
+    ap.add_argument("--profile", default="bilateral", help="app.ocr_image filter profile")
+    ap.add_argument("--out", help="write the JSON report here instead of stdout")
+    ap.add_argument("--compare", help="baseline report to check for regressions")
+    ap.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    args = ap.parse_args()
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = set(stages) - set(STAGE_FUNCS)
+    if unknown:
+        ap.error(f"unknown stages: {sorted(unknown)}")
+
+    paths = generate_corpus(args.images, args.corpus_dir, seed=args.seed)
+
+    with StubOllama(latency_ms=args.latency_ms, token_delay_ms=args.token_delay_ms) as stub:
+        # Must be set before main / the ollama package read their configuration
+        os.environ["OLLAMA_BASE_URL"] = stub.base_url
+        os.environ["OLLAMA_HOST"] = stub.base_url
+        os.environ.setdefault("RESULT_CACHE_DISK", "false")
+
+        report = {
+            "meta": {
+                "revision": git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "args": vars(args),
+            },
+            "stages": {},
+        }
+        for stage in stages:
+            print(f"Running {stage}...", file=sys.stderr)
+            try:
+                report["stages"][stage] = STAGE_FUNCS[stage](paths, args)
+            except ImportError as e:
+                report["stages"][stage] = {"skipped": f"missing dependency: {e}"}
+            except Exception as e:
+                traceback.print_exc()
+                report["stages"][stage] = {"error": f"{type(e).__name__}: {e}"}
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
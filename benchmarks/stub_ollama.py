@@ -0,0 +1,121 @@
+"""Stand-in for the Ollama HTTP API with configurable latency, for benchmarks."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+GENERATE_ANSWER = {
+    "Full Name": "Praveen Kumar",
+    "Certificate Title": "Bachelor of Engineering",
+    "Issuing Authority": "Visvesvaraya Technological University",
+    "Date of Issue": "01-01-2024",
+    "Certificate ID": "34254435435",
+}
+CHAT_ANSWER = {
+    "student_name": "Praveen Kumar", "father_name": "Not Found", "mother_name": "Not Found",
+    "roll_no": "1MS19CS001", "date_of_birth": "10-10-2000", "examination_year": "2024",
+    "school_name": "Not Found", "ts_gg_no": "Not Found", "certificate_no": "34254435435", "cgpa": "9.20",
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        stub = self.server.stub
+        time.sleep(stub.latency_ms / 1000.0)
+        if stub.error_status:
+            self._send_json({"error": f"stub error {stub.error_status}"}, status=stub.error_status)
+        elif self.path == "/api/generate":
+            self._generate(payload, stub)
+        elif self.path == "/api/chat":
+            self._send_json({
+                "model": payload.get("model"), "created_at": "", "done": True,
+                "message": {"role": "assistant", "content": json.dumps(CHAT_ANSWER)},
+            })
+        else:
+            self.send_error(404)
+
+    def _generate(self, payload, stub):
+        text = json.dumps(GENERATE_ANSWER) + stub.trailing_text
+        if not payload.get("stream", True):
+            self._send_json({"model": payload.get("model"), "response": text, "done": True})
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        pieces = [text[i:i + stub.chunk_chars] for i in range(0, len(text), stub.chunk_chars)]
+        try:
+            for piece in pieces:
+                self._chunk({"model": payload.get("model"), "response": piece, "done": False})
+                if stub.token_delay_ms:
+                    time.sleep(stub.token_delay_ms / 1000.0)
+            self._chunk({"model": payload.get("model"), "response": "", "done": True})
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # client stopped reading early (e.g. once it had a complete JSON object)
+            self.close_connection = True
+
+    def _chunk(self, obj):
+        data = (json.dumps(obj) + "\n").encode()
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, obj, status=200):
+        data = json.dumps(obj).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class StubOllama:
+    """
+    Run a fake Ollama server in a background thread:
+
+        with StubOllama(latency_ms=200) as stub:
+            os.environ["OLLAMA_BASE_URL"] = stub.base_url
+
+    `latency_ms` is paid before the first byte, `token_delay_ms` between streamed pieces,
+    and `trailing_text` is streamed after the JSON to mimic a model that keeps generating.
+    With `error_status` every request gets that HTTP status and an {"error": ...} body.
+    """
+
+    def __init__(self, latency_ms: float = 200, token_delay_ms: float = 0, chunk_chars: int = 8,
+                 trailing_text: str = "", error_status: int = None, host: str = "127.0.0.1", port: int = 0):
+        self.latency_ms = latency_ms
+        self.token_delay_ms = token_delay_ms
+        self.chunk_chars = chunk_chars
+        self.trailing_text = trailing_text
+        self.error_status = error_status
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -0,0 +1,83 @@
+"""Synthetic certificate images for benchmarks, laid out like data/sample.jpg."""
+import os
+import random
+
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+FIRST_NAMES = ["Praveen", "Ananya", "Rahul", "Sneha", "Arjun", "Divya", "Karthik", "Meera", "Vikram", "Priya"]
+LAST_NAMES = ["Kumar", "Reddy", "Sharma", "Rao", "Iyer", "Nair", "Gupta", "Patel", "Menon", "Singh"]
+INSTITUTIONS = [
+    "Visvesvaraya Technological University", "Osmania University", "Board of Secondary Education",
+    "Jawaharlal Nehru Technological University", "Anna University",
+]
+COURSES = ["Bachelor of Engineering", "Secondary School Certificate", "Bachelor of Technology", "Master of Science"]
+
+FONT_CANDIDATES = ["DejaVuSerif.ttf", "DejaVuSans.ttf", "arial.ttf", "times.ttf"]
+
+
+def _font(size):
+    for name in FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+def make_certificate(seed: int, size=(1600, 1131)):
+    """Render one certificate; returns (PIL image, dict of the fields drawn on it)."""
+    rng = random.Random(seed)
+    fields = {
+        "Full Name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "Certificate Title": rng.choice(COURSES),
+        "Issuing Authority": rng.choice(INSTITUTIONS),
+        "Date of Issue": f"{rng.randint(1, 28):02d}-{rng.randint(1, 12):02d}-{rng.randint(2015, 2025)}",
+        "Certificate ID": str(rng.randint(10**10, 10**11 - 1)),
+        "roll_no": f"1MS{rng.randint(15, 24)}CS{rng.randint(1, 180):03d}",
+        "cgpa": f"{rng.uniform(6, 10):.2f}",
+    }
+
+    width, height = size
+    img = Image.new("RGB", size, (250, 247, 238))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([30, 30, width - 30, height - 30], outline=(120, 90, 40), width=12)
+    draw.rectangle([60, 60, width - 60, height - 60], outline=(170, 140, 80), width=3)
+
+    def centered(y, text, font, fill=(20, 20, 20)):
+        box = draw.textbbox((0, 0), text, font=font)
+        draw.text(((width - (box[2] - box[0])) // 2, y), text, font=font, fill=fill)
+
+    centered(110, fields["Issuing Authority"].upper(), _font(46), (90, 30, 30))
+    centered(210, "CERTIFICATE", _font(72))
+    centered(320, "This is to certify that", _font(32))
+    centered(390, fields["Full Name"], _font(60), (10, 40, 110))
+    centered(490, f"has successfully completed the {fields['Certificate Title']}", _font(32))
+    centered(550, f"with a CGPA of {fields['cgpa']}", _font(32))
+
+    small = _font(28)
+    draw.text((120, 700), f"Roll No: {fields['roll_no']}", font=small, fill=(20, 20, 20))
+    draw.text((120, 750), f"Certificate No: {fields['Certificate ID']}", font=small, fill=(20, 20, 20))
+    draw.text((120, 800), f"Date of Issue: {fields['Date of Issue']}", font=small, fill=(20, 20, 20))
+    draw.line([width - 480, 900, width - 140, 900], fill=(20, 20, 20), width=2)
+    draw.text((width - 400, 915), "Registrar", font=small, fill=(20, 20, 20))
+    draw.ellipse([180, 870, 340, 1030], outline=(150, 30, 30), width=5)
+
+    # scanner artefacts: slight skew, blur and noise
+    img = img.rotate(rng.uniform(-2.0, 2.0), resample=Image.BICUBIC, fillcolor=(250, 247, 238))
+    img = img.filter(ImageFilter.GaussianBlur(0.6))
+    noise = Image.effect_noise(size, 12).convert("RGB")
+    img = Image.blend(img, noise, 0.06)
+    return img, fields
+
+
+def generate_corpus(n: int, out_dir: str, seed: int = 0, quality: int = 90) -> list:
+    """Write `n` JPEG certificates to out_dir and return their paths (reused if present)."""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for i in range(n):
+        path = os.path.join(out_dir, f"cert_{seed}_{i:04d}.jpg")
+        if not os.path.exists(path):
+            img, _ = make_certificate(seed * 100003 + i)
+            img.save(path, format="JPEG", quality=quality)
+        paths.append(path)
+    return paths
@@ -1,23 +1,59 @@
 # app.py
-from fastapi import FastAPI, UploadFile, File
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi import FastAPI, UploadFile, File, Form, Header, Request
+from fastapi.responses import JSONResponse, HTMLResponse, StreamingResponse
 from PIL import Image, ImageOps
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
 import pytesseract
-import requests
+import asyncio
 import base64
+import io
 import os
-import tempfile
 import json
 import re
+import time
+import zipfile
+
+from src.core import metrics
+from src.core.config import settings
+from src.certificate_data_extraction import (UPLOAD_FIELDS, extract_fields, get_registry, missing_fields,
+                                             ocr_fields, to_upload_fields, warm_up as warm_up_doctr)
+from src.certificate_security.perceptual_hash import PerceptualHashIndex, hash_to_hex, image_hash
+from src.jobs import JobQueue, QueueFull
+from src.llm import IncrementalJsonParser, OllamaClient, assess_ocr_quality, choose_route
+from src.llm.routing import record_fallback
+from src.storage.database import SupabaseDB
+from src.storage.result_cache import ResultCache
 
 app = FastAPI()
 
-OLLAMA_URL = "http://localhost:11434/api/generate"
+TEXT_MODEL = "mistral:instruct"
+VISION_MODEL = "llava"
+# Bump whenever a prompt changes so cached results from the old prompt are not served
+PROMPT_VERSION = "2"
+
+# Shared, pooled async client for every Ollama call made by this app
+ollama_client = OllamaClient()
+# Results keyed by image hash + models + prompt version
+result_cache = ResultCache()
+# Process pool for batch OCR, created on first batch upload
+ocr_pool = None
+# Perceptual hashes of issued certificates, loaded from certificates.image_hash at startup
+phash_index = PerceptualHashIndex()
+certificate_db = SupabaseDB()
+# Background classification jobs (/jobs); workers are started in the startup event
+job_queue = JobQueue(lambda image_bytes: classify_certificate(image_bytes))
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp", ".webp"}
 
 # ---------- Helpers ----------
-def preprocess_image_for_ocr(path: str, max_width=1600) -> str:
-    """Open image, convert to RGB, autocontrast, resize if large, save a temp PNG and return path."""
-    img = Image.open(path).convert("RGB")
+def load_image(image_bytes: bytes) -> Image.Image:
+    """Decode uploaded image bytes once into an RGB PIL image."""
+    img = Image.open(io.BytesIO(image_bytes))
+    return img.convert("RGB")
+
+def preprocess_image_for_ocr(img: Image.Image, max_width=1600) -> Image.Image:
+    """Autocontrast and resize (if large) an RGB image in memory and return the new image."""
     # autocontrast to improve OCR
     img = ImageOps.autocontrast(img)
     # resize if too wide
@@ -25,25 +61,83 @@ def preprocess_image_for_ocr(path: str, max_width=1600) -> str:
         ratio = max_width / float(img.width)
         new_h = int(img.height * ratio)
         img = img.resize((max_width, new_h), Image.LANCZOS)
-    out = tempfile.NamedTemporaryFile(delete=False, suffix=".png")
-    img.save(out.name, format="PNG")
-    out.close()
-    return out.name
+    return img
 
-def ocr_text_from_image(path: str) -> str:
+def ocr_text_from_image(img: Image.Image) -> str:
     """Return OCR text using pytesseract (English). Adjust config to get multi-line text."""
+    return ocr_with_quality(img)[0]
+
+def ocr_with_quality(img: Image.Image):
+    """Run Tesseract once via image_to_data and return (text, OcrQuality).
+       The per-word confidences feed the routing gate at no extra OCR cost."""
     ocr_config = "--psm 6"  # assume a single uniform block of text; tweak if needed
     try:
-        text = pytesseract.image_to_string(Image.open(path), config=ocr_config, lang="eng")
+        data = pytesseract.image_to_data(img, config=ocr_config, lang="eng",
+                                         output_type=pytesseract.Output.DICT)
     except Exception:
-        text = ""
-    return text.strip()
+        return "", assess_ocr_quality([], [])
+
+    lines = {}
+    words, confidences = [], []
+    for i, word in enumerate(data["text"]):
+        word = word.strip()
+        if not word:
+            continue
+        try:
+            conf = float(data["conf"][i])
+        except (TypeError, ValueError):
+            conf = -1.0
+        words.append(word)
+        confidences.append(conf)
+        line_key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        lines.setdefault(line_key, []).append(word)
+
+    text = "\n".join(" ".join(line) for line in lines.values())
+    return text.strip(), assess_ocr_quality(words, confidences)
 
-def call_ollama_text_model(text: str, model: str = "mistral:instruct") -> str:
-    """Call Ollama with text prompt (for mistral/text-based extraction)."""
+def decode_for_ocr(image_bytes: bytes):
+    """Decode the upload once; return (preprocessed image, perceptual hash, timings).
+       The hash is taken from the same decoded image, before preprocessing."""
+    t0 = time.perf_counter()
+    img = load_image(image_bytes)
+    t1 = time.perf_counter()
+    value = image_hash(img)
+    t2 = time.perf_counter()
+    img = preprocess_image_for_ocr(img)
+    return img, value, {"preprocess": (t1 - t0) + (time.perf_counter() - t2), "phash": t2 - t1}
+
+def ocr_preprocessed(img: Image.Image):
+    """OCR an image from decode_for_ocr (blocking; safe for a pool worker).
+       Returns (text, OcrQuality, {"ocr": s}); timings are returned rather than recorded
+       because this may run in a pool worker process."""
+    t0 = time.perf_counter()
+    text, quality = ocr_with_quality(img)
+    return text, quality, {"ocr": time.perf_counter() - t0}
+
+def ocr_image_bytes(image_bytes: bytes):
+    """Decode, preprocess and OCR raw image bytes (blocking; run it off the event loop).
+       Returns (text, OcrQuality, perceptual hash, {"preprocess": s, "phash": s, "ocr": s})."""
+    img, value, timings = decode_for_ocr(image_bytes)
+    text, quality, ocr_timings = ocr_preprocessed(img)
+    return text, quality, value, dict(timings, **ocr_timings)
+
+def ocr_template_image(img: Image.Image, template_key: str):
+    """OCR only the field boxes of the layout template registered for `template_key` in an
+       image from decode_for_ocr (blocking; safe for a pool worker).
+       Returns ({field: {"value", "confidence", "box"}}, {"template_ocr": s})."""
+    template = get_registry().get(template_key)
+    t0 = time.perf_counter()
+    fields = ocr_fields(img, template)
+    return fields, {"template_ocr": time.perf_counter() - t0}
+
+async def call_ollama_text_model(text: str, model: str = TEXT_MODEL, timeout: float = None, fields=None):
+    """Call Ollama with text prompt (for mistral/text-based extraction).
+       `fields` limits the requested keys (default: all of UPLOAD_FIELDS).
+       Returns (parsed dict or None, raw text, seconds to first valid JSON or None)."""
+    keys = ", ".join(f'"{name}"' for name in (fields or UPLOAD_FIELDS))
     prompt = f"""
 You are an expert document parser. Extract EXACTLY the following JSON object and nothing else.
-Keys (use these exact keys): "Full Name", "Certificate Title", "Issuing Authority", "Date of Issue", "Certificate ID"
+Keys (use these exact keys): {keys}
 If a field is not present in the text, set its value to null.
 Do NOT invent or guess values not present in the text.
 
@@ -58,13 +152,13 @@ Return valid JSON only.
         "temperature": 0.0,
         "max_tokens": 512
     }
-    resp = requests.post(OLLAMA_URL, json=payload, timeout=60)
-    return _collect_response_text(resp)
+    return await _collect_json(ollama_client.stream_generate(payload, timeout=timeout), model)
 
-def call_ollama_vision_model(image_path: str, model: str = "llava") -> str:
-    """Call Ollama with an image; strict JSON instructions to avoid hallucination."""
-    with open(image_path, "rb") as f:
-        img_b64 = base64.b64encode(f.read()).decode("utf-8")
+async def call_ollama_vision_model(image_bytes: bytes, model: str = VISION_MODEL, timeout: float = None):
+    """Call Ollama with an image; strict JSON instructions to avoid hallucination.
+       Takes the original encoded upload bytes so the image is not decoded or re-encoded.
+       Returns (parsed dict or None, raw text, seconds to first valid JSON or None)."""
+    img_b64 = base64.b64encode(image_bytes).decode("utf-8")
 
     prompt = """
 You are an expert document analyzer. Given the image, extract EXACTLY the following JSON object and nothing else.
@@ -80,37 +174,58 @@ Return valid JSON only.
         "temperature": 0.0,
         "max_tokens": 512
     }
-    resp = requests.post(OLLAMA_URL, json=payload, timeout=60)
-    return _collect_response_text(resp)
+    return await _collect_json(ollama_client.stream_generate(payload, timeout=timeout), model)
 
-def _collect_response_text(response):
-    """Collect streaming or normal response body text. Ollama may return lines of JSON containing 'response'."""
+async def _collect_json(lines, model: str = ""):
+    """Feed streamed response text (Ollama returns lines of JSON containing 'response') to an
+       incremental parser and stop reading as soon as the first JSON object is complete;
+       closing the stream closes the connection, so Ollama stops generating.
+       Returns (parsed dict or None, raw text, seconds to first valid JSON or None)."""
+    start = time.perf_counter()
+    parser = IncrementalJsonParser()
+    parts = []
+    chunks = 0
+    finished = False
+    error = False
     try:
-        # If response is chunked or streaming, handle lines like earlier code
-        output = ""
-        for line in response.iter_lines():
-            if not line:
-                continue
+        async for line in lines:
             try:
-                parsed = json.loads(line.decode("utf-8"))
+                parsed = json.loads(line)
+            except ValueError:
+                parsed = None
+            if isinstance(parsed, dict) and "error" in parsed and "response" not in parsed:
+                # an error body (bad model, server error) is raw output, never the answer
+                error = True
+                parts.append(line)
+                continue
+            if isinstance(parsed, dict):
+                # the final chunk carries Ollama's token counts
+                if parsed.get("done"):
+                    finished = True
+                    metrics.record_tokens(parsed.get("model", model), parsed.get("prompt_eval_count"),
+                                          parsed.get("eval_count"))
                 # older responses used key "response"
-                if isinstance(parsed, dict) and "response" in parsed:
-                    output += parsed.get("response", "")
-                else:
-                    output += line.decode("utf-8")
-            except Exception:
+                text = parsed.get("response", "") if "response" in parsed else line
+            else:
                 # fallback to raw string
-                output += line.decode("utf-8")
-        if output:
-            return output.strip()
-    except Exception:
-        pass
+                text = line
+            parts.append(text)
+            chunks += 1
+            if parser.feed(text) is not None:
+                break
+    finally:
+        await lines.aclose()
 
-    # Fallback: try response.text
-    try:
-        return response.text.strip()
-    except Exception:
-        return ""
+    output = "".join(parts).strip()
+    if parser.result is None:
+        if error:
+            return None, output, None
+        # nothing balanced parsed while streaming; keep the old whole-text extraction as a fallback
+        return extract_first_json(output), output, None
+    if not finished:
+        # stopped before Ollama's final chunk: each streamed chunk is about one token
+        metrics.record_tokens(model, 0, chunks)
+    return parser.result, output, time.perf_counter() - start
 
 def extract_first_json(text: str):
     """Extract the first {...} JSON object from a string."""
@@ -138,52 +253,227 @@ def extract_first_json(text: str):
                         return None
     return None
 
+def get_ocr_pool() -> ProcessPoolExecutor:
+    """Return the shared OCR process pool (one worker per core)."""
+    global ocr_pool
+    if ocr_pool is None:
+        ocr_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+    return ocr_pool
+
+class UploadTooLarge(ValueError):
+    """A batch upload exceeds the limits in settings.batch."""
+
+def expand_upload(filename: str, data: bytes, budget: dict = None) -> list:
+    """Return [(name, image_bytes)] for an upload; zip archives are expanded to their images.
+       `budget` ({"files": n, "bytes": n}, shared across one request) is decremented per item;
+       UploadTooLarge is raised before reading any member that would exceed settings.batch
+       (file count, per-file size, total size or compression ratio), so a zip bomb is never
+       inflated."""
+    limits = settings.batch
+    budget = budget if budget is not None else {"files": limits.max_files, "bytes": limits.max_total_bytes}
+
+    def take(name, size):
+        if size > limits.max_file_bytes:
+            raise UploadTooLarge(f"{name} is larger than {limits.max_file_bytes} bytes")
+        budget["files"] -= 1
+        budget["bytes"] -= size
+        if budget["files"] < 0:
+            raise UploadTooLarge(f"More than {limits.max_files} files in one batch")
+        if budget["bytes"] < 0:
+            raise UploadTooLarge(f"Batch expands to more than {limits.max_total_bytes} bytes")
+
+    if not zipfile.is_zipfile(io.BytesIO(data)):
+        take(filename, len(data))
+        return [(filename, data)]
+    items = []
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        for info in zf.infolist():
+            name = info.filename
+            if info.is_dir() or name.startswith("__MACOSX/"):
+                continue
+            if os.path.splitext(name)[1].lower() not in IMAGE_EXTENSIONS:
+                continue
+            if info.file_size > limits.max_compression_ratio * max(info.compress_size, 1):
+                raise UploadTooLarge(f"{name} has a suspicious compression ratio")
+            take(name, info.file_size)
+            # the header's file_size is not trusted: never read more than it declared
+            with zf.open(info) as member:
+                content = member.read(info.file_size + 1)
+            if len(content) > info.file_size:
+                raise UploadTooLarge(f"{name} is larger than its zip header declares")
+            items.append((name, content))
+    return items
+
+def match_near_duplicates(value: int):
+    """Look a perceptual hash up among issued certificates.
+       Returns (image_hash hex, [{"cert_id", "distance"}], nearest first)."""
+    matches = phash_index.query(value)
+    return hash_to_hex(value), [{"cert_id": key, "distance": distance} for key, distance in matches]
+
+async def find_near_duplicates(image_bytes: bytes):
+    """Decode and perceptual-hash an upload that is not OCRed (cache hits), then match it."""
+    with metrics.track_stage("phash"):
+        value = await asyncio.to_thread(lambda: image_hash(load_image(image_bytes)))
+    return match_near_duplicates(value)
+
 # ---------- Main classifier (hybrid) ----------
-def classify_certificate(image_path: str) -> dict:
+async def classify_certificate(image, ocr_executor=None, template_key: str = None) -> dict:
     """Hybrid: OCR -> if OCR is good use text model; otherwise use vision model.
+       `image` is the raw uploaded bytes (or a file path). The bytes are decoded once and the
+       in-memory image is shared by every stage; nothing is written to disk.
+       `ocr_executor` runs the OCR stage (default: the loop's thread pool).
+       `template_key` (a clg_code / university id) selects a layout template; known layouts
+       are read field by field from their boxes, and only fields the template could not
+       read confidently go through the OCR rules / LLM pipeline.
        Returns a dict (parsed JSON) or fallback dict with 'raw' output."""
-    # Preprocess for OCR
-    preproc_path = preprocess_image_for_ocr(image_path)
+    if isinstance(image, (str, os.PathLike)):
+        with open(image, "rb") as f:
+            image = f.read()
+    image_bytes = image
 
-    ocr_text = ocr_text_from_image(preproc_path)
-    # cleanup preproc file
-    try:
-        os.remove(preproc_path)
-    except Exception:
-        pass
+    template = get_registry().get(template_key)
+
+    # Near-duplicates of issued certificates (re-scans, light edits) are not cached, since
+    # certificates issued later must still match
+    cache_key = ResultCache.make_key(image_bytes, TEXT_MODEL, VISION_MODEL, PROMPT_VERSION,
+                                     template.key if template else "")
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        phash, near_duplicates = await find_near_duplicates(image_bytes)
+        return dict(cached, cached=True, image_hash=phash, near_duplicates=near_duplicates)
+
+    # Decode once (off the event loop); the hash of that image is matched against issued
+    # certificates before any OCR or model runs, and every OCR stage reuses the image
+    img, hash_value, timings = await asyncio.to_thread(decode_for_ocr, image_bytes)
+    for stage, seconds in timings.items():
+        metrics.observe_stage(stage, seconds)
+    phash, near_duplicates = match_near_duplicates(hash_value)
+    if near_duplicates and settings.phash.short_circuit:
+        metrics.record_routing("near_duplicate")
+        return {"method": "near_duplicate", "parsed": None, "image_hash": phash,
+                "near_duplicates": near_duplicates}
 
-    # Decide path: if OCR produced decent text, use text model (more deterministic).
-    if ocr_text and len(ocr_text) > 60:
-        model_output = call_ollama_text_model(ocr_text, model="mistral:instruct")
-        parsed = extract_first_json(model_output)
+    result = known = None
+    if template is not None:
+        result, known = await _classify_with_template(img, template, ocr_executor)
+    if result is None:
+        result = await _classify_uncached(image_bytes, img, ocr_executor, known=known)
+        if known is not None:
+            result["template"] = template.key
+    # Only successful parses are cached; raw failures should be retried
+    if result.get("parsed") is not None:
+        result_cache.set(cache_key, result)
+    return dict(result, image_hash=phash, near_duplicates=near_duplicates)
+
+async def _classify_with_template(img: Image.Image, template, ocr_executor=None):
+    """OCR only the template's field crops, mapped onto UPLOAD_FIELDS.
+
+    Returns (result, known fields). The result is None unless every upload
+    field was read confidently; the caller then runs the full pipeline for the rest, with
+    the confidently read `known` fields ({field: {"value", "confidence"}}, or None if the
+    template read nothing, e.g. the upload does not actually follow the layout).
+    """
+    loop = asyncio.get_running_loop()
+    fields, timings = await loop.run_in_executor(ocr_executor, ocr_template_image, img, template.key)
+    for stage, seconds in timings.items():
+        metrics.observe_stage(stage, seconds)
+    extracted = to_upload_fields(fields)
+    missing = missing_fields(extracted)
+    if len(missing) == len(UPLOAD_FIELDS):
+        metrics.record_routing("template_fallback")
+        return None, None
+    if missing:
+        metrics.record_routing("template_partial")
+        known = {name: f for name, f in extracted.items() if name not in missing}
+        return None, known
+    metrics.record_routing("template")
+    return {
+        "method": "template",
+        "template": template.key,
+        "parsed": {name: f["value"] for name, f in extracted.items()},
+        "field_confidence": {name: f["confidence"] for name, f in extracted.items()},
+        "template_fields": {name: f["value"] for name, f in fields.items()},
+    }, None
+
+async def _classify_uncached(image_bytes: bytes, img: Image.Image, ocr_executor=None, known: dict = None) -> dict:
+    """OCR the decoded image and extract the fields. `known` fields (already read from a
+       layout template) are kept as they are and not asked of any model."""
+    # OCR off the event loop so Tesseract does not block other requests
+    loop = asyncio.get_running_loop()
+    ocr_text, quality, timings = await loop.run_in_executor(ocr_executor, ocr_preprocessed, img)
+    for stage, seconds in timings.items():
+        metrics.observe_stage(stage, seconds)
+    return await _classify_ocr_text(image_bytes, ocr_text, quality, known)
+
+async def _classify_ocr_text(image_bytes: bytes, ocr_text: str, quality, known: dict = None) -> dict:
+    known = known or {}
+    # Decide path from OCR quality (confidence, real words, field keywords): good OCR goes
+    # to the text model (more deterministic), poor OCR goes straight to the vision model.
+    if choose_route(quality) == "text":
+        # Regex rules fill what they can from the OCR text; the text model is only asked
+        # for the fields they could not fill confidently
+        with metrics.track_stage("rules"):
+            extracted = dict(extract_fields(ocr_text, UPLOAD_FIELDS), **known)
+        fields = {name: f["value"] for name, f in extracted.items()}
+        field_confidence = {name: f["confidence"] for name, f in extracted.items()}
+        missing = missing_fields(extracted)
+        if not missing:
+            metrics.record_routing("rules")
+            return {"method": "rules", "parsed": fields, "field_confidence": field_confidence,
+                    "ocr_quality": quality.to_dict()}
+
+        with metrics.track_stage("llm_text"):
+            parsed, model_output, first_json_s = await call_ollama_text_model(
+                ocr_text, model=TEXT_MODEL, fields=missing)
         if parsed:
-            return {"method": "ocr+mistral", "parsed": parsed, "raw": model_output}
+            if first_json_s is not None:
+                metrics.observe_stage("llm_text_first_json", first_json_s)
+            for name in missing:
+                if parsed.get(name) is None and fields[name] is not None:
+                    continue  # keep the low-confidence rule value over nothing
+                fields[name] = parsed.get(name)
+                field_confidence[name] = None
+            method = "ocr+mistral" if len(missing) == len(UPLOAD_FIELDS) else "rules+mistral"
+            return {"method": method, "parsed": fields, "raw": model_output,
+                    "field_confidence": field_confidence, "ocr_quality": quality.to_dict(),
+                    "time_to_json_s": first_json_s}
         # fallback to vision model if parsing fails
+        record_fallback("unparseable JSON")
     # Use vision model (llava)
-    model_output = call_ollama_vision_model(image_path, model="llava")
-    parsed = extract_first_json(model_output)
+    with metrics.track_stage("llm_vision"):
+        parsed, model_output, first_json_s = await call_ollama_vision_model(image_bytes, model=VISION_MODEL)
     if parsed:
-        return {"method": "llava", "parsed": parsed, "raw": model_output}
+        if first_json_s is not None:
+            metrics.observe_stage("llm_vision_first_json", first_json_s)
+        parsed.update({name: f["value"] for name, f in known.items()})
+        return {"method": "llava", "parsed": parsed, "raw": model_output,
+                "ocr_quality": quality.to_dict(), "time_to_json_s": first_json_s}
     # Last-resort: return raw model text so you can debug
     return {"method": "raw", "parsed": None, "raw": model_output}
 
 # ---------- FastAPI endpoints ----------
+@app.middleware("http")
+async def metrics_middleware(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    with metrics.track_in_flight():
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            # label by route template (not raw URL) to keep cardinality bounded
+            route = request.scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            metrics.record_request(request.method, path, status, time.perf_counter() - start)
+
 @app.post("/upload/")
-async def upload_certificate(file: UploadFile = File(...)):
+async def upload_certificate(file: UploadFile = File(...), clg_code: Optional[str] = Form(None)):
     try:
-        # Save uploaded file temporarily
-        suffix = os.path.splitext(file.filename)[1] or ".png"
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            tmp.write(await file.read())
-            tmp_path = tmp.name
+        # Keep the upload in memory; classify_certificate decodes it once
+        image_bytes = await file.read()
 
-        result = classify_certificate(tmp_path)
-
-        # cleanup
-        try:
-            os.remove(tmp_path)
-        except Exception:
-            pass
+        result = await classify_certificate(image_bytes, template_key=clg_code)
 
         # If parsed is None, return raw output and a helpful message
         if result.get("parsed") is None:
@@ -197,6 +487,159 @@ async def upload_certificate(file: UploadFile = File(...)):
     except Exception as e:
         return JSONResponse({"error": str(e)}, status_code=500)
 
+@app.post("/upload/batch")
+async def upload_batch(files: List[UploadFile] = File(...), clg_code: Optional[str] = Form(None)):
+    """Classify many certificates (or zips of them). OCR fans out over a process pool and
+       results stream back as NDJSON, one line per file as it completes, then a summary line.
+       `clg_code` applies one layout template to every file."""
+    limits = settings.batch
+    budget = {"files": limits.max_files, "bytes": limits.max_total_bytes}
+    items = []
+    try:
+        for file in files:
+            # read at most one byte past the limit, so an oversized file is never held whole
+            data = await file.read(limits.max_file_bytes + 1)
+            if len(data) > limits.max_file_bytes:
+                raise UploadTooLarge(f"{file.filename} is larger than {limits.max_file_bytes} bytes")
+            items.extend(expand_upload(file.filename, data, budget))
+    except UploadTooLarge as e:
+        return JSONResponse({"error": str(e)}, status_code=413)
+    return StreamingResponse(_batch_results(items, clg_code), media_type="application/x-ndjson")
+
+async def _batch_results(items: list, template_key: str = None):
+    start = time.perf_counter()
+    pool = get_ocr_pool()
+
+    async def process(name, image_bytes):
+        try:
+            result = await classify_certificate(image_bytes, ocr_executor=pool, template_key=template_key)
+            return {"file": name, "result": result}
+        except Exception as e:
+            return {"file": name, "error": str(e)}
+
+    # At most settings.batch.concurrency files are in flight; a finished one starts the next.
+    # If the client disconnects, the generator is closed and the finally cancels the rest.
+    queued = iter(items)
+    running = set()
+    succeeded = failed = 0
+    try:
+        while True:
+            for name, data in queued:
+                running.add(asyncio.create_task(process(name, data)))
+                if len(running) >= settings.batch.concurrency:
+                    break
+            if not running:
+                break
+            done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                line = task.result()
+                if line.get("result", {}).get("parsed") is not None:
+                    succeeded += 1
+                else:
+                    failed += 1
+                yield json.dumps(line, ensure_ascii=False) + "\n"
+    finally:
+        for task in running:
+            task.cancel()
+
+    elapsed = time.perf_counter() - start
+    yield json.dumps({"summary": {
+        "files": len(items),
+        "parsed": succeeded,
+        "unparsed_or_failed": failed,
+        "elapsed_s": round(elapsed, 3),
+        "files_per_sec": round(len(items) / elapsed, 3) if elapsed > 0 else None,
+    }}) + "\n"
+
+@app.post("/jobs")
+async def submit_job(file: UploadFile = File(...)):
+    """Queue a certificate for background classification and return its job id at once.
+       Poll GET /jobs/{id} or subscribe to GET /jobs/{id}/events (SSE) for the result."""
+    image_bytes = await file.read()
+    try:
+        job_id = await job_queue.submit(file.filename, image_bytes)
+    except QueueFull as e:
+        return JSONResponse({"error": f"Too many pending jobs ({e}); retry later."},
+                            status_code=429, headers={"Retry-After": "5"})
+    return JSONResponse({
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"/jobs/{job_id}",
+        "events_url": f"/jobs/{job_id}/events",
+    }, status_code=202)
+
+@app.get("/jobs/stats")
+async def job_stats():
+    return job_queue.stats()
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await job_queue.get(job_id)
+    if job is None:
+        return JSONResponse({"error": "Unknown job id"}, status_code=404)
+    return job
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Server-sent events: one 'job' event per state change, ending once the job finishes."""
+    if await job_queue.get(job_id) is None:
+        return JSONResponse({"error": "Unknown job id"}, status_code=404)
+
+    async def events():
+        async for job in job_queue.watch(job_id):
+            if job is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: job\ndata: {json.dumps(job, ensure_ascii=False, default=str)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.post("/certificates/{cert_id}/image")
+async def register_certificate_image(cert_id: str, file: UploadFile = File(...),
+                                     university_key: Optional[str] = Header(None, alias="X-University-Key")):
+    """Store the perceptual hash of an issued certificate's image and index it, so later
+       uploads are matched against it without a restart. Requires the issuing university's
+       private key (X-University-Key); only that university's certificates can be updated."""
+    univ_id = None
+    if university_key:
+        univ_id = await asyncio.to_thread(certificate_db.get_university_univ_id_by_private_key, university_key)
+    if univ_id is None:
+        return JSONResponse({"error": "A valid X-University-Key is required"}, status_code=401)
+    image_bytes = await file.read()
+    try:
+        # hashed from the decoded image exactly like classify_certificate's uploads
+        value = hash_to_hex(await asyncio.to_thread(lambda: image_hash(load_image(image_bytes))))
+    except Exception as e:
+        return JSONResponse({"error": f"Could not read image: {e}"}, status_code=400)
+    if not await asyncio.to_thread(certificate_db.update_certificate_image_hash, cert_id, value, univ_id):
+        return JSONResponse({"error": f"No certificate {cert_id} issued by this university"}, status_code=404)
+    phash_index.add(cert_id, value)
+    return {"cert_id": cert_id, "image_hash": value, "indexed": len(phash_index)}
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return result_cache.stats()
+
+@app.on_event("startup")
+async def startup():
+    metrics.start_metrics_server()
+    await job_queue.start()
+    if settings.phash.load_on_startup:
+        rows = await asyncio.to_thread(certificate_db.get_certificate_image_hashes)
+        phash_index.load(rows)
+    # Optional: pay the doctr model load now instead of on the first request
+    if settings.doctr.warm_up_on_startup:
+        await asyncio.to_thread(warm_up_doctr)
+
+@app.on_event("shutdown")
+async def shutdown():
+    await job_queue.stop()
+    await ollama_client.aclose()
+    certificate_db.close()
+    if ocr_pool is not None:
+        ocr_pool.shutdown(wait=False, cancel_futures=True)
+
 @app.get("/", response_class=HTMLResponse)
 async def home():
     return """
@@ -1,3 +1,8 @@
-from src.certificate_data_extraction.certificate_image_data_extraction import CertificateDataExtractor
+from src.certificate_data_extraction.certificate_image_data_extraction import CertificateDataExtractor, get_predictor, warm_up
+from src.certificate_data_extraction.templates import FieldBox, LayoutTemplate, TemplateRegistry, get_registry, ocr_fields
+from src.certificate_data_extraction.field_rules import CERTIFICATE_FIELDS, UPLOAD_FIELDS, extract_fields, missing_fields, to_upload_fields
 
-__all__ = ["CertificateDataExtractor"]
\ No newline at end of file
+__all__ = ["CertificateDataExtractor", "get_predictor", "warm_up",
+           "FieldBox", "LayoutTemplate", "TemplateRegistry", "get_registry", "ocr_fields",
+           "CERTIFICATE_FIELDS", "UPLOAD_FIELDS", "extract_fields", "missing_fields",
+           "to_upload_fields"]
\ No newline at end of file
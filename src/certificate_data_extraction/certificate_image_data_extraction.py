@@ -1,53 +1,123 @@
 import asyncio
 import json
 import time
-import ollama
 import os
 import sys
-
-from doctr.io import DocumentFile
-from doctr.models import ocr_predictor
+import threading
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),'..', '..')))
+from src.core.config import settings
 from src.core.logging import get_logger
+from src.certificate_data_extraction.doctr_batcher import DoctrBatcher
+from src.certificate_data_extraction.field_rules import CERTIFICATE_FIELDS, extract_fields, missing_fields
 
 logger = get_logger("Certificate Data Extractor")
 
+# doctr/torch are imported and the pretrained weights loaded on first use only,
+# once per process, and shared by every CertificateDataExtractor
+DOCTR_ARCHS = {
+    "default": {},
+    "light": {"det_arch": "linknet_resnet18", "reco_arch": "crnn_mobilenet_v3_small"},
+}
+_predictor = None
+_predictor_lock = threading.Lock()
+
+
+def get_predictor():
+    """Return the process-wide doctr predictor, loading it on first call."""
+    global _predictor
+    if _predictor is None:
+        with _predictor_lock:
+            if _predictor is None:
+                from doctr.models import ocr_predictor
+
+                arch = settings.doctr.arch
+                if arch not in DOCTR_ARCHS:
+                    raise ValueError(f"Unknown DOCTR_ARCH '{arch}', expected one of {list(DOCTR_ARCHS)}")
+                start = time.time()
+                # det_bs lets the detector process a whole collected batch in one forward pass
+                _predictor = ocr_predictor(pretrained=True, det_bs=settings.doctr.max_batch_size,
+                                           **DOCTR_ARCHS[arch])
+                logger.info(f"Loaded doctr '{arch}' predictor in {time.time() - start:.2f}s.")
+    return _predictor
+
+
+def load_document(image_path):
+    from doctr.io import DocumentFile
+    return DocumentFile.from_images(image_path)
+
+
+def warm_up():
+    """Load the predictor and run one tiny page so the first request pays no startup cost.
+       Intended for the server's startup event."""
+    import numpy as np
+
+    predictor = get_predictor()
+    predictor([np.full((64, 64, 3), 255, dtype=np.uint8)])
+    logger.info("doctr predictor warmed up.")
+
+
 class CertificateDataExtractor:
-    def __init__(self):
-        # Load OCR model once (saves time)
-        # self.model = ocr_predictor(det_arch="linknet_resnet18", reco_arch="crnn_mobilenet_v3_small", pretrained=True)
-        self.model = ocr_predictor(pretrained=True)
+    def __init__(self, max_batch_size=None, max_wait_ms=None):
+        # Concurrent run_doctr calls are merged into one predictor batch
+        self.batcher = DoctrBatcher(lambda pages: self.model(pages),
+                                    max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+
+    @property
+    def model(self):
+        # Model loaded once per process on first use (saves time)
+        return get_predictor()
 
     async def run_doctr(self, image_path):
         loop = asyncio.get_event_loop()
-        # Run OCR in a thread pool to avoid blocking
-        return await loop.run_in_executor(None, self._ocr_sync, image_path)
+        # Decode in a thread pool, then OCR through the batcher to avoid blocking
+        pages = await loop.run_in_executor(None, load_document, image_path)
+        exported_pages = await self.batcher.submit(pages)
+        logger.info("OCR processing completed.")
+        return self._pages_to_text(exported_pages)
 
-    def _ocr_sync(self, image_path):
-        doc = DocumentFile.from_images(image_path)
-        result = self.model(doc)
-        exported = result.export()
+    async def run_doctr_many(self, image_paths):
+        """OCR several images concurrently; they share predictor batches."""
+        return await asyncio.gather(*(self.run_doctr(path) for path in image_paths))
 
+    @staticmethod
+    def _pages_to_text(pages):
         lines = []
-        for page in exported["pages"]:
+        for page in pages:
             for block in page["blocks"]:
                 for line in block["lines"]:
                     line_text = " ".join([word["value"] for word in line["words"]])
                     lines.append(line_text)
-        logger.info("OCR processing completed.")
         return "\n".join(lines)
 
-    async def train_llm(self, ocr_text: str):
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self._llm_sync, ocr_text)
-
-    def _llm_sync(self, ocr_text: str):
+    async def train_llm(self, ocr_text: str, with_confidence: bool = False):
+        """Fill the certificate fields from OCR text. Regex rules run first; the LLM is only
+           asked for the fields they could not fill confidently (and not called at all if
+           none are left). With `with_confidence`, returns (fields, {field: confidence}),
+           where LLM-filled fields have confidence None."""
+        extracted = extract_fields(ocr_text, CERTIFICATE_FIELDS)
+        fields = {name: f["value"] for name, f in extracted.items()}
+        confidence = {name: f["confidence"] for name, f in extracted.items()}
+
+        missing = missing_fields(extracted)
+        if missing:
+            loop = asyncio.get_event_loop()
+            llm_fields = await loop.run_in_executor(None, self._llm_sync, ocr_text, missing)
+            for name in missing:
+                value = llm_fields.get(name) or "Not Found"
+                if value == "Not Found" and fields[name] is not None:
+                    continue  # keep the low-confidence rule value over nothing
+                fields[name] = value
+                confidence[name] = None
+        else:
+            logger.info("All fields extracted by rules; LLM skipped.")
+        return (fields, confidence) if with_confidence else fields
+
+    def _llm_sync(self, ocr_text: str, fields=None):
+        field_list = ", ".join(f'"{name}"' for name in (fields or CERTIFICATE_FIELDS))
         prompt = f"""
         From the following extracted certificate text, return a JSON object with:
-        "student_name", "father_name", "mother_name", "roll_no", 
-        "date_of_birth", "examination_year", "school_name", 
-        "ts_gg_no", "certificate_no", "cgpa".
+        {field_list}.
 
         Text:
         {ocr_text}
@@ -55,6 +125,8 @@ class CertificateDataExtractor:
         If a field is not found, return "Not Found". 
         Return ONLY the JSON.
         """
+        import ollama
+
         logger.info("LLM processing started.")
         response = ollama.chat(
             model="llama3.2-vision:latest",
@@ -0,0 +1,89 @@
+import asyncio
+
+from src.core.config import settings
+from src.core.logging import get_logger
+
+logger = get_logger("Doctr Batcher")
+
+
+class DoctrBatcher:
+    """
+    Micro-batching front end for a doctr `ocr_predictor`.
+
+    Concurrent `submit` calls are queued; a single worker task waits up to `max_wait_ms`
+    for more requests (or until `max_batch_size` pages are queued), runs all collected
+    pages through the predictor in one call, and resolves each caller's future with
+    its own pages from the batch.
+    """
+
+    def __init__(self, model, max_batch_size: int = None, max_wait_ms: float = None, executor=None):
+        cfg = settings.doctr
+        self.model = model
+        self.max_batch_size = max_batch_size or cfg.max_batch_size
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else cfg.max_wait_ms) / 1000.0
+        self.executor = executor
+        self._loop = None
+        self._queue = None
+        self._worker = None
+
+    def _ensure_worker(self):
+        """Start the batching task on the running loop (restarted if the loop changed)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, pages: list) -> list:
+        """Queue the pages of one document; returns their exported page dicts."""
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((pages, future))
+        return await future
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+
+    def _predict(self, pages: list) -> list:
+        return self.model(pages).export()["pages"]
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            n_pages = len(batch[0][0])
+            deadline = loop.time() + self.max_wait
+            while n_pages < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                n_pages += len(item[0])
+
+            all_pages = [page for pages, _ in batch for page in pages]
+            try:
+                exported = await loop.run_in_executor(self.executor, self._predict, all_pages)
+            except Exception as e:
+                logger.error(f"Batched OCR failed for {len(batch)} requests: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            logger.info(f"OCR batch of {len(batch)} requests ({len(all_pages)} pages) completed.")
+            offset = 0
+            for pages, future in batch:
+                result = exported[offset:offset + len(pages)]
+                offset += len(pages)
+                if not future.done():
+                    future.set_result(result)
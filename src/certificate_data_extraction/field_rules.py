@@ -0,0 +1,140 @@
+import re
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from src.core.config import settings
+
+# Field sets of the two LLM prompts: CertificateDataExtractor._llm_sync and main's
+# call_ollama_text_model
+CERTIFICATE_FIELDS = [
+    "student_name", "father_name", "mother_name", "roll_no", "date_of_birth",
+    "examination_year", "school_name", "ts_gg_no", "certificate_no", "cgpa",
+]
+UPLOAD_FIELDS = ["Full Name", "Certificate Title", "Issuing Authority", "Date of Issue", "Certificate ID"]
+# Layout templates may name their boxes after either field set; these certificate fields
+# carry an upload field
+CERTIFICATE_TO_UPLOAD = {"student_name": "Full Name", "certificate_no": "Certificate ID"}
+
+# Shared value patterns. Anchors are case-insensitive via (?i:...), values are not, so a
+# name has to be capitalised the way names are printed.
+_SEP = r"[ \t]*(?:[:\-.][ \t]*){0,2}"
+_ID = r"(?P<value>[A-Z0-9][A-Z0-9/\-]{3,24})"
+# Name words are separated by single spaces and stop before the next label ("... Mother's Name")
+_NAME = r"(?P<value>[A-Z][A-Za-z.'\-]*(?:[ \t](?!(?i:name|mother|father|roll|s/o|d/o)\b)[A-Z][A-Za-z.'\-]*){0,4})"
+_MONTHS = r"(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]*"
+_DATE = (r"(?P<value>\d{1,2}[\-/.]\d{1,2}[\-/.](?:\d{4}|\d{2})"
+         rf"|\d{{1,2}}(?:st|nd|rd|th)?[ \t]+{_MONTHS},?[ \t]+\d{{4}}"
+         rf"|{_MONTHS}[ \t]+\d{{1,2}},?[ \t]+\d{{4}}"
+         r"|\d{4}-\d{2}-\d{2})")
+_YEAR = r"(?P<value>(?:19|20)\d{2})"
+_TITLE_PREFIX = r"(?:(?i:mr|ms|mrs|miss|sri|smt|shri|kumari|kum)\.?[ \t]+)?"
+# Rules without a field label (the value is recognised by its shape alone) score below the
+# default RULES_MIN_CONFIDENCE: their value is kept only if the LLM returns nothing better
+HEURISTIC = 0.5
+# Identifiers (roll / certificate / TS-GG numbers) always contain a digit, which keeps
+# words after a bare anchor ("SEAT ALLOTTED AT CENTRE") from passing as one
+_ID_FIELDS = ("roll_no", "certificate_no", "ts_gg_no", "Certificate ID")
+
+_STUDENT_NAME = [
+    (rf"(?i:name[ \t]+of[ \t]+the[ \t]+(?:student|candidate)|(?:student|candidate)(?:'s)?[ \t]+name){_SEP}{_TITLE_PREFIX}{_NAME}", 0.85),
+    (rf"(?i:certif(?:y|ied)[ \t]+that){_SEP}{_TITLE_PREFIX}{_NAME}", 0.75),
+]
+_CERTIFICATE_NO = [
+    (rf"(?i:\b(?:certificate|cert|serial|sl)\.?[ \t]*(?:no|number|id)\b){_SEP}{_ID}", 0.9),
+]
+
+RULES = {
+    "student_name": _STUDENT_NAME,
+    "father_name": [
+        (rf"(?i:father(?:'s)?[ \t]*name){_SEP}{_TITLE_PREFIX}{_NAME}", 0.85),
+        (rf"(?i:\b(?:s/o|d/o|son[ \t]+of|daughter[ \t]+of)\b){_SEP}{_TITLE_PREFIX}{_NAME}", 0.75),
+    ],
+    "mother_name": [
+        (rf"(?i:mother(?:'s)?[ \t]*name){_SEP}{_TITLE_PREFIX}{_NAME}", 0.85),
+    ],
+    "roll_no": [
+        (rf"(?i:\b(?:roll|reg(?:istration)?|regd|enrol?l?ment|seat|hall[ \t]*ticket)\.?[ \t]*(?:no|number|num)?\b){_SEP}{_ID}", 0.9),
+    ],
+    "date_of_birth": [
+        (rf"(?i:date[ \t]+of[ \t]+birth|\bd\.?[ \t]*o\.?[ \t]*b\b\.?|birth[ \t]*date){_SEP}{_DATE}", 0.9),
+    ],
+    "examination_year": [
+        (rf"(?i:year[ \t]+of[ \t]+(?:passing|examination|exam)){_SEP}{_YEAR}", 0.9),
+        (rf"(?i:\bexamination\b|\bexam\b)[^\n]{{0,40}}?\b{_YEAR}\b", HEURISTIC),
+    ],
+    "school_name": [
+        (r"(?i:\b(?:name[ \t]+of[ \t]+the[ \t]+)?(?:school|college|institution)(?:[ \t]+name)?)[ \t]*[:\-][ \t]*(?P<value>[^\n]{3,80})", 0.8),
+    ],
+    "ts_gg_no": [
+        (rf"(?i:\bt\.?[ \t]*s\.?[ \t]*[/\-]?[ \t]*g\.?[ \t]*g\.?[ \t]*(?:no|number)?\b){_SEP}{_ID}", 0.85),
+    ],
+    "certificate_no": _CERTIFICATE_NO,
+    "cgpa": [
+        (r"(?i:\bc\.?[ \t]*g\.?[ \t]*p\.?[ \t]*a\b|\bgpa\b|grade[ \t]+point[ \t]+average)\s*[:\-=]?\s*(?P<value>\d{1,2}(?:\.\d{1,2})?)", 0.9),
+    ],
+    "Full Name": _STUDENT_NAME,
+    "Certificate Title": [
+        (r"(?P<value>(?i:Bachelor|Master|Doctor|Diploma|Certificate|Post[ \t]+Graduate[ \t]+Diploma)[ \t]+(?i:of|in)[ \t]+[A-Z][A-Za-z&()' \t]{2,60}[A-Za-z)])", HEURISTIC),
+    ],
+    "Issuing Authority": [
+        (r"(?P<value>(?:[A-Z][A-Za-z.&'\-]*[ \t]+){1,6}(?i:University|Board|Council|Institute|College)(?:[ \t]+(?i:of)[ \t]+[A-Z][A-Za-z.&' \t]{2,40}[A-Za-z])?)", HEURISTIC),
+    ],
+    "Date of Issue": [
+        (rf"(?i:date[ \t]+of[ \t]+issue|issued[ \t]+on|\bdated?\b){_SEP}{_DATE}", 0.85),
+    ],
+    "Certificate ID": _CERTIFICATE_NO,
+}
+_COMPILED = {name: [(re.compile(p), conf) for p, conf in rules] for name, rules in RULES.items()}
+
+
+def _valid(name: str, value: str) -> bool:
+    if name in _ID_FIELDS:
+        return any(c.isdigit() for c in value)
+    if name == "cgpa":
+        return 0.0 <= float(value) <= 10.0
+    if name in ("date_of_birth", "Date of Issue"):
+        parts = re.split(r"[\-/.]", value)
+        if len(parts) == 3 and all(p.isdigit() for p in parts):
+            day, month = (int(parts[2]), int(parts[1])) if len(parts[0]) == 4 else (int(parts[0]), int(parts[1]))
+            return 1 <= day <= 31 and 1 <= month <= 12
+    return True
+
+
+def extract_fields(text: str, fields=CERTIFICATE_FIELDS) -> dict:
+    """Fill `fields` from OCR text with anchored regexes.
+
+    Returns {field: {"value": str or None, "confidence": 0..1}}; a field no rule matched has
+    value None and confidence 0. The first valid match of the first (most specific) matching
+    rule wins.
+    """
+    results = {}
+    for name in fields:
+        value, confidence = None, 0.0
+        for pattern, rule_confidence in _COMPILED.get(name, ()):
+            for match in pattern.finditer(text or ""):
+                candidate = match.group("value").strip(" \t.,;:-")
+                if candidate and _valid(name, candidate):
+                    value, confidence = candidate, rule_confidence
+                    break
+            if value is not None:
+                break
+        results[name] = {"value": value, "confidence": confidence}
+    return results
+
+
+def to_upload_fields(fields: dict) -> dict:
+    """Map {field: {"value", "confidence", ...}} keyed by CERTIFICATE_FIELDS or UPLOAD_FIELDS
+    names onto UPLOAD_FIELDS, in extract_fields' format; fields with no source are unmatched."""
+    results = {name: {"value": None, "confidence": 0.0} for name in UPLOAD_FIELDS}
+    for name, f in fields.items():
+        target = CERTIFICATE_TO_UPLOAD.get(name, name)
+        if target in results and f.get("value") is not None:
+            results[target] = {"value": f["value"], "confidence": f["confidence"]}
+    return results
+
+
+def missing_fields(extracted: dict, min_confidence: float = None) -> list:
+    """Fields that still need the LLM: unmatched or below RULES_MIN_CONFIDENCE."""
+    min_confidence = settings.rules.min_confidence if min_confidence is None else min_confidence
+    return [name for name, f in extracted.items() if f["value"] is None or f["confidence"] < min_confidence]
@@ -0,0 +1,195 @@
+import json
+import multiprocessing
+import os
+import string
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from src.core.config import settings
+from src.core.logging import get_logger
+
+logger = get_logger("Layout Templates")
+
+# Named character whitelists a template field may use instead of spelling the characters out
+WHITELISTS = {
+    "digits": string.digits,
+    "decimal": string.digits + ".",
+    "date": string.digits + "-/.",
+    "alnum": string.ascii_uppercase + string.digits + "/-",
+}
+
+
+@dataclass(frozen=True)
+class FieldBox:
+    """One field of a layout: a box as fractions (x, y, w, h) of the page size, and the
+       Tesseract page segmentation mode / character whitelist suited to its contents."""
+    name: str
+    box: tuple
+    psm: int = 7  # single text line
+    whitelist: str = None
+
+    @property
+    def tesseract_config(self) -> str:
+        config = f"--oem 3 --psm {self.psm}"
+        if self.whitelist:
+            config += f" -c tessedit_char_whitelist={WHITELISTS.get(self.whitelist, self.whitelist)}"
+        return config
+
+    def pixel_box(self, width: int, height: int) -> tuple:
+        """(left, top, right, bottom) in pixels, clamped to the page."""
+        x, y, w, h = self.box
+        left, top = max(0, int(x * width)), max(0, int(y * height))
+        right, bottom = min(width, int((x + w) * width)), min(height, int((y + h) * height))
+        return left, top, right, bottom
+
+
+@dataclass(frozen=True)
+class LayoutTemplate:
+    """Field layout of one university's (or college's) certificate."""
+    key: str
+    fields: tuple
+    name: str = ""
+    aliases: tuple = field(default_factory=tuple)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LayoutTemplate":
+        fields = tuple(
+            FieldBox(name=name, box=tuple(spec["box"]), psm=int(spec.get("psm", 7)),
+                     whitelist=spec.get("whitelist"))
+            for name, spec in data["fields"].items()
+        )
+        return cls(key=str(data["key"]), fields=fields, name=data.get("name", ""),
+                   aliases=tuple(str(a) for a in data.get("aliases", ())))
+
+
+class TemplateRegistry:
+    """
+    Layout templates keyed by clg_code / university id (plus any aliases), loaded from one
+    JSON file per template in `directory` (default: settings.templates.directory):
+
+        {
+            "key": "CLG001",
+            "name": "Example University",
+            "aliases": ["<univ_id>"],
+            "fields": {
+                "student_name": {"box": [0.30, 0.32, 0.55, 0.05]},
+                "roll_no":      {"box": [0.62, 0.25, 0.25, 0.04], "whitelist": "alnum"},
+                "cgpa":         {"box": [0.70, 0.71, 0.12, 0.04], "whitelist": "decimal", "psm": 8}
+            }
+        }
+    """
+
+    def __init__(self, directory: Path = None):
+        self.directory = Path(directory or settings.templates.directory)
+        self._templates = {}
+        self.load()
+
+    def load(self) -> int:
+        self._templates = {}
+        if not self.directory.is_dir():
+            return 0
+        for path in sorted(self.directory.glob("*.json")):
+            try:
+                self.register(LayoutTemplate.from_dict(json.loads(path.read_text(encoding="utf-8"))))
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.error(f"❌ Invalid layout template {path.name}: {e}")
+        count = len({id(t) for t in self._templates.values()})
+        logger.info(f"Loaded {count} layout templates.")
+        return count
+
+    def register(self, template: LayoutTemplate):
+        for key in (template.key, *template.aliases):
+            self._templates[key.strip().lower()] = template
+
+    def get(self, key):
+        """Return the template for a clg_code / university id / alias, or None."""
+        if not key:
+            return None
+        return self._templates.get(str(key).strip().lower())
+
+
+_registry = None
+_registry_lock = threading.Lock()
+_field_pool = None
+
+
+def get_registry() -> TemplateRegistry:
+    """Process-wide registry, loaded on first use."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = TemplateRegistry()
+    return _registry
+
+
+def _reset_after_fork():
+    # Worker threads do not survive fork(); a child must never submit to the parent's pool
+    global _field_pool, _registry_lock
+    _field_pool = None
+    _registry_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _get_field_pool() -> ThreadPoolExecutor:
+    # Each pytesseract call is its own tesseract process, so threads OCR fields in parallel
+    global _field_pool
+    if _field_pool is None:
+        with _registry_lock:
+            if _field_pool is None:
+                _field_pool = ThreadPoolExecutor(max_workers=settings.templates.ocr_workers,
+                                                 thread_name_prefix="field-ocr")
+    return _field_pool
+
+
+def _ocr_field(crop, field_box: FieldBox, lang: str):
+    import pytesseract
+
+    data = pytesseract.image_to_data(crop, lang=lang, config=field_box.tesseract_config,
+                                     output_type=pytesseract.Output.DICT)
+    words, confidences = [], []
+    for text, conf in zip(data["text"], data["conf"]):
+        text = text.strip()
+        if not text:
+            continue
+        words.append(text)
+        try:
+            confidences.append(float(conf))
+        except (TypeError, ValueError):
+            pass
+    confidence = sum(confidences) / len(confidences) / 100.0 if confidences else 0.0
+    return " ".join(words), round(max(confidence, 0.0), 3)
+
+
+def ocr_fields(image, template: LayoutTemplate, lang: str = "eng") -> dict:
+    """OCR only the template's field boxes of a PIL image.
+
+    Fields run in parallel on a thread pool in the main process. Inside a worker process
+    (e.g. main's OCR process pool, which already runs one page per CPU) they run one after
+    another, so the machine is not oversubscribed.
+
+    Returns {field: {"value": str or None, "confidence": 0..1, "box": [l, t, r, b]}}.
+    """
+    width, height = image.size
+    boxes = {f.name: f.pixel_box(width, height) for f in template.fields}
+    readable = [f for f in template.fields
+                if boxes[f.name][2] > boxes[f.name][0] and boxes[f.name][3] > boxes[f.name][1]]
+    if multiprocessing.parent_process() is not None:
+        read = {f.name: _ocr_field(image.crop(boxes[f.name]), f, lang) for f in readable}
+    else:
+        pool = _get_field_pool()
+        futures = {f.name: pool.submit(_ocr_field, image.crop(boxes[f.name]), f, lang) for f in readable}
+        read = {name: future.result() for name, future in futures.items()}
+
+    results = {}
+    for f in template.fields:
+        value, confidence = read.get(f.name, ("", 0.0))
+        results[f.name] = {"value": value or None, "confidence": confidence, "box": list(boxes[f.name])}
+    return results
@@ -1,3 +1,4 @@
-from src.certificate_security.certificate_hash import CertificateCipher
+from src.certificate_security.certificate_hash import BulkResult, CertificateCipher, CipherSession
+from src.certificate_security.perceptual_hash import PerceptualHashIndex, image_hash, hash_to_hex
 
-__all__ = ["CertificateCipher"]
\ No newline at end of file
+__all__ = ["BulkResult", "CertificateCipher", "CipherSession", "PerceptualHashIndex", "image_hash", "hash_to_hex"]
\ No newline at end of file
@@ -2,9 +2,21 @@
 1. This file is part of Certificate Cipher Tool.
 2. It provides functionalities to encrypt and decrypt JSON data and images using password-based encryption.
 3. It also includes a feature to add a watermark to decrypted images.
+4. Images can be encrypted as a stream: chunked AES-256-GCM with a compact binary header,
+   processed in fixed-size chunks so memory stays flat, with raw bytes output for bytea.
+5. Bulk APIs spread encryption / decryption of whole archives over a process pool.
+6. Derived keys are cached, and a session mode derives one master key per password and
+   encrypts each payload with its own HKDF subkey, so PBKDF2 runs once per session.
 
 Functions name : 
     - derive_key()
+    - open_session()
+    - encrypt_stream()
+    - decrypt_stream()
+    - encrypt_many()
+    - decrypt_many()
+    - encrypt_images()
+    - reencrypt_many()
     - encrypt()
     - decrypt()
     - print_table()
@@ -13,42 +25,225 @@ Functions name :
     - add_watermark()
 '''
 
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, InvalidToken
 import base64
+import hashlib
+import hmac
 import os
 import json
 import io
+import struct
 import sys
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Optional
 
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from rich.console import Console
 from rich.table import Table
 from PIL import Image, ImageDraw, ImageFont
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from src.core.config import settings
 from src.core.logging import get_logger
 
 console = Console()
 logger = get_logger("Certificate Cipher Tool")
 
+PBKDF2_ITERATIONS = 390000
+SALT_SIZE = 16
+# Session tokens: MAGIC + master salt + per-message nonce + Fernet token
+SESSION_MAGIC = b"CCS1"
+NONCE_SIZE = 16
+# First character of every base64 Fernet token (version byte 0x80)
+FERNET_TOKEN_PREFIX = b"g"
+
+# Streaming format: header = MAGIC | chunk size (u32) | salt | nonce prefix, then records of
+# u32 length (high bit marks the final chunk) + AES-GCM ciphertext with its 16-byte tag.
+# Chunk nonce = prefix (7) | counter (u32) | final flag (1), so reordering, truncation
+# and chunk-dropping all fail authentication.
+STREAM_MAGIC = b"CCG1"
+STREAM_NONCE_PREFIX_SIZE = 7
+STREAM_HEADER = struct.Struct(f">4sI{SALT_SIZE}s{STREAM_NONCE_PREFIX_SIZE}s")
+STREAM_RECORD = struct.Struct(">I")
+STREAM_FINAL_FLAG = 0x80000000
+STREAM_CHUNK_SIZE = 64 * 1024
+# Largest chunk size encrypt_stream writes; decrypt_stream refuses headers claiming more,
+# since the header is read before anything is authenticated
+STREAM_MAX_CHUNK_SIZE = 4 * 1024 * 1024
+GCM_TAG_SIZE = 16
+
+WATERMARK_FONT = "arialbd.ttf"
+# Certificates come in a handful of standard sizes, so a small cache covers them
+WATERMARK_CACHE_SIZE = 16
+
+# PBKDF2 results keyed by (salt, HMAC of the password under a random per-process key).
+# Neither the password nor an unsalted, offline-guessable hash of it is kept in memory.
+_key_cache = OrderedDict()
+_key_cache_lock = threading.Lock()
+_key_cache_secret = os.urandom(32)
+
+
+def _derive_raw_key(password: str, salt: bytes) -> bytes:
+    """PBKDF2-HMAC-SHA256 of password and salt, memoised in a bounded LRU."""
+    cache_key = (salt, hmac.new(_key_cache_secret, password.encode(), hashlib.sha256).digest())
+    with _key_cache_lock:
+        if cache_key in _key_cache:
+            _key_cache.move_to_end(cache_key)
+            return _key_cache[cache_key]
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=PBKDF2_ITERATIONS,
+        backend=default_backend()
+    )
+    key = kdf.derive(password.encode())
+    with _key_cache_lock:
+        _key_cache[cache_key] = key
+        while len(_key_cache) > settings.security.kdf_cache_size:
+            _key_cache.popitem(last=False)
+    return key
+
+
+def _subkey(master_key: bytes, nonce: bytes) -> Fernet:
+    """Per-message Fernet key derived from a session master key with HKDF."""
+    hkdf = HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=nonce,
+        info=b"certificate-cipher session subkey",
+        backend=default_backend()
+    )
+    return Fernet(base64.urlsafe_b64encode(hkdf.derive(master_key)))
+
+
+def _read_full(src, size: int) -> bytes:
+    """Read up to `size` bytes, looping over short reads; shorter only at EOF."""
+    parts, remaining = [], size
+    while remaining:
+        part = src.read(remaining)
+        if not part:
+            break
+        parts.append(part)
+        remaining -= len(part)
+    return b"".join(parts)
+
+
+def _stream_nonce(prefix: bytes, counter: int, final: bool) -> bytes:
+    return prefix + struct.pack(">IB", counter, 1 if final else 0)
+
+
+@dataclass
+class BulkResult:
+    """Outcome of one item in a bulk call; failures carry the error instead of raising."""
+    index: int
+    ok: bool
+    value: Any = None
+    error: Optional[str] = None
+
+
+@lru_cache(maxsize=WATERMARK_CACHE_SIZE)
+def _load_font(font_name: str, font_size: int):
+    """Load a TrueType font once per (name, size); falls back to PIL's default font."""
+    try:
+        return ImageFont.truetype(font_name, font_size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=WATERMARK_CACHE_SIZE)
+def _watermark_overlay(size: tuple, watermark_text: str, font_name: str):
+    """Render the rotated watermark for an image size once.
+    Returns (RGBA overlay cropped to the visible text, (x, y) paste offset).
+    Cached overlays are shared, so callers must not modify them."""
+    width, height = size
+    # Large font: scale based on image diagonal
+    diagonal = int((width**2 + height**2) ** 0.5)
+    font = _load_font(font_name, int(diagonal * 0.09))
+
+    temp = Image.new("RGBA", size, (255, 255, 255, 0))
+    draw = ImageDraw.Draw(temp)
+
+    # Get text bounding box and position in center of image
+    bbox = draw.textbbox((0, 0), watermark_text, font=font)
+    text_width, text_height = bbox[2] - bbox[0], bbox[3] - bbox[1]
+    x = (width - text_width) // 2
+    y = (height - text_height) // 2
+
+    draw.text((x, y), watermark_text, font=font, fill=(202, 206, 207, 255))
+    rotated = temp.rotate(45, expand=False)
+
+    visible = rotated.getchannel("A").getbbox() or (0, 0, 1, 1)
+    return rotated.crop(visible), (visible[0], visible[1])
+
+
+class CipherSession:
+    """
+    Encrypts many payloads under one password while running PBKDF2 only once.
+    The master key is derived from the password and a session salt; every payload gets
+    a fresh random nonce and its own HKDF subkey. Tokens decrypt with
+    CertificateCipher.decrypt / decrypt_image given the same password.
+    """
+
+    def __init__(self, password: str):
+        self.salt = os.urandom(SALT_SIZE)
+        self._master_key = _derive_raw_key(password, self.salt)
+
+    def _seal(self, plain_bytes: bytes) -> str:
+        nonce = os.urandom(NONCE_SIZE)
+        token = _subkey(self._master_key, nonce).encrypt(plain_bytes)
+        return base64.urlsafe_b64encode(SESSION_MAGIC + self.salt + nonce + token).decode()
+
+    def encrypt(self, data: dict) -> str:
+        cipher_text = self._seal(json.dumps(data).encode())
+        logger.info("Data encrypted successfully (session key).")
+        return cipher_text
+
+    def encrypt_image(self, image_bytes: bytes) -> str:
+        cipher_text = self._seal(image_bytes)
+        logger.info("Image encrypted successfully (session key).")
+        return cipher_text
+
+
 class CertificateCipher:
     def derive_key(self, password: str, salt: bytes) -> bytes:
-        """Derive a secret key from the password and salt using PBKDF2."""
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=390000,
-            backend=default_backend()
-        )
-        return base64.urlsafe_b64encode(kdf.derive(password.encode()))
+        """Derive a secret key from the password and salt using PBKDF2 (cached)."""
+        return base64.urlsafe_b64encode(_derive_raw_key(password, salt))
+
+    def open_session(self, password: str) -> CipherSession:
+        """Start a session that pays for PBKDF2 once and encrypts many payloads."""
+        return CipherSession(password)
+
+    def _open_token(self, cipher_text: str, password: str) -> bytes:
+        """Decrypt a legacy (salt + Fernet) or session token to plain bytes.
+
+        The format is decided up front, so a wrong password costs one PBKDF2 run: a
+        session token has the magic and its Fernet token (whose version byte 0x80 is
+        'g' in base64) starts right after the session header.
+        """
+        data = base64.urlsafe_b64decode(cipher_text.encode())
+        header_size = len(SESSION_MAGIC) + SALT_SIZE + NONCE_SIZE
+        if data.startswith(SESSION_MAGIC) and data[header_size:header_size + 1] == FERNET_TOKEN_PREFIX:
+            salt = data[len(SESSION_MAGIC):len(SESSION_MAGIC) + SALT_SIZE]
+            nonce = data[len(SESSION_MAGIC) + SALT_SIZE:header_size]
+            return _subkey(_derive_raw_key(password, salt), nonce).decrypt(data[header_size:])
+        salt, ct = data[:SALT_SIZE], data[SALT_SIZE:]
+        key = self.derive_key(password, salt)
+        f = Fernet(key)
+        return f.decrypt(ct)
 
     # ---------------- JSON / Dict Encryption ----------------
     def encrypt(self, data: dict, password: str) -> str:
         plain_text = json.dumps(data)
-        salt = os.urandom(16)
+        salt = os.urandom(SALT_SIZE)
         key = self.derive_key(password, salt)
         f = Fernet(key)
         cipher_text = f.encrypt(plain_text.encode())
@@ -56,11 +251,7 @@ class CertificateCipher:
         return base64.urlsafe_b64encode(salt + cipher_text).decode()
 
     def decrypt(self, cipher_text: str, password: str) -> dict:
-        data = base64.urlsafe_b64decode(cipher_text.encode())
-        salt, ct = data[:16], data[16:]
-        key = self.derive_key(password, salt)
-        f = Fernet(key)
-        plain_text = f.decrypt(ct).decode()
+        plain_text = self._open_token(cipher_text, password).decode()
         logger.info("Data decrypted successfully.")
         return json.loads(plain_text)
 
@@ -72,60 +263,185 @@ class CertificateCipher:
             table.add_row(key, str(value))
         console.print(table)
 
+    # ---------------- Streaming Encryption ----------------
+    def encrypt_stream(self, src, dst, password: str, chunk_size: int = STREAM_CHUNK_SIZE) -> int:
+        """Encrypt file-like `src` into file-like `dst` in fixed-size AES-GCM chunks.
+        Only one chunk (plus one read-ahead) is held in memory. Returns bytes written."""
+        if not 0 < chunk_size <= STREAM_MAX_CHUNK_SIZE:
+            raise ValueError(f"chunk_size must be between 1 and {STREAM_MAX_CHUNK_SIZE} bytes")
+        salt = os.urandom(SALT_SIZE)
+        prefix = os.urandom(STREAM_NONCE_PREFIX_SIZE)
+        header = STREAM_HEADER.pack(STREAM_MAGIC, chunk_size, salt, prefix)
+        aead = AESGCM(_derive_raw_key(password, salt))
+        dst.write(header)
+        written = len(header)
+
+        counter = 0
+        chunk = _read_full(src, chunk_size)
+        while True:
+            next_chunk = _read_full(src, chunk_size) if len(chunk) == chunk_size else b""
+            final = not next_chunk
+            sealed = aead.encrypt(_stream_nonce(prefix, counter, final), chunk, header)
+            length = len(sealed) | (STREAM_FINAL_FLAG if final else 0)
+            dst.write(STREAM_RECORD.pack(length))
+            dst.write(sealed)
+            written += STREAM_RECORD.size + len(sealed)
+            if final:
+                break
+            chunk = next_chunk
+            counter += 1
+        logger.info("Stream encrypted successfully.")
+        return written
+
+    def decrypt_stream(self, src, dst, password: str) -> int:
+        """Decrypt a stream written by encrypt_stream into `dst`. Returns plaintext bytes."""
+        header = _read_full(src, STREAM_HEADER.size)
+        if len(header) != STREAM_HEADER.size:
+            raise ValueError("Encrypted stream is too short")
+        magic, chunk_size, salt, prefix = STREAM_HEADER.unpack(header)
+        if magic != STREAM_MAGIC:
+            raise ValueError("Not an encrypted certificate stream")
+        if not 0 < chunk_size <= STREAM_MAX_CHUNK_SIZE:
+            raise ValueError("Encrypted stream has an invalid chunk size")
+        aead = AESGCM(_derive_raw_key(password, salt))
+
+        counter = written = 0
+        while True:
+            record = _read_full(src, STREAM_RECORD.size)
+            if len(record) != STREAM_RECORD.size:
+                raise ValueError("Encrypted stream is truncated")
+            length, = STREAM_RECORD.unpack(record)
+            final = bool(length & STREAM_FINAL_FLAG)
+            length &= ~STREAM_FINAL_FLAG
+            # every chunk but the last is exactly chunk_size long
+            if length > chunk_size + GCM_TAG_SIZE or (not final and length != chunk_size + GCM_TAG_SIZE):
+                raise ValueError("Encrypted stream chunk has an invalid length")
+            sealed = _read_full(src, length)
+            if len(sealed) != length:
+                raise ValueError("Encrypted stream is truncated")
+            plain = aead.decrypt(_stream_nonce(prefix, counter, final), sealed, header)
+            dst.write(plain)
+            written += len(plain)
+            if final:
+                break
+            counter += 1
+        if src.read(1):
+            raise ValueError("Encrypted stream has trailing data after its final chunk")
+        logger.info("Stream decrypted successfully.")
+        return written
+
     # ---------------- Image Encryption ----------------
-    def encrypt_image(self, image_bytes: bytes, password: str) -> str:
-        salt = os.urandom(16)
+    def encrypt_image(self, image_bytes: bytes, password: str, raw: bool = False):
+        """Encrypt image bytes. Returns the legacy base64 token, or with `raw=True` the
+        compact streaming (AES-GCM) format as bytes, ready for a bytea column."""
+        if raw:
+            out = io.BytesIO()
+            self.encrypt_stream(io.BytesIO(image_bytes), out, password)
+            logger.info("Image encrypted successfully.")
+            return out.getvalue()
+        salt = os.urandom(SALT_SIZE)
         key = self.derive_key(password, salt)
         f = Fernet(key)
         cipher_bytes = f.encrypt(image_bytes)
         logger.info("Image encrypted successfully.")
         return base64.urlsafe_b64encode(salt + cipher_bytes).decode()
 
-    def decrypt_image(self, cipher_text: str, password: str) -> Image.Image:
-        data = base64.urlsafe_b64decode(cipher_text.encode())
-        salt, ct = data[:16], data[16:]
-        key = self.derive_key(password, salt)
-        f = Fernet(key)
-        decrypted_bytes = f.decrypt(ct)
-        image = Image.open(io.BytesIO(decrypted_bytes))
+    def decrypt_image(self, cipher_text, password: str) -> Image.Image:
+        """Decrypt a base64 token (str) or raw streaming-format bytes into an image."""
+        if isinstance(cipher_text, (bytes, bytearray, memoryview)):
+            out = io.BytesIO()
+            self.decrypt_stream(io.BytesIO(cipher_text), out, password)
+            out.seek(0)
+            image = Image.open(out)
+        else:
+            decrypted_bytes = self._open_token(cipher_text, password)
+            image = Image.open(io.BytesIO(decrypted_bytes))
         logger.info("Image decrypted successfully.")
         return image
 
+    # ---------------- Bulk Encryption ----------------
+    def _run_bulk(self, worker, items, processes: int = None, window: int = None):
+        """Run `worker` over items on a process pool, yielding BulkResults in input order.
+        At most `window` items are in flight, so huge archives are never fully loaded.
+        An item that cannot be sent to or returned from a worker (e.g. it does not pickle)
+        yields a failed BulkResult like any other error."""
+        processes = processes or os.cpu_count() or 1
+        window = window or processes * 4
+
+        def collect(index, future):
+            try:
+                return future.result()
+            except Exception as e:
+                return BulkResult(index=index, ok=False, error=f"{type(e).__name__}: {e}")
+
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            pending = deque()
+            for index, item in enumerate(items):
+                pending.append((index, pool.submit(_bulk_call, worker, index, item)))
+                if len(pending) >= window:
+                    yield collect(*pending.popleft())
+            while pending:
+                yield collect(*pending.popleft())
+
+    def encrypt_many(self, items, processes: int = None):
+        """Encrypt an iterable of (payload dict, password); yields BulkResult(value=token)."""
+        return self._run_bulk(_bulk_encrypt, items, processes)
+
+    def decrypt_many(self, items, processes: int = None):
+        """Decrypt an iterable of (token, password); yields BulkResult(value=dict)."""
+        return self._run_bulk(_bulk_decrypt, items, processes)
+
+    def encrypt_images(self, image_paths, password: str, raw: bool = False, processes: int = None):
+        """Encrypt image files; yields BulkResult(value=token or raw bytes)."""
+        return self._run_bulk(_bulk_encrypt_image, ((path, password, raw) for path in image_paths), processes)
+
+    def reencrypt_many(self, tokens, old_password: str, new_password: str, processes: int = None):
+        """Key rotation: decrypt each token with the old password and re-encrypt it with the new one."""
+        return self._run_bulk(_bulk_reencrypt, ((token, old_password, new_password) for token in tokens), processes)
+
     # ---------------- Add Watermark ----------------
-    def add_watermark(self, image: Image.Image, watermark_text: str = "VERIFIED") -> Image.Image:
+    def add_watermark(self, image: Image.Image, watermark_text: str = "VERIFIED",
+                      font_name: str = WATERMARK_FONT) -> Image.Image:
         # Convert image to RGBA
         image = image.convert("RGBA")
-        
-        # Create a transparent layer same size as image
-        txt_layer = Image.new("RGBA", image.size, (255, 255, 255, 0))
-        draw = ImageDraw.Draw(txt_layer)
-
-        # Large font: scale based on image diagonal
-        diagonal = int((image.width**2 + image.height**2) ** 0.5)
-        font_size = int(diagonal * 0.09)  # 15% of diagonal
-        try:
-            font = ImageFont.truetype("arialbd.ttf", font_size)
-        except:
-            font = ImageFont.load_default()
-
-        # Get text bounding box
-        bbox = draw.textbbox((0, 0), watermark_text, font=font)
-        text_width, text_height = bbox[2] - bbox[0], bbox[3] - bbox[1]
-
-        # Position in center of image
-        x = (image.width - text_width) // 2
-        y = (image.height - text_height) // 2
-
-        # Draw rotated watermark directly on txt_layer
-        temp = Image.new("RGBA", image.size, (255, 255, 255, 0))
-        temp_draw = ImageDraw.Draw(temp)
-        temp_draw.text((x, y), watermark_text, font=font, fill=(202, 206, 207, 255))
-        rotated = temp.rotate(45, expand=False)
-        
-        # Merge watermark with original image
-        watermarked = Image.alpha_composite(image, rotated)
+
+        # Pre-rendered, pre-rotated overlay for this size/text/font, cropped to the text
+        overlay, offset = _watermark_overlay(image.size, watermark_text, font_name)
+
+        # Merge watermark in place, only over the region the text covers
+        image.alpha_composite(overlay, dest=offset)
         logger.info("Watermark added to image successfully.")
-        return watermarked.convert("RGB")
+        return image.convert("RGB")
+
+
+# ---------------- Bulk workers (top-level so they can be pickled) ----------------
+def _bulk_call(worker, index, item) -> BulkResult:
+    try:
+        return BulkResult(index=index, ok=True, value=worker(item))
+    except Exception as e:
+        return BulkResult(index=index, ok=False, error=f"{type(e).__name__}: {e}")
+
+
+def _bulk_encrypt(item):
+    payload, password = item
+    return CertificateCipher().encrypt(payload, password)
+
+
+def _bulk_decrypt(item):
+    token, password = item
+    return CertificateCipher().decrypt(token, password)
+
+
+def _bulk_encrypt_image(item):
+    path, password, raw = item
+    with open(path, "rb") as f:
+        return CertificateCipher().encrypt_image(f.read(), password, raw=raw)
+
+
+def _bulk_reencrypt(item):
+    token, old_password, new_password = item
+    cipher = CertificateCipher()
+    return cipher.encrypt(cipher.decrypt(token, old_password), new_password)
 
 
 if __name__ == "__main__":
@@ -161,6 +477,18 @@ if __name__ == "__main__":
     except Exception as e:
         console.print(f"[red]Decryption failed: {e}[/red]")
 
+    # ---------------- Session Encryption (one PBKDF2 for many payloads) ----------------
+    session = cert_tool.open_session(password)
+    session_tokens = [session.encrypt(certificate_data) for _ in range(3)]
+    console.print(f"\n[cyan]Encrypted {len(session_tokens)} payloads with one session key.[/cyan]")
+    assert all(cert_tool.decrypt(token, password) == certificate_data for token in session_tokens)
+
+    # ---------------- Bulk Encryption (process pool, ordered, per-item errors) ----------------
+    bulk_items = [(certificate_data, password), ({"bad": object()}, password)]
+    for result in cert_tool.encrypt_many(bulk_items, processes=2):
+        status = "[green]ok[/green]" if result.ok else f"[red]failed: {result.error}[/red]"
+        console.print(f"Bulk item {result.index}: {status}")
+
     # ---------------- Encrypt & Decrypt Image ----------------
     try:
         # Load sample image (replace with user input bytes in real scenario)
@@ -171,6 +499,10 @@ if __name__ == "__main__":
         console.print("\n[cyan]Encrypted Image Cipher Text:[/cyan]")
         print(encrypted_image[:100] + "...")  # print only first 100 chars
 
+        # Compact binary (AES-GCM stream) format for bytea storage
+        raw_encrypted_image = cert_tool.encrypt_image(image_bytes, password, raw=True)
+        console.print(f"[cyan]Base64 token: {len(encrypted_image)} bytes, raw stream: {len(raw_encrypted_image)} bytes[/cyan]")
+
         decrypted_image = cert_tool.decrypt_image(encrypted_image, password)
         watermarked_image = cert_tool.add_watermark(decrypted_image)
 
@@ -184,4 +516,4 @@ if __name__ == "__main__":
     except Exception as e:
         console.print(f"[red]Image encryption/decryption failed: {e}[/red]")
 
-print("\nThank you for using the Certificate Cipher Tool!")
+    print("\nThank you for using the Certificate Cipher Tool!")
@@ -0,0 +1,203 @@
+'''
+1. Perceptual hashes (pHash / dHash) of certificate images, stored as 16 hex digits in
+   certificates.image_hash.
+2. A multi-index Hamming index over those hashes that finds every issued certificate within
+   a small Hamming distance of an upload (re-scans, recompressions, light edits).
+
+Functions name :
+    - phash()
+    - dhash()
+    - image_hash()
+    - hash_to_hex()
+    - hex_to_hash()
+    - PerceptualHashIndex.load() / add() / remove() / query()
+'''
+
+import io
+import os
+import sys
+import threading
+from functools import lru_cache
+from itertools import combinations
+
+import numpy as np
+from PIL import Image
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from src.core.config import settings
+from src.core.logging import get_logger
+
+logger = get_logger("Perceptual Hash")
+
+HASH_BITS = 64
+HASH_SIZE = 8            # 8x8 bits
+PHASH_IMAGE_SIZE = 32    # pHash keeps the low 8x8 frequencies of a 32x32 DCT
+# The index splits each hash into CHUNKS substrings of CHUNK_BITS bits. Two hashes within
+# distance r agree to within floor(r / CHUNKS) bits on at least one substring, so probing
+# each substring table with that many flipped bits finds every candidate.
+CHUNKS = 4
+CHUNK_BITS = HASH_BITS // CHUNKS
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+_popcount = int.bit_count if hasattr(int, "bit_count") else (lambda x: bin(x).count("1"))
+
+
+def _grayscale(image, size):
+    """Open `image` (PIL image, path or bytes) as a small grayscale array of `size` (w, h)."""
+    if isinstance(image, (bytes, bytearray)):
+        image = Image.open(io.BytesIO(image))
+    elif not isinstance(image, Image.Image):
+        image = Image.open(image)
+    # For JPEGs, let the decoder downscale by up to 8x instead of decoding full resolution
+    image.draft("L", (size[0] * 4, size[1] * 4))
+    return np.asarray(image.convert("L").resize(size, Image.LANCZOS), dtype=np.float32)
+
+
+def _bits_to_int(bits) -> int:
+    value = 0
+    for bit in bits.ravel():
+        value = (value << 1) | int(bit)
+    return value
+
+
+@lru_cache(maxsize=None)
+def _dct_matrix(n):
+    k = np.arange(n).reshape(-1, 1)
+    return np.cos(np.pi * (2 * np.arange(n) + 1) * k / (2 * n)).astype(np.float32)
+
+
+def phash(image) -> int:
+    """64-bit DCT hash: sign of each low-frequency coefficient relative to their median."""
+    pixels = _grayscale(image, (PHASH_IMAGE_SIZE, PHASH_IMAGE_SIZE))
+    dct = _dct_matrix(PHASH_IMAGE_SIZE)
+    low = (dct @ pixels @ dct.T)[:HASH_SIZE, :HASH_SIZE]
+    return _bits_to_int(low > np.median(low))
+
+
+def dhash(image) -> int:
+    """64-bit difference hash: whether each pixel is brighter than its right neighbour."""
+    pixels = _grayscale(image, (HASH_SIZE + 1, HASH_SIZE))
+    return _bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+
+
+HASH_FUNCTIONS = {"phash": phash, "dhash": dhash}
+
+
+def image_hash(image, algorithm: str = None) -> int:
+    """Hash with the configured algorithm (PHASH_ALGORITHM); all stored hashes must share it."""
+    algorithm = algorithm or settings.phash.algorithm
+    if algorithm not in HASH_FUNCTIONS:
+        raise ValueError(f"Unknown perceptual hash '{algorithm}', expected one of {list(HASH_FUNCTIONS)}")
+    return HASH_FUNCTIONS[algorithm](image)
+
+
+def hash_to_hex(value: int) -> str:
+    return f"{value:016x}"
+
+
+def hex_to_hash(text: str) -> int:
+    """Parse a stored image_hash; raises ValueError for values that are not 64-bit hex."""
+    text = text.strip().lower()
+    if len(text) != HASH_BITS // 4:
+        raise ValueError(f"not a {HASH_BITS}-bit hex hash: {text!r}")
+    return int(text, 16)
+
+
+@lru_cache(maxsize=None)
+def _flip_masks(radius):
+    """Every CHUNK_BITS-bit mask with at most `radius` bits set (0 first)."""
+    masks = [0]
+    for r in range(1, radius + 1):
+        for positions in combinations(range(CHUNK_BITS), r):
+            mask = 0
+            for p in positions:
+                mask |= 1 << p
+            masks.append(mask)
+    return tuple(masks)
+
+
+class PerceptualHashIndex:
+    """
+    In-memory multi-index hashing over 64-bit perceptual hashes.
+
+    Each hash is split into CHUNKS 16-bit substrings with one dict per substring position.
+    A query probes every substring table with all masks of up to floor(r / CHUNKS) bits and
+    verifies the candidates' full Hamming distance, so the cost depends on the number of
+    near neighbours rather than on the number of certificates.
+
+    Keys are certificate ids; a key has at most one hash.
+    """
+
+    def __init__(self, max_distance: int = None):
+        self.max_distance = max_distance if max_distance is not None else settings.phash.max_distance
+        self._hashes = {}  # key -> hash
+        self._tables = [dict() for _ in range(CHUNKS)]  # substring -> set of keys
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._hashes)
+
+    @staticmethod
+    def _chunks(value):
+        return [(value >> (i * CHUNK_BITS)) & CHUNK_MASK for i in range(CHUNKS)]
+
+    def add(self, key, value):
+        """Index `value` (int or hex string) under `key`, replacing any previous hash."""
+        if isinstance(value, str):
+            value = hex_to_hash(value)
+        with self._lock:
+            self._remove(key)
+            self._hashes[key] = value
+            for table, chunk in zip(self._tables, self._chunks(value)):
+                table.setdefault(chunk, set()).add(key)
+
+    def remove(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key):
+        value = self._hashes.pop(key, None)
+        if value is None:
+            return
+        for table, chunk in zip(self._tables, self._chunks(value)):
+            keys = table.get(chunk)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del table[chunk]
+
+    def load(self, rows) -> int:
+        """Add (key, hex hash) rows, e.g. from SupabaseDB.get_certificate_image_hashes().
+           Rows whose image_hash is not a 64-bit hex hash are skipped; returns the count added."""
+        added = skipped = 0
+        for key, value in rows:
+            try:
+                self.add(str(key), value)
+                added += 1
+            except (TypeError, ValueError):
+                skipped += 1
+        if skipped:
+            logger.warning(f"⚠️ Skipped {skipped} certificates whose image_hash is not a perceptual hash.")
+        logger.info(f"Indexed {added} certificate image hashes.")
+        return added
+
+    def query(self, value, max_distance: int = None) -> list:
+        """Return [(key, distance)] for every indexed hash within `max_distance`, nearest first."""
+        if isinstance(value, str):
+            value = hex_to_hash(value)
+        max_distance = self.max_distance if max_distance is None else max_distance
+        radius = max_distance // CHUNKS
+        masks = _flip_masks(radius)
+
+        candidates = set()
+        with self._lock:
+            for table, chunk in zip(self._tables, self._chunks(value)):
+                if len(table) < len(masks):
+                    # sparse table: scanning its keys is cheaper than probing every mask
+                    probes = [keys for c, keys in table.items() if _popcount(c ^ chunk) <= radius]
+                else:
+                    probes = [table[c] for c in map(chunk.__xor__, masks) if c in table]
+                candidates.update(*probes)
+            hashes = self._hashes
+            matches = [(key, _popcount(hashes[key] ^ value)) for key in candidates]
+        return sorted((m for m in matches if m[1] <= max_distance), key=lambda m: m[1])
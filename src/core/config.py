@@ -11,13 +11,29 @@ class Config:
         self.app_name = "Fake Certificate Authority"
         self.app_version = "0.1.0"
         self.environment = os.getenv("ENVIRONMENT", "development")
-        self.debug = os.getenv("DEBUG", "true").lower() == "true"
+        self.debug = os.getenv("DEBUG", "false").lower() == "true"
+        # debug artifacts waiting to be written; further ones are dropped
+        self.debug_queue_size = int(os.getenv("DEBUG_QUEUE_SIZE", "8"))
         self.log_level = os.getenv("LOG_LEVEL", "INFO").upper()
+        self.log_format = os.getenv("LOG_FORMAT", "text").lower()  # "text" or "json"
+        self.log_max_bytes = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+        self.log_backup_count = int(os.getenv("LOG_BACKUP_COUNT", "5"))
 
         # Sub-Configs
         self.storage = self._create_storage_config()
         self.security = self._create_security_config()
         self.monitoring = self._create_monitoring_config()
+        self.ollama = self._create_ollama_config()
+        self.cache = self._create_cache_config()
+        self.routing = self._create_routing_config()
+        self.doctr = self._create_doctr_config()
+        self.database = self._create_database_config()
+        self.batch = self._create_batch_config()
+        self.jobs = self._create_jobs_config()
+        self.phash = self._create_phash_config()
+        self.embeddings = self._create_embeddings_config()
+        self.templates = self._create_templates_config()
+        self.rules = self._create_rules_config()
 
     # Storage Config
     def _create_storage_config(self):
@@ -41,6 +57,12 @@ class Config:
     def _create_security_config(self):
         class SecurityConfig:
             secret_key = os.getenv("SECRET_KEY", "dev_secret_key_change_in_prod")
+            # HMAC key for the searchable university private key fingerprints. Required, and
+            # deliberately separate from SECRET_KEY: changing it invalidates every stored
+            # fingerprint, so it must not rotate along with the session secret.
+            key_fingerprint_secret = os.getenv("KEY_FINGERPRINT_SECRET")
+            # Number of PBKDF2-derived certificate keys kept in memory
+            kdf_cache_size = int(os.getenv("KDF_CACHE_SIZE", "256"))
             encrypt_credentials = os.getenv("ENCRYPT_CREDENTIALS", "true").lower() == "true"
             enable_rate_limiting = True
             audit_logging = True
@@ -58,6 +80,128 @@ class Config:
 
         return MonitoringConfig()
 
+    # Ollama Config
+    def _create_ollama_config(self):
+        class OllamaConfig:
+            base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+            timeout = float(os.getenv("OLLAMA_TIMEOUT", "60"))
+            connect_timeout = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "5"))
+            max_connections = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "10"))
+            max_concurrency = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "4"))
+
+        return OllamaConfig()
+
+    # Result Cache Config
+    def _create_cache_config(self):
+        class CacheConfig:
+            max_entries = int(os.getenv("RESULT_CACHE_ENTRIES", "512"))
+            use_disk = os.getenv("RESULT_CACHE_DISK", "false").lower() == "true"
+            max_disk_bytes = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+        return CacheConfig()
+
+    # Model Routing Config
+    def _create_routing_config(self):
+        class RoutingConfig:
+            ocr_quality_threshold = float(os.getenv("OCR_QUALITY_THRESHOLD", "0.6"))
+            min_words = int(os.getenv("OCR_MIN_WORDS", "8"))
+
+        return RoutingConfig()
+
+    # Doctr OCR Config
+    def _create_doctr_config(self):
+        class DoctrConfig:
+            max_batch_size = int(os.getenv("DOCTR_MAX_BATCH_SIZE", "8"))
+            max_wait_ms = float(os.getenv("DOCTR_MAX_WAIT_MS", "10"))
+            # "default" (db_resnet50 + crnn_vgg16_bn) or "light" (linknet_resnet18 + crnn_mobilenet_v3_small)
+            arch = os.getenv("DOCTR_ARCH", "default").lower()
+            warm_up_on_startup = os.getenv("DOCTR_WARM_UP", "false").lower() == "true"
+
+        return DoctrConfig()
+
+    # Database Config
+    def _create_database_config(self):
+        class DatabaseConfig:
+            pool_min = int(os.getenv("DB_POOL_MIN", "1"))
+            pool_max = int(os.getenv("DB_POOL_MAX", "10"))
+            # seconds a caller waits for a free connection before PoolError is raised
+            pool_timeout = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+            # bcrypt cost used by bulk student imports (bcrypt's own default is 12)
+            bulk_bcrypt_rounds = int(os.getenv("DB_BULK_BCRYPT_ROUNDS", "12"))
+
+        return DatabaseConfig()
+
+    # Batch Upload Config
+    def _create_batch_config(self):
+        class BatchConfig:
+            max_files = int(os.getenv("BATCH_MAX_FILES", "500"))
+            max_file_bytes = int(os.getenv("BATCH_MAX_FILE_BYTES", str(25 * 1024 * 1024)))
+            max_total_bytes = int(os.getenv("BATCH_MAX_TOTAL_BYTES", str(512 * 1024 * 1024)))
+            # zip members expanding more than this many times their compressed size are refused
+            max_compression_ratio = float(os.getenv("BATCH_MAX_COMPRESSION_RATIO", "100"))
+            # files classified at once; the rest wait until a slot frees up
+            concurrency = int(os.getenv("BATCH_CONCURRENCY", str(2 * (os.cpu_count() or 2))))
+
+        return BatchConfig()
+
+    # Job Queue Config
+    def _create_jobs_config(self):
+        class JobsConfig:
+            workers = int(os.getenv("JOB_WORKERS", "4"))
+            # submissions beyond this many queued jobs are rejected (HTTP 429)
+            max_pending = int(os.getenv("JOB_MAX_PENDING", "100"))
+            db_path = Path(os.getenv("JOB_DB_PATH", str(Path(self.storage.cache_dir) / "jobs.sqlite3")))
+            # finished jobs older than this are pruned (at startup and every prune_interval_s)
+            ttl_hours = float(os.getenv("JOB_TTL_HOURS", "24"))
+            prune_interval_s = float(os.getenv("JOB_PRUNE_INTERVAL_S", "3600"))
+            # a running job whose owner has not renewed its lease for this long is requeued
+            lease_s = float(os.getenv("JOB_LEASE_S", "60"))
+
+        return JobsConfig()
+
+    # Perceptual Hash Config
+    def _create_phash_config(self):
+        class PhashConfig:
+            # "phash" (DCT) or "dhash" (gradient); every stored image_hash must use the same one
+            algorithm = os.getenv("PHASH_ALGORITHM", "phash").lower()
+            # Hamming distance (of 64 bits) at which an upload counts as a near duplicate;
+            # up to 7 the index probes at most one flipped bit per 16-bit substring (fastest)
+            max_distance = int(os.getenv("PHASH_MAX_DISTANCE", "7"))
+            load_on_startup = os.getenv("PHASH_LOAD_ON_STARTUP", "true").lower() == "true"
+            # skip OCR and the models for uploads that match an issued certificate (the
+            # result then only carries near_duplicates); otherwise matches are just flagged
+            short_circuit = os.getenv("PHASH_SHORT_CIRCUIT", "false").lower() == "true"
+
+        return PhashConfig()
+
+    # Embedding Store Config
+    def _create_embeddings_config(self):
+        class EmbeddingsConfig:
+            # dtype the bytea embedding columns were written with
+            source_dtype = os.getenv("EMBEDDING_SOURCE_DTYPE", "float32").lower()
+            # in-memory / snapshot dtype: float32 is scored zero-copy from the mmap,
+            # float16 halves memory but is upcast on every query
+            dtype = os.getenv("EMBEDDING_DTYPE", "float32").lower()
+
+        return EmbeddingsConfig()
+
+    # Layout Template Config
+    def _create_templates_config(self):
+        class TemplatesConfig:
+            # one JSON layout per university / clg_code
+            directory = Path(os.getenv("LAYOUT_TEMPLATES_DIR", str(Path(self.storage.data_dir) / "templates")))
+            ocr_workers = int(os.getenv("TEMPLATE_OCR_WORKERS", str(os.cpu_count() or 4)))
+
+        return TemplatesConfig()
+
+    # Rule-based Field Extraction Config
+    def _create_rules_config(self):
+        class RulesConfig:
+            # regex-extracted fields below this confidence are still asked of the LLM
+            min_confidence = float(os.getenv("RULES_MIN_CONFIDENCE", "0.7"))
+
+        return RulesConfig()
+
     # Helpers
     @property
     def is_production(self) -> bool:
@@ -1,5 +1,10 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import multiprocessing
 import sys
+import threading
 from functools import wraps
 from typing import Any
 from src.core.config import settings
@@ -7,29 +12,98 @@ import os
 
 os.makedirs(settings.storage.log_file.parent, exist_ok=True)
 
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Every named logger gets the same QueueHandler; one QueueListener thread owns the
+# real (stream + rotating file) handlers, so logging on the request path never does I/O.
+# The queue is a multiprocessing queue: forked children (OCR / bulk pool workers) keep
+# putting records on it and the parent's listener alone writes and rotates the log file.
+_queue_handler = None
+_listener = None
+_listener_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line (LOG_FORMAT=json)."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _build_handlers():
+    formatter = JsonFormatter() if settings.log_format == "json" else logging.Formatter(LOG_FORMAT)
+
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(formatter)
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        settings.storage.log_file,
+        maxBytes=settings.log_max_bytes,
+        backupCount=settings.log_backup_count,
+        encoding="utf-8",
+    )
+    file_handler.setFormatter(formatter)
+    return [handler, file_handler]
+
+
+def _start_listener():
+    global _listener
+    log_queue = multiprocessing.Queue()
+    _listener = logging.handlers.QueueListener(log_queue, *_build_handlers(), respect_handler_level=True)
+    _listener.start()
+    return log_queue
+
+
+def _get_queue_handler() -> logging.Handler:
+    global _queue_handler
+    with _listener_lock:
+        if _queue_handler is None:
+            _queue_handler = logging.handlers.QueueHandler(_start_listener())
+            atexit.register(shutdown_logging)
+    return _queue_handler
+
+
+def _restart_in_child():
+    # The listener thread does not survive fork(). The child keeps the inherited queue and
+    # leaves writing to the parent's listener; it must never stop that listener either.
+    # Pool workers flush the queue on exit (multiprocessing joins its feeder thread).
+    global _listener, _listener_lock
+    _listener_lock = threading.Lock()
+    _listener = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_in_child)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener (registered with atexit)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
 def get_logger(name:str = "fake_certificate_detection") -> logging.Logger:
     """Get a Logger instance"""
 
     logger = logging.getLogger(name)
 
     if not logger.handlers:
-        # basic configuration
-        handler = logging.StreamHandler(sys.stdout)
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-
-        file_handler = logging.FileHandler(settings.storage.log_file)
-        file_formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        file_handler.setFormatter(file_formatter)
-
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        logger.addHandler(file_handler)
-
-        logger.setLevel(logging.INFO)
+        logger.addHandler(_get_queue_handler())
+        logger.setLevel(getattr(logging, settings.log_level, logging.INFO))
     
     return logger
 
@@ -77,5 +151,8 @@ def audit_log(event: str, **kwargs):
 
 
 def performance_log(operation: str, duration: float, **kwargs):
+    from src.core.metrics import observe_stage
+
+    observe_stage(operation, duration)
     logger = get_logger()
     logger.info(f"PERF: {operation} took {duration:.2f}s") 
\ No newline at end of file
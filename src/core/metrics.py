@@ -0,0 +1,121 @@
+import time
+from contextlib import contextmanager
+
+from src.core.config import settings
+from src.core.logging import get_logger
+
+logger = get_logger("Metrics")
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram, start_http_server
+    PROMETHEUS_AVAILABLE = True
+except ImportError:  # metrics become no-ops without prometheus_client
+    PROMETHEUS_AVAILABLE = False
+
+ENABLED = PROMETHEUS_AVAILABLE and settings.monitoring.enable_metrics
+
+# Buckets from fast preprocessing (ms) up to slow vision-model calls (a minute)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+if ENABLED:
+    REQUESTS = Counter("cert_http_requests_total", "HTTP requests", ["method", "path", "status"])
+    IN_FLIGHT = Gauge("cert_http_requests_in_flight", "HTTP requests currently being served")
+    REQUEST_LATENCY = Histogram("cert_http_request_duration_seconds", "HTTP request latency",
+                                ["path"], buckets=LATENCY_BUCKETS)
+    STAGE_LATENCY = Histogram("cert_stage_duration_seconds", "Pipeline stage latency",
+                              ["stage"], buckets=LATENCY_BUCKETS)
+    ROUTING = Counter("cert_model_routing_total", "Model routing decisions", ["route"])
+    CACHE = Counter("cert_result_cache_total", "Result cache lookups", ["result"])
+    TOKENS = Counter("cert_llm_tokens_total", "LLM tokens reported by Ollama", ["model", "kind"])
+    DB_POOL = Gauge("cert_db_pool_connections", "Database pool connections", ["state"])
+    JOBS = Counter("cert_jobs_total", "Background jobs by outcome", ["status"])
+    JOB_QUEUE = Gauge("cert_job_queue", "Background job queue", ["state"])
+
+_server_started = False
+
+
+def start_metrics_server():
+    """Serve /metrics on settings.monitoring.metrics_port (once per process)."""
+    global _server_started
+    if not ENABLED or _server_started:
+        if settings.monitoring.enable_metrics and not PROMETHEUS_AVAILABLE:
+            logger.warning("Metrics enabled but prometheus_client is not installed.")
+        return
+    try:
+        start_http_server(settings.monitoring.metrics_port)
+        _server_started = True
+        logger.info(f"Metrics served on port {settings.monitoring.metrics_port}")
+    except OSError as e:
+        # another worker process already owns the port
+        logger.warning(f"Could not start metrics server: {e}")
+
+
+def observe_stage(stage: str, seconds: float):
+    if ENABLED and settings.monitoring.track_processing_time:
+        STAGE_LATENCY.labels(stage=stage).observe(seconds)
+
+
+@contextmanager
+def track_stage(stage: str):
+    """Time the enclosed block as a pipeline stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start)
+
+
+def record_request(method: str, path: str, status: int, seconds: float):
+    if ENABLED:
+        REQUESTS.labels(method=method, path=path, status=str(status)).inc()
+        REQUEST_LATENCY.labels(path=path).observe(seconds)
+
+
+@contextmanager
+def track_in_flight():
+    if not ENABLED:
+        yield
+        return
+    IN_FLIGHT.inc()
+    try:
+        yield
+    finally:
+        IN_FLIGHT.dec()
+
+
+def record_routing(route: str):
+    if ENABLED:
+        ROUTING.labels(route=route).inc()
+
+
+def record_cache(result: str):
+    if ENABLED:
+        CACHE.labels(result=result).inc()
+
+
+def record_tokens(model: str, prompt_tokens: int, completion_tokens: int):
+    if ENABLED and settings.monitoring.track_token_usage:
+        TOKENS.labels(model=model, kind="prompt").inc(prompt_tokens or 0)
+        TOKENS.labels(model=model, kind="completion").inc(completion_tokens or 0)
+
+
+def register_db_pool(pool):
+    """Export in-use / idle counts of a psycopg2 pool (read at scrape time)."""
+    if not ENABLED:
+        return
+    DB_POOL.labels(state="in_use").set_function(lambda: len(getattr(pool, "_used", {})))
+    DB_POOL.labels(state="idle").set_function(lambda: len(getattr(pool, "_pool", [])))
+    DB_POOL.labels(state="max").set_function(lambda: getattr(pool, "maxconn", 0))
+
+
+def record_job(status: str):
+    if ENABLED:
+        JOBS.labels(status=status).inc()
+
+
+def register_job_queue(job_queue):
+    """Export queued / running counts of a JobQueue (read at scrape time)."""
+    if not ENABLED:
+        return
+    JOB_QUEUE.labels(state="queued").set_function(lambda: job_queue.stats()["queued"])
+    JOB_QUEUE.labels(state="running").set_function(lambda: job_queue.stats()["running"])
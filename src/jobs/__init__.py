@@ -0,0 +1,4 @@
+from src.jobs.queue import JobQueue, QueueFull
+from src.jobs.store import JobStore
+
+__all__ = ["JobQueue", "QueueFull", "JobStore"]
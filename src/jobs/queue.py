@@ -0,0 +1,191 @@
+import asyncio
+import os
+import socket
+import time
+import uuid
+
+from src.core import metrics
+from src.core.config import settings
+from src.core.logging import get_logger
+from src.jobs.store import TERMINAL_STATES, JobStore
+
+logger = get_logger("Job Queue")
+
+
+class QueueFull(Exception):
+    """Raised by JobQueue.submit when `max_pending` jobs are already waiting."""
+
+
+class JobQueue:
+    """
+    Background certificate processing with bounded concurrency.
+
+    `submit` persists the upload and returns a job id immediately; `workers` asyncio tasks
+    run `handler(payload)` for queued jobs one at a time each. Once `max_pending` jobs are
+    waiting, further submissions raise QueueFull so callers can shed load (HTTP 429)
+    instead of queueing work that would time out anyway.
+
+    Job state lives in a JobStore (SQLite), so results can be polled after the fact. Every
+    process sharing the store (e.g. uvicorn workers) claims a job atomically before running
+    it, so each job runs once. Running jobs hold a lease that a maintenance task renews;
+    jobs whose owner died are requeued once their lease expires, and expired jobs are
+    pruned every JOB_PRUNE_INTERVAL_S.
+    """
+
+    def __init__(self, handler, workers: int = None, max_pending: int = None, store: JobStore = None):
+        cfg = settings.jobs
+        self.handler = handler
+        self.workers = workers if workers is not None else cfg.workers
+        self.max_pending = max_pending if max_pending is not None else cfg.max_pending
+        self.store = store
+        self._queue = None
+        self._tasks = []
+        self._running = 0
+        self.owner = None
+        self._watchers = {}  # job id -> set of asyncio.Queue receiving job snapshots
+
+    async def start(self):
+        """Open the store, queue waiting jobs and start the workers (call from startup)."""
+        if self._tasks:
+            return
+        if self.store is None:
+            self.store = await asyncio.to_thread(JobStore)
+        self._queue = asyncio.Queue()
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        pruned = await asyncio.to_thread(self.store.prune, settings.jobs.ttl_hours * 3600)
+        recovered = await asyncio.to_thread(self.store.recover_stale)
+        pending = await asyncio.to_thread(self.store.queued)
+        for job_id in pending:
+            self._queue.put_nowait(job_id)
+        if pending or pruned:
+            logger.info(f"Queued {len(pending)} waiting job(s) ({len(recovered)} with an expired lease), "
+                        f"pruned {pruned} expired job(s).")
+
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._maintain()))
+        metrics.register_job_queue(self)
+        logger.info(f"Job queue started with {self.workers} worker(s).")
+
+    async def stop(self):
+        """Cancel the workers and hand jobs still running back to the queue."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self.store is not None:
+            self.store.release(self.owner)
+            self.store.close()
+            self.store = None
+
+    async def submit(self, filename: str, payload: bytes) -> str:
+        if self._queue is None:
+            raise RuntimeError("JobQueue.start() has not been called")
+        if self._queue.qsize() >= self.max_pending:
+            metrics.record_job("rejected")
+            raise QueueFull(f"{self.max_pending} jobs already pending")
+        job_id = await asyncio.to_thread(self.store.create, filename, payload)
+        self._queue.put_nowait(job_id)
+        metrics.record_job("queued")
+        return job_id
+
+    async def get(self, job_id: str):
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def watch(self, job_id: str, heartbeat: float = 15.0):
+        """Yield the job on every state change until it finishes. Yields None every
+           `heartbeat` seconds without a change so SSE connections can be kept alive."""
+        updates = asyncio.Queue()
+        # Subscribe before reading the current state so no transition is missed
+        self._watchers.setdefault(job_id, set()).add(updates)
+        try:
+            job = await self.get(job_id)
+            if job is None:
+                return
+            yield job
+            while job["status"] not in TERMINAL_STATES:
+                try:
+                    job = await asyncio.wait_for(updates.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield job
+        finally:
+            watchers = self._watchers.get(job_id)
+            if watchers is not None:
+                watchers.discard(updates)
+                if not watchers:
+                    del self._watchers[job_id]
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": self._running,
+            "max_pending": self.max_pending,
+        }
+
+    async def _publish(self, job_id: str):
+        if job_id not in self._watchers:
+            return
+        job = await self.get(job_id)
+        for updates in self._watchers.get(job_id, ()):
+            updates.put_nowait(job)
+
+    async def _maintain(self):
+        """Renew this process's leases, requeue jobs with expired leases and prune old jobs."""
+        cfg = settings.jobs
+        last_prune = time.monotonic()
+        while True:
+            await asyncio.sleep(cfg.lease_s / 3)
+            try:
+                await asyncio.to_thread(self.store.renew, self.owner, cfg.lease_s)
+                recovered = await asyncio.to_thread(self.store.recover_stale)
+                for job_id in recovered:
+                    self._queue.put_nowait(job_id)
+                if recovered:
+                    logger.warning(f"⚠️ Requeued {len(recovered)} job(s) whose lease expired.")
+                if time.monotonic() - last_prune >= cfg.prune_interval_s:
+                    last_prune = time.monotonic()
+                    pruned = await asyncio.to_thread(self.store.prune, cfg.ttl_hours * 3600)
+                    if pruned:
+                        logger.info(f"Pruned {pruned} expired job(s).")
+            except Exception as e:
+                logger.error(f"❌ Job queue maintenance failed: {e}")
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            self._running += 1
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                logger.error(f"❌ Job {job_id} could not be processed: {e}")
+            finally:
+                self._running -= 1
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        if not await asyncio.to_thread(self.store.claim, job_id, self.owner, settings.jobs.lease_s):
+            # another process claimed it first, or it already finished
+            return
+        await self._publish(job_id)
+
+        payload = await asyncio.to_thread(self.store.get_payload, job_id)
+        if payload is None:
+            await asyncio.to_thread(self.store.mark_failed, job_id, "payload missing")
+            await self._publish(job_id)
+            return
+
+        start = time.perf_counter()
+        try:
+            result = await self.handler(payload)
+        except Exception as e:
+            logger.error(f"❌ Job {job_id} failed: {e}")
+            await asyncio.to_thread(self.store.mark_failed, job_id, str(e))
+            metrics.record_job("failed")
+        else:
+            await asyncio.to_thread(self.store.mark_done, job_id, result)
+            metrics.record_job("done")
+        metrics.observe_stage("job", time.perf_counter() - start)
+        await self._publish(job_id)
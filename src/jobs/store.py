@@ -0,0 +1,170 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from src.core.config import settings
+from src.core.logging import get_logger
+
+logger = get_logger("Job Store")
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+TERMINAL_STATES = (DONE, FAILED)
+
+
+class JobStore:
+    """
+    SQLite-backed job state, so queued work and results survive a restart.
+
+    Table: jobs
+        | Column      | Type | Notes                                          |
+        |-------------|------|------------------------------------------------|
+        | id          | TEXT | Primary key (uuid4 hex)                        |
+        | status      | TEXT | queued / running / done / failed               |
+        | filename    | TEXT | Original upload name                           |
+        | payload     | BLOB | Uploaded bytes; cleared once the job finishes  |
+        | result      | TEXT | JSON result of a finished job                  |
+        | error       | TEXT | Error message of a failed job                  |
+        | created_at  | REAL | Unix time                                      |
+        | started_at  | REAL | Unix time                                      |
+        | finished_at | REAL | Unix time                                      |
+        | owner       | TEXT | Process that claimed the job                   |
+        | lease_until | REAL | Unix time the owner's claim expires            |
+
+    Several processes (e.g. uvicorn workers) may share one database: a job runs only after
+    `claim` moved it from queued to running for one owner, and an owner keeps its claims
+    alive with `renew`. Jobs whose lease ran out are requeued by `recover_stale`.
+
+    Every call is a single short statement; a lock serialises use of the one connection.
+    """
+
+    def __init__(self, db_path: Path = None):
+        self.db_path = Path(db_path or settings.jobs.db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    filename TEXT,
+                    payload BLOB,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    owner TEXT,
+                    lease_until REAL
+                )
+            """)
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            for column, kind in (("owner", "TEXT"), ("lease_until", "REAL")):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_idx ON jobs (status, created_at)")
+
+    def _execute(self, query, params=()):
+        with self._lock:
+            return self._conn.execute(query, params).fetchall()
+
+    def create(self, filename: str, payload: bytes) -> str:
+        job_id = uuid.uuid4().hex
+        self._execute(
+            "INSERT INTO jobs (id, status, filename, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, QUEUED, filename, sqlite3.Binary(payload), time.time()),
+        )
+        return job_id
+
+    def get(self, job_id: str):
+        """Return the job as a dict (without its payload), or None if unknown."""
+        rows = self._execute(
+            "SELECT id, status, filename, result, error, created_at, started_at, finished_at "
+            "FROM jobs WHERE id = ?", (job_id,))
+        if not rows:
+            return None
+        job = dict(rows[0])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def get_payload(self, job_id: str):
+        rows = self._execute("SELECT payload FROM jobs WHERE id = ?", (job_id,))
+        return bytes(rows[0]["payload"]) if rows and rows[0]["payload"] is not None else None
+
+    def _update(self, query, params=()) -> int:
+        with self._lock:
+            return self._conn.execute(query, params).rowcount
+
+    def claim(self, job_id: str, owner: str, lease_s: float) -> bool:
+        """Atomically move a queued job to running for `owner`; False if it is not queued
+           (another process claimed it first, or it already finished)."""
+        now = time.time()
+        return self._update(
+            "UPDATE jobs SET status = ?, owner = ?, started_at = ?, lease_until = ? "
+            "WHERE id = ? AND status = ?",
+            (RUNNING, owner, now, now + lease_s, job_id, QUEUED)) == 1
+
+    def renew(self, owner: str, lease_s: float) -> int:
+        """Extend the lease of every job `owner` is running; returns the number renewed."""
+        return self._update("UPDATE jobs SET lease_until = ? WHERE owner = ? AND status = ?",
+                            (time.time() + lease_s, owner, RUNNING))
+
+    def release(self, owner: str) -> int:
+        """Hand `owner`'s running jobs back to the queue (on shutdown)."""
+        return self._update(
+            "UPDATE jobs SET status = ?, owner = NULL, lease_until = NULL WHERE owner = ? AND status = ?",
+            (QUEUED, owner, RUNNING))
+
+    def mark_done(self, job_id: str, result: dict):
+        self._execute(
+            "UPDATE jobs SET status = ?, result = ?, payload = NULL, finished_at = ? WHERE id = ?",
+            (DONE, json.dumps(result, ensure_ascii=False, default=str), time.time(), job_id))
+
+    def mark_failed(self, job_id: str, error: str):
+        self._execute(
+            "UPDATE jobs SET status = ?, error = ?, payload = NULL, finished_at = ? WHERE id = ?",
+            (FAILED, error, time.time(), job_id))
+
+    def queued(self) -> list:
+        """Ids of queued jobs, oldest first."""
+        rows = self._execute("SELECT id FROM jobs WHERE status = ? ORDER BY created_at", (QUEUED,))
+        return [row["id"] for row in rows]
+
+    def recover_stale(self) -> list:
+        """Requeue running jobs whose lease expired (their owner died); returns their ids."""
+        stale = "status = ? AND (lease_until IS NULL OR lease_until < ?)"
+        params = (RUNNING, time.time())
+        with self._lock:
+            # one write transaction, so no other process renews or claims in between
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(f"SELECT id FROM jobs WHERE {stale}", params).fetchall()
+                self._conn.execute(
+                    f"UPDATE jobs SET status = ?, owner = NULL, lease_until = NULL WHERE {stale}",
+                    (QUEUED, *params))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [row["id"] for row in rows]
+
+    def prune(self, older_than_s: float) -> int:
+        """Delete finished jobs older than `older_than_s` seconds; returns the number removed."""
+        cutoff = time.time() - older_than_s
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?", (DONE, FAILED, cutoff))
+            return cur.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,5 @@
+from src.llm.ollama_client import OllamaClient
+from src.llm.routing import OcrQuality, assess_ocr_quality, choose_route
+from src.llm.stream_json import IncrementalJsonParser
+
+__all__ = ["OllamaClient", "OcrQuality", "assess_ocr_quality", "choose_route", "IncrementalJsonParser"]
@@ -0,0 +1,87 @@
+import asyncio
+
+import httpx
+
+from src.core.config import settings
+from src.core.logging import get_logger
+
+logger = get_logger("Ollama Client")
+
+
+class OllamaClient:
+    """
+    Async client for the Ollama HTTP API.
+
+    One instance holds a persistent httpx connection pool, so keep-alive connections are
+    reused across calls. `max_concurrency` caps how many generations run at once; extra
+    callers wait on a semaphore instead of piling more work onto the Ollama server.
+    Pass `base_url` to point it at any server that speaks the API (e.g. a local fake in tests).
+    """
+
+    def __init__(self, base_url: str = None, max_connections: int = None,
+                 max_concurrency: int = None, timeout: float = None):
+        cfg = settings.ollama
+        self.base_url = (base_url or cfg.base_url).rstrip("/")
+        self.max_connections = max_connections or cfg.max_connections
+        self.max_concurrency = max_concurrency or cfg.max_concurrency
+        self.timeout = timeout or cfg.timeout
+        self._client = None
+        self._semaphore = None
+        self._loop = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Create the pooled client on first use (inside the running event loop). A client and
+           semaphore are bound to the loop they were first used on, so a new loop (e.g. a
+           second asyncio.run) gets fresh ones."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._client = None
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                timeout=self._timeout(self.timeout),
+            )
+        return self._client
+
+    @staticmethod
+    def _timeout(seconds: float) -> httpx.Timeout:
+        # connect failures should surface quickly even when generation may take a minute
+        return httpx.Timeout(seconds, connect=settings.ollama.connect_timeout)
+
+    async def stream(self, endpoint: str, payload: dict, timeout: float = None):
+        """POST `payload` and yield the non-empty lines of the (NDJSON) streamed body.
+           An error status is logged, not raised: its body (e.g. {"error": ...}) is yielded
+           like any other response so callers can report it as raw model output."""
+        client = self._get_client()
+        async with self._semaphore:
+            async with client.stream("POST", endpoint, json=payload,
+                                     timeout=self._timeout(timeout) if timeout else httpx.USE_CLIENT_DEFAULT) as response:
+                if response.is_error:
+                    logger.warning(f"Ollama {endpoint} returned HTTP {response.status_code}")
+                async for line in response.aiter_lines():
+                    if line:
+                        yield line
+
+    async def stream_generate(self, payload: dict, timeout: float = None):
+        """Stream a /api/generate call line by line. Calling aclose() on the generator
+           before the end closes the connection, which stops the generation server-side."""
+        lines = self.stream("/api/generate", payload, timeout=timeout)
+        try:
+            async for line in lines:
+                yield line
+        finally:
+            await lines.aclose()
+
+    async def aclose(self):
+        """Close pooled connections (call from the app's shutdown event)."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logger.info("Ollama client closed.")
+        self._client = None
+
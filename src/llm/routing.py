@@ -0,0 +1,118 @@
+import os
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, asdict
+
+from src.core.config import settings
+from src.core.logging import get_logger
+from src.core.metrics import record_routing
+
+logger = get_logger("Model Routing")
+
+# Words we expect on almost any certificate; each hit is strong evidence the OCR is usable
+FIELD_KEYWORDS = {
+    "certificate", "certify", "certified", "university", "college", "institute", "school",
+    "board", "name", "date", "issued", "issue", "awarded", "degree", "diploma", "examination",
+    "exam", "roll", "number", "grade", "cgpa", "gpa", "marks", "course", "father", "mother",
+    "birth", "year", "passed", "semester", "registrar", "principal", "signature", "id",
+}
+
+# Small built-in vocabulary, used when no system word list is available
+COMMON_WORDS = FIELD_KEYWORDS | {
+    "the", "of", "and", "to", "in", "is", "that", "this", "for", "on", "with", "as", "by",
+    "at", "from", "has", "have", "be", "was", "an", "or", "a", "i", "he", "she", "his", "her",
+    "who", "which", "been", "are", "will", "all", "under", "during", "held", "successfully",
+    "completed", "completion", "bachelor", "master", "engineering", "technology", "science",
+    "arts", "commerce", "computer", "department", "secondary", "higher", "state", "government",
+    "national", "class", "first", "second", "third", "division", "distinction", "honours",
+    "programme", "program", "training", "participation", "achievement", "excellence", "award",
+    "presented", "recognition", "member", "student", "candidate", "controller", "dean",
+    "director", "chairman", "secretary", "head", "office", "seal", "valid", "result", "total",
+    "subject", "subjects", "credits", "credit", "points", "point", "average", "percentage",
+    "hereby", "certifies", "conferred", "upon", "month", "day", "place", "no", "mr", "ms", "mrs",
+}
+
+WORD_RE = re.compile(r"[A-Za-z]+")
+SYSTEM_WORDS_PATH = "/usr/share/dict/words"
+
+_vocabulary = None
+_vocabulary_lock = threading.Lock()
+
+# How often each route was taken; logged with every decision
+routing_stats = Counter()
+
+
+@dataclass
+class OcrQuality:
+    mean_conf: float      # mean Tesseract word confidence, 0-100
+    word_ratio: float     # fraction of alphabetic tokens that are dictionary words
+    keyword_hits: int     # distinct certificate field keywords found
+    n_words: int
+    score: float          # combined 0-1 score
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _get_vocabulary() -> set:
+    """Load the system word list once if present, else fall back to the built-in set."""
+    global _vocabulary
+    if _vocabulary is None:
+        with _vocabulary_lock:
+            if _vocabulary is None:
+                words = set(COMMON_WORDS)
+                if os.path.exists(SYSTEM_WORDS_PATH):
+                    with open(SYSTEM_WORDS_PATH, "r", encoding="utf-8", errors="ignore") as f:
+                        words.update(w.strip().lower() for w in f if w.strip())
+                _vocabulary = words
+    return _vocabulary
+
+
+def assess_ocr_quality(words: list, confidences: list) -> OcrQuality:
+    """Score OCR output from Tesseract words and their confidences (-1 = no confidence)."""
+    confs = [c for c in confidences if c >= 0]
+    mean_conf = sum(confs) / len(confs) if confs else 0.0
+
+    vocabulary = _get_vocabulary()
+    tokens = [t.lower() for w in words for t in WORD_RE.findall(w)]
+    alpha_tokens = [t for t in tokens if len(t) > 1]
+    known = sum(1 for t in alpha_tokens if t in vocabulary)
+    word_ratio = known / len(alpha_tokens) if alpha_tokens else 0.0
+    keyword_hits = len(FIELD_KEYWORDS.intersection(tokens))
+
+    score = 0.5 * (mean_conf / 100.0) + 0.3 * word_ratio + 0.2 * min(keyword_hits / 3.0, 1.0)
+    return OcrQuality(
+        mean_conf=round(mean_conf, 2),
+        word_ratio=round(word_ratio, 3),
+        keyword_hits=keyword_hits,
+        n_words=len(words),
+        score=round(score, 3),
+    )
+
+
+def choose_route(quality: OcrQuality) -> str:
+    """Return "text" when the OCR is good enough for the text model, else "vision"."""
+    cfg = settings.routing
+    if quality.n_words >= cfg.min_words and quality.score >= cfg.ocr_quality_threshold:
+        route = "text"
+    else:
+        route = "vision"
+    routing_stats[route] += 1
+    record_routing(route)
+    logger.info(
+        f"Routing to {route} model: score={quality.score} conf={quality.mean_conf} "
+        f"word_ratio={quality.word_ratio} keywords={quality.keyword_hits} words={quality.n_words}"
+    )
+    return route
+
+
+def record_fallback(reason: str):
+    """Record a text-model result that had to be retried on the vision model."""
+    routing_stats["text_to_vision_fallback"] += 1
+    record_routing("text_to_vision_fallback")
+    logger.info(
+        f"Text model fallback to vision ({reason}); "
+        f"text={routing_stats['text']} vision={routing_stats['vision']} "
+        f"double_calls={routing_stats['text_to_vision_fallback']}"
+    )
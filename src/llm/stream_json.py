@@ -0,0 +1,76 @@
+import json
+
+
+class IncrementalJsonParser:
+    """
+    Finds the first complete top-level JSON object in text that arrives chunk by chunk.
+
+    Brace depth is tracked outside of string literals while the text streams in, so the
+    object is known to be complete at its closing brace; nothing is rescanned. If a
+    balanced candidate does not parse (also after the single-to-double quote repair that
+    extract_first_json applies), scanning continues with the next '{'.
+
+        parser = IncrementalJsonParser()
+        for chunk in chunks:
+            if parser.feed(chunk) is not None:
+                break  # parser.result holds the dict
+    """
+
+    def __init__(self):
+        self.result = None
+        self._parts = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str):
+        """Consume the next piece of text; returns the parsed object once complete, else None."""
+        if self.result is not None or not chunk:
+            return self.result
+        i, n = 0, len(chunk)
+        while i < n:
+            if self._depth == 0:
+                # outside an object: skip straight to the next opening brace
+                i = chunk.find("{", i)
+                if i == -1:
+                    return None
+                start = i
+                self._depth, self._in_string, self._escape = 1, False, False
+                i += 1
+            else:
+                start = i
+            while i < n and self._depth:
+                c = chunk[i]
+                if self._in_string:
+                    if self._escape:
+                        self._escape = False
+                    elif c == "\\":
+                        self._escape = True
+                    elif c == '"':
+                        self._in_string = False
+                elif c == '"':
+                    self._in_string = True
+                elif c == "{":
+                    self._depth += 1
+                elif c == "}":
+                    self._depth -= 1
+                i += 1
+            self._parts.append(chunk[start:i])
+            if self._depth == 0:
+                candidate = "".join(self._parts)
+                self._parts = []
+                self.result = self._load(candidate)
+                if self.result is not None:
+                    return self.result
+        return None
+
+    @staticmethod
+    def _load(candidate: str):
+        for text in (candidate, candidate.replace("'", '"')):
+            try:
+                parsed = json.loads(text)
+            except ValueError:
+                continue
+            if isinstance(parsed, dict):
+                return parsed
+        return None
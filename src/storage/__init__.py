@@ -0,0 +1,5 @@
+from src.storage.database import SupabaseDB
+from src.storage.embedding_store import EmbeddingStore
+from src.storage.result_cache import ResultCache
+
+__all__ = ["SupabaseDB", "EmbeddingStore", "ResultCache"]
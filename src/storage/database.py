@@ -1,13 +1,110 @@
 import psycopg2
+from psycopg2 import extras as pg_extras
+from psycopg2 import pool as pg_pool
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
 from dotenv import load_dotenv
+import csv
+import datetime
 import os
 import sys
+import threading
+import time
+import hashlib
+import hmac
 import bcrypt
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from src.core.config import settings
 from src.core.logging import get_logger
+from src.core.metrics import register_db_pool
 logger = get_logger("Database")
 
+STUDENT_COLUMNS = ["name", "email", "password", "roll_no", "dob", "univ_id", "passed_out_year"]
+CERTIFICATE_COLUMNS = [
+    "student_id", "univ_id", "roll_no", "student_name_hash", "dob_hash", "gpa_hash", "batch_year",
+    "issued_date", "file_url", "image_hash", "signature_embeddings", "photo_embeddings",
+    "logo_embeddings", "qr_code_cipher", "clg_code",
+]
+# bytea embedding columns per table, with the table's id column
+EMBEDDING_COLUMNS = {
+    "certificates": ("cert_id", ("signature_embeddings", "photo_embeddings", "logo_embeddings")),
+    "universities": ("univ_id", ("signature_embeddings", "logo_embeddings", "stamp_embeddings")),
+}
+
+
+def check_dob_format(dob_str):
+    """True for a plausible DD-MM-YYYY date of birth"""
+    try:
+        day, month, year = map(int, dob_str.split('-'))
+        if 1 <= day <= 31 and 1 <= month <= 12 and 1900 <= year <= 2100:
+            return True
+        return False
+    except:
+        return False
+
+
+def parse_dob(value):
+    """A DD-MM-YYYY string (or a date, as read from Parquet) as a datetime.date, else None"""
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    if not check_dob_format(str(value or "")):
+        return None
+    try:
+        return datetime.datetime.strptime(str(value).strip(), "%d-%m-%Y").date()
+    except ValueError:
+        return None
+
+
+def _hash_password(args):
+    """bcrypt one password (top-level so it can run in a process pool)"""
+    password, rounds = args
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def load_rows(source):
+    """Yield dict rows from a CSV or Parquet file (Parquet needs pyarrow)"""
+    path = Path(source)
+    if path.suffix.lower() == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading Parquet files requires pyarrow (pip install pyarrow)")
+        for batch in pq.ParquetFile(path).iter_batches():
+            yield from batch.to_pylist()
+    else:
+        with open(path, newline='', encoding='utf-8') as f:
+            # CSV has no NULL: an empty cell means a missing value, not '' (which an
+            # integer, date or bytea column would reject)
+            for row in csv.DictReader(f):
+                yield {key: (None if value == '' else value) for key, value in row.items()}
+
+
+class SingleConnectionPool:
+    """
+    Minimal pool around one DB-API connection, with the same getconn()/putconn()
+    interface as psycopg2's pools. Used to plug a stand-in database (e.g. sqlite3)
+    into SupabaseDB for local testing; callers are serialised on a lock.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._lock = threading.Lock()
+
+    def getconn(self):
+        self._lock.acquire()
+        return self.connection
+
+    def putconn(self, conn, close=False):
+        # `close` is accepted for interface compatibility; the one connection is always kept
+        self._lock.release()
+
+    def closeall(self):
+        self.connection.close()
+
 class SupabaseDB:
 
     """
@@ -79,6 +176,7 @@ class SupabaseDB:
     | stamp_embeddings      | bytea                       |
     | created_at            | timestamp without time zone |
     | university_website    | text                        |
+    | private_key_fingerprint | text (unique index)         |
 
     📌 `verification_logs`
 
@@ -103,56 +201,138 @@ class SupabaseDB:
     | clg_web       | text                        |
     """
 
-    def __init__(self):
-        """Initialize connection parameters from .env file"""
+
+    def __init__(self, pool=None, paramstyle:str = "format"):
+        """Initialize connection parameters from .env file.
+
+        `pool` may be any object with getconn()/putconn() (e.g. SingleConnectionPool over
+        sqlite3); set `paramstyle="qmark"` for drivers that use `?` placeholders.
+        """
         load_dotenv()
         self.user = os.getenv("user")
         self.password = os.getenv("password")
         self.host = os.getenv("host")
         self.port = os.getenv("port")
         self.dbname = os.getenv("dbname")
-        self.connection = None
-        self.cursor = None
+        self.pool = pool
+        self.paramstyle = paramstyle
+        # ThreadedConnectionPool raises PoolError instead of waiting when it is exhausted,
+        # so callers queue here for one of its pool_max connections
+        self._slots = threading.BoundedSemaphore(settings.database.pool_max)
+        # concurrent first requests must not each build (and leak) a pool
+        self._connect_lock = threading.Lock()
 
     def connect(self):
-        """Establish database connection"""
-        try:
-            self.connection = psycopg2.connect(
-                user=self.user,
-                password=self.password,
-                host=self.host,
-                port=self.port,
-                dbname=self.dbname
-            )
-            self.cursor = self.connection.cursor()
-            print("✅ Connection successful!")
-        except Exception as e:
-            print(f"❌ Failed to connect: {e}")
-
-    def run_query(self, query, fetch_one=False, fetch_all=False):
-        """Execute SQL queries"""
-        try:
-            self.cursor.execute(query)
+        """Create the connection pool (connections are checked out per operation)"""
+        if self.pool is not None:
+            return
+        with self._connect_lock:
+            if self.pool is not None:
+                return
+            try:
+                self.pool = pg_pool.ThreadedConnectionPool(
+                    settings.database.pool_min,
+                    settings.database.pool_max,
+                    user=self.user,
+                    password=self.password,
+                    host=self.host,
+                    port=self.port,
+                    dbname=self.dbname
+                )
+                register_db_pool(self.pool)
+                print("✅ Connection successful!")
+            except Exception as e:
+                logger.error(f"❌ Failed to connect: {e}")
+                raise
+
+    @contextmanager
+    def connection(self):
+        """Check a connection out of the pool for the duration of the block.
+
+        Waits up to DB_POOL_TIMEOUT seconds for a free connection, then raises PoolError.
+        A connection that is closed or failed with a connection-level error is discarded
+        by the pool rather than handed to the next caller.
+        """
+        if self.pool is None:
+            self.connect()
+        timeout = settings.database.pool_timeout
+        if not self._slots.acquire(timeout=timeout):
+            raise pg_pool.PoolError(f"No database connection became free within {timeout}s")
+        try:
+            conn = self.pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            broken = broken or bool(getattr(conn, "closed", False))
+            try:
+                self.pool.putconn(conn, close=broken)
+            finally:
+                self._slots.release()
+
+    @contextmanager
+    def transaction(self):
+        """Run the block in one explicit transaction and yield its cursor.
+
+        Commits when the block exits normally, rolls back and re-raises on error:
+
+            with db.transaction() as cur:
+                db.run_query("UPDATE ...", (a, b), cursor=cur)
+                db.run_query("INSERT ...", (c,), cursor=cur)
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                yield cursor
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def _sql(self, query:str) -> str:
+        """Queries are written with %s placeholders; translate for qmark drivers"""
+        if self.paramstyle == "qmark":
+            return query.replace("%s", "?")
+        return query
+
+    def run_query(self, query, params=None, fetch_one=False, fetch_all=False, cursor=None):
+        """Execute one parameterized SQL statement.
+
+        Values are always passed in `params` and bound by the driver, never formatted into
+        the SQL. Without `cursor` the statement runs in its own transaction; pass the cursor
+        from transaction() to group statements. Errors are logged and re-raised.
+        """
+        if cursor is None:
+            with self.transaction() as cur:
+                return self.run_query(query, params, fetch_one=fetch_one, fetch_all=fetch_all, cursor=cur)
+        try:
+            cursor.execute(self._sql(query), params or ())
             if fetch_one:
-                return self.cursor.fetchone()
+                return cursor.fetchone()
             elif fetch_all:
-                return self.cursor.fetchall()
-            else:
-                self.connection.commit()
+                return cursor.fetchall()
         except Exception as e:
-            print(f"⚠️ Query failed: {e}")
-            return None
+            logger.error(f"⚠️ Query failed: {e}")
+            raise
 
     def insert_admin(self, name:str, email:str, password:str, role:str):
         """Insert a new admin into the admins table"""
         try:
             salt = bcrypt.gensalt()
             password = bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
-            query = f"""
+            query = """
             INSERT INTO admins (name, email, password, role)
-            VALUES ('{name}', '{email}', '{password}', '{role}');
+            VALUES (%s, %s, %s, %s);
             """
-            self.run_query(query)
+            self.run_query(query, (name, email, password, role))
             logger.info("✅ Admin inserted successfully!")
         except Exception as e:
             logger.error(f"❌ Failed to insert admin: {e}")
@@ -160,8 +340,8 @@ class SupabaseDB:
     def delete_admin_by_id(self, admin_id:str):
         """Delete an admin from the admins table"""
         try:
-            query = f"DELETE FROM admins WHERE admin_id = '{admin_id}';"
-            self.run_query(query)
+            query = "DELETE FROM admins WHERE admin_id = %s;"
+            self.run_query(query, (admin_id,))
             logger.info("✅ Admin deleted successfully!")
         except Exception as e:
             logger.error(f"❌ Failed to delete admin: {e}")
@@ -169,12 +349,12 @@ class SupabaseDB:
     def update_admin_email(self, admin_id:str, new_email:str):
         """Update an admin's email in the admins table"""
         try:
-            query = f"""
+            query = """
             UPDATE admins
-            SET email = '{new_email}'
-            WHERE admin_id = '{admin_id}';
+            SET email = %s
+            WHERE admin_id = %s;
             """
-            self.run_query(query)
+            self.run_query(query, (new_email, admin_id))
             logger.info("✅ Admin email updated successfully!")
         except Exception as e:
             logger.error(f"❌ Failed to update admin email: {e}")
@@ -184,12 +364,12 @@ class SupabaseDB:
         try:
             salt = bcrypt.gensalt()
             new_password = bcrypt.hashpw(new_password.encode('utf-8'), salt).decode('utf-8')
-            query = f"""
+            query = """
             UPDATE admins
-            SET password = '{new_password}'
-            WHERE email = '{email}';
+            SET password = %s
+            WHERE email = %s;
             """
-            self.run_query(query)
+            self.run_query(query, (new_password, email))
             logger.info("✅ Admin password updated successfully!")
         except Exception as e:
             logger.error(f"❌ Failed to update admin password: {e}")
@@ -198,8 +378,8 @@ class SupabaseDB:
     def delete_admin_by_mail(self, email:str):
         """Delete an admin from the admins table"""
         try:
-            query = f"DELETE FROM admins WHERE email = '{email}';"
-            self.run_query(query)
+            query = "DELETE FROM admins WHERE email = %s;"
+            self.run_query(query, (email,))
             logger.info("✅ Admin deleted successfully!")
         except Exception as e:
             logger.error(f"❌ Failed to delete admin: {e}")
@@ -208,8 +388,8 @@ class SupabaseDB:
     def get_admin_by_email(self, email:str):
         """Fetch an admin's details by email"""
         try:
-            query = f"SELECT admin_id, email, name, role FROM admins WHERE email = '{email}';"
-            result = self.run_query(query, fetch_one=True)
+            query = "SELECT admin_id, email, name, role FROM admins WHERE email = %s;"
+            result = self.run_query(query, (email,), fetch_one=True)
             return result
         except Exception as e:
             logger.error(f"❌ Failed to fetch admin: {e}")
@@ -218,8 +398,8 @@ class SupabaseDB:
     def admin_exists(self, email:str) -> bool:
         """Check if an admin exists by email"""
         try:
-            query = f"SELECT 1 FROM admins WHERE email = '{email}';"
-            result = self.run_query(query, fetch_one=True)
+            query = "SELECT 1 FROM admins WHERE email = %s;"
+            result = self.run_query(query, (email,), fetch_one=True)
             return result is not None
         except Exception as e:
             logger.error(f"❌ Failed to check admin existence: {e}")
@@ -248,8 +428,8 @@ class SupabaseDB:
     def admin_login(self, email:str, password:str) -> bool:
         """Validate admin login credentials"""
         try:
-            query = f"SELECT password FROM admins WHERE email = '{email}';"
-            result = self.run_query(query, fetch_one=True)
+            query = "SELECT password FROM admins WHERE email = %s;"
+            result = self.run_query(query, (email,), fetch_one=True)
             if result:
                 stored_password = result[0]
                 return bcrypt.checkpw(password.encode('utf-8'), stored_password.encode('utf-8'))
@@ -267,23 +447,15 @@ class SupabaseDB:
         try:
             salt = bcrypt.gensalt()
             password = bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
-            def check_dob_format(dob_str):
-                try:
-                    day, month, year = map(int, dob_str.split('-'))
-                    if 1 <= day <= 31 and 1 <= month <= 12 and 1900 <= year <= 2100:
-                        return True
-                    return False
-                except:
-                    return False
             if not check_dob_format(dob):
                 logger.error("❌ Invalid date of birth format. Please use DD-MM-YYYY.")
                 return
             
-            query = f"""
+            query = """
             INSERT INTO students (name, email, password, roll_no, dob, univ_id, passed_out_year)
-            VALUES ('{name}', '{email}', '{password}', '{roll_no}', '{dob}', '{univ_id}', {passed_out_year});
+            VALUES (%s, %s, %s, %s, %s, %s, %s);
             """
-            self.run_query(query)
+            self.run_query(query, (name, email, password, roll_no, dob, univ_id, passed_out_year))
             logger.info("✅ Student inserted successfully!")
         except Exception as e:
             logger.error(f"❌ Failed to insert student: {e}")
@@ -292,8 +464,8 @@ class SupabaseDB:
     def get_student(self, student_id:int):
         """Fetch a student by ID"""
         try:
-            query = f"SELECT student_id, name, email, roll_no, dob, univ_id, passed_out_year FROM students WHERE student_id = {student_id};"
-            result = self.run_query(query, fetch_one=True)
+            query = "SELECT student_id, name, email, roll_no, dob, univ_id, passed_out_year FROM students WHERE student_id = %s;"
+            result = self.run_query(query, (student_id,), fetch_one=True)
             return result
         except Exception as e:
             logger.error(f"❌ Failed to fetch student: {e}")
@@ -302,12 +474,12 @@ class SupabaseDB:
     def update_student(self, student_id:int, name:str, email:str, roll_no:str, dob:str, univ_id:str, passed_out_year:int):
         """Update a student's details"""
         try:
-            query = f"""
+            query = """
             UPDATE students
-            SET name = '{name}', email = '{email}', roll_no = '{roll_no}', dob = '{dob}', univ_id = '{univ_id}', passed_out_year = {passed_out_year}
-            WHERE student_id = {student_id};
+            SET name = %s, email = %s, roll_no = %s, dob = %s, univ_id = %s, passed_out_year = %s
+            WHERE student_id = %s;
             """
-            self.run_query(query)
+            self.run_query(query, (name, email, roll_no, dob, univ_id, passed_out_year, student_id))
             logger.info("✅ Student updated successfully!")
         except Exception as e:
             logger.error(f"❌ Failed to update student: {e}")
@@ -316,8 +488,8 @@ class SupabaseDB:
     def delete_student_by_id(self, student_id:int):
         """Delete a student by ID"""
         try:
-            query = f"DELETE FROM students WHERE student_id = {student_id};"
-            self.run_query(query)
+            query = "DELETE FROM students WHERE student_id = %s;"
+            self.run_query(query, (student_id,))
             logger.info("✅ Student deleted successfully!")
         except Exception as e:
             logger.error(f"❌ Failed to delete student: {e}")
@@ -326,8 +498,8 @@ class SupabaseDB:
     def delete_student_by_mail(self, email:str):
         """Delete a student by email"""
         try:
-            query = f"DELETE FROM students WHERE email = '{email}';"
-            self.run_query(query)
+            query = "DELETE FROM students WHERE email = %s;"
+            self.run_query(query, (email,))
             logger.info("✅ Student deleted successfully!")
         except Exception as e:
             logger.error(f"❌ Failed to delete student: {e}")
@@ -336,12 +508,12 @@ class SupabaseDB:
     def display_all_students_certificates_by_id(self, student_id:int):
         """Display all certificates of a student by student ID"""
         try:
-            query = f"""
+            query = """
             SELECT c.cert_id, c.roll_no, c.student_name_hash, c.dob_hash, c.gpa_hash, c.batch_year, c.issued_date, c.file_url, c.qr_code_cipher, c.image_hash
             FROM certificates c
-            WHERE c.student_id = {student_id};
+            WHERE c.student_id = %s;
             """
-            result = self.run_query(query, fetch_all=True)
+            result = self.run_query(query, (student_id,), fetch_all=True)
             return result
         except Exception as e:
             logger.error(f"❌ Failed to fetch certificates: {e}")
@@ -350,7 +522,7 @@ class SupabaseDB:
     def display_all_students_certificates(self):
         """Display all certificates of all students"""
         try:
-            query = f"""
+            query = """
             SELECT c.cert_id, c.roll_no, c.student_name_hash, c.dob_hash, c.gpa_hash, c.batch_year, c.issued_date, c.file_url, c.qr_code_cipher, c.image_hash
             FROM certificates c JOIN students s ON c.student_id = s.student_id group by s.email,c.cert_id;
             """
@@ -362,6 +534,133 @@ class SupabaseDB:
         
     # ================================= End of Student Management ===================================
 
+    # ================================= Bulk Ingestion ===================================
+
+    def _bulk_insert(self, table:str, columns:list, rows:list, page_size:int):
+        """Insert all rows in one transaction with multi-row INSERTs"""
+        column_list = ", ".join(columns)
+        with self.transaction() as cur:
+            if self.paramstyle == "format":
+                query = f"INSERT INTO {table} ({column_list}) VALUES %s"
+                pg_extras.execute_values(cur, query, rows, page_size=page_size)
+            else:
+                placeholders = ", ".join(["%s"] * len(columns))
+                cur.executemany(self._sql(f"INSERT INTO {table} ({column_list}) VALUES ({placeholders})"), rows)
+
+    def _report_bulk(self, table:str, count:int, started:float, skipped:int = 0) -> dict:
+        elapsed = time.perf_counter() - started
+        stats = {
+            "table": table,
+            "rows": count,
+            "skipped": skipped,
+            "seconds": round(elapsed, 3),
+            "rows_per_sec": round(count / elapsed, 1) if elapsed > 0 else None,
+        }
+        logger.info(f"✅ Bulk inserted {count} rows into {table} in {stats['seconds']}s ({stats['rows_per_sec']} rows/sec)")
+        return stats
+
+    def bulk_insert_students(self, rows, bcrypt_rounds:int = None, processes:int = None, page_size:int = 1000) -> dict:
+        """Insert many students in a single transaction.
+
+        `rows` is an iterable of dicts with the insert_student fields, or a path to a CSV /
+        Parquet file with those columns. Passwords are bcrypt-hashed on a process pool
+        (`bcrypt_rounds` defaults to DB_BULK_BCRYPT_ROUNDS). dob is DD-MM-YYYY and stored as a
+        date; rows with an invalid dob are skipped and counted. Returns timing stats including rows/sec.
+        """
+        started = time.perf_counter()
+        if isinstance(rows, (str, Path)):
+            rows = load_rows(rows)
+        rounds = bcrypt_rounds or settings.database.bulk_bcrypt_rounds
+
+        valid, skipped = [], 0
+        for row in rows:
+            dob = parse_dob(row.get("dob"))
+            if dob is None:
+                skipped += 1
+                continue
+            valid.append(dict(row, dob=dob))
+        if skipped:
+            logger.error(f"❌ Skipped {skipped} students with invalid date of birth (use DD-MM-YYYY).")
+
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            hashes = list(pool.map(_hash_password, ((str(r["password"]), rounds) for r in valid),
+                                   chunksize=max(1, len(valid) // ((processes or os.cpu_count() or 1) * 4))))
+
+        values = [
+            (r["name"], r["email"], password, r["roll_no"], r["dob"], r["univ_id"],
+             int(r["passed_out_year"]) if r.get("passed_out_year") not in (None, "") else None)
+            for r, password in zip(valid, hashes)
+        ]
+        self._bulk_insert("students", STUDENT_COLUMNS, values, page_size)
+        return self._report_bulk("students", len(values), started, skipped)
+
+    def bulk_insert_certificates(self, rows, page_size:int = 1000) -> dict:
+        """Insert many certificates in a single transaction.
+
+        `rows` is an iterable of dicts keyed by certificates columns (missing columns are
+        NULL), or a path to a CSV / Parquet file. Returns timing stats including rows/sec.
+        """
+        started = time.perf_counter()
+        if isinstance(rows, (str, Path)):
+            rows = load_rows(rows)
+        values = [tuple(None if row.get(column) == '' else row.get(column) for column in CERTIFICATE_COLUMNS)
+                  for row in rows]
+        self._bulk_insert("certificates", CERTIFICATE_COLUMNS, values, page_size)
+        return self._report_bulk("certificates", len(values), started)
+
+    # ================================= Certificate Image Hashes ===================================
+
+    def get_certificate_image_hashes(self):
+        """(cert_id, image_hash) of every certificate with an image hash, for the near-duplicate index"""
+        try:
+            query = "SELECT cert_id, image_hash FROM certificates WHERE image_hash IS NOT NULL;"
+            return self.run_query(query, fetch_all=True) or []
+        except Exception as e:
+            logger.error(f"❌ Failed to fetch certificate image hashes: {e}")
+            return []
+
+    def update_certificate_image_hash(self, cert_id:str, image_hash:str, univ_id=None) -> bool:
+        """Store the perceptual hash of an issued certificate's image.
+
+        With `univ_id`, only a certificate issued by that university is updated. Returns
+        True only if exactly one certificate was updated.
+        """
+        try:
+            query = "UPDATE certificates SET image_hash = %s WHERE cert_id = %s"
+            params = (image_hash, cert_id)
+            if univ_id is not None:
+                query += " AND univ_id = %s"
+                params += (univ_id,)
+            with self.transaction() as cur:
+                self.run_query(query + ";", params, cursor=cur)
+                updated = cur.rowcount == 1
+            if not updated:
+                logger.error(f"❌ No certificate {cert_id} to update the image hash of.")
+                return False
+            logger.info("✅ Certificate image hash updated successfully!")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Failed to update certificate image hash: {e}")
+            return False
+
+    # ================================= Embeddings ===================================
+
+    def get_embeddings(self, table:str, column:str):
+        """(id, embedding bytes) for every row of `table` with a non-null `column`.
+
+        Only the tables / columns in EMBEDDING_COLUMNS are accepted, since identifiers
+        cannot be bound as parameters.
+        """
+        if table not in EMBEDDING_COLUMNS or column not in EMBEDDING_COLUMNS[table][1]:
+            raise ValueError(f"Unknown embedding column {table}.{column}")
+        id_column = EMBEDDING_COLUMNS[table][0]
+        try:
+            query = f"SELECT {id_column}, {column} FROM {table} WHERE {column} IS NOT NULL;"
+            return self.run_query(query, fetch_all=True) or []
+        except Exception as e:
+            logger.error(f"❌ Failed to fetch {table}.{column}: {e}")
+            return []
+
     # ================================= University Management ===================================
 
     def insert_university(self, name:str, address:str, private_key:str):
@@ -371,11 +670,12 @@ class SupabaseDB:
             hash_private_key = bcrypt.hashpw(private_key.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
             public_key = private_key[::-1] 
             hash_public_key = bcrypt.hashpw(public_key.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-            query = f"""
-            INSERT INTO universities (name, address, private_key, public_key)
-            VALUES ('{name.lower().strip()}', '{address}', '{hash_private_key}', '{hash_public_key}');
+            query = """
+            INSERT INTO universities (name, address, private_key, public_key, private_key_fingerprint)
+            VALUES (%s, %s, %s, %s, %s);
             """
-            self.run_query(query)
+            self.run_query(query, (name.lower().strip(), address, hash_private_key, hash_public_key,
+                                   self.private_key_fingerprint(private_key)))
             logger.info("✅ University inserted successfully!")
         except Exception as e:
             logger.error(f"❌ Failed to insert university: {e}")
@@ -383,20 +683,83 @@ class SupabaseDB:
     def get_university(self, univ_id:int):
         """Fetch a university by ID"""
         try:
-            query = f"SELECT univ_id, name, address, created_at FROM universities WHERE univ_id = {univ_id};"
-            result = self.run_query(query, fetch_one=True)
+            query = "SELECT univ_id, name, address, created_at FROM universities WHERE univ_id = %s;"
+            result = self.run_query(query, (univ_id,), fetch_one=True)
             return result
         except Exception as e:
             logger.error(f"❌ Failed to fetch university: {e}")
             return None
     
+    # Private keys are stored as bcrypt hashes, which use a random salt and so cannot be
+    # searched. Alongside the hash we keep an HMAC-SHA256 fingerprint of the key (keyed
+    # with KEY_FINGERPRINT_SECRET): lookups hit its unique index, then verify the match
+    # with a single bcrypt.checkpw.
+
+    def private_key_fingerprint(self, private_key:str) -> str:
+        """Keyed, deterministic fingerprint of a university private key"""
+        secret = settings.security.key_fingerprint_secret
+        if not secret:
+            raise RuntimeError("KEY_FINGERPRINT_SECRET is not set")
+        return hmac.new(secret.encode('utf-8'), private_key.encode('utf-8'), hashlib.sha256).hexdigest()
+
+    def migrate_private_key_fingerprints(self, known_private_keys=()):
+        """Add the fingerprint column and its unique index (idempotent), then backfill the
+        fingerprint of every existing row whose key is in `known_private_keys`.
+
+        Existing rows only hold a bcrypt hash, so their fingerprint cannot be computed
+        from the database alone. Rows left without one cannot be found by private key
+        until they are backfilled here or their key is set again.
+        """
+        try:
+            with self.transaction() as cur:
+                self.run_query("ALTER TABLE universities ADD COLUMN IF NOT EXISTS private_key_fingerprint text;", cursor=cur)
+                self.run_query("""
+                CREATE UNIQUE INDEX IF NOT EXISTS universities_private_key_fingerprint_idx
+                ON universities (private_key_fingerprint);
+                """, cursor=cur)
+            logger.info("✅ Private key fingerprint column ready!")
+            self.backfill_private_key_fingerprints(known_private_keys)
+        except Exception as e:
+            logger.error(f"❌ Failed to migrate private key fingerprints: {e}")
+
+    def backfill_private_key_fingerprints(self, known_private_keys) -> int:
+        """Store the fingerprint of legacy rows (fingerprint NULL) whose bcrypt hash matches
+        one of `known_private_keys`. Costs one bcrypt check per key and legacy row, so it
+        only runs as this explicit migration step. Returns the number of rows updated."""
+        legacy = self.run_query(
+            "SELECT univ_id, private_key FROM universities WHERE private_key_fingerprint IS NULL;",
+            fetch_all=True) or []
+        updated = 0
+        for private_key in known_private_keys:
+            for row in legacy:
+                if bcrypt.checkpw(private_key.encode('utf-8'), row[1].encode('utf-8')):
+                    self.run_query("UPDATE universities SET private_key_fingerprint = %s WHERE univ_id = %s;",
+                                   (self.private_key_fingerprint(private_key), row[0]))
+                    legacy.remove(row)
+                    updated += 1
+                    break
+        if legacy:
+            logger.warning(f"⚠️ {len(legacy)} universities still have no private key fingerprint.")
+        logger.info(f"✅ Backfilled {updated} private key fingerprints.")
+        return updated
+
+    def _find_university_by_private_key(self, private_key:str, columns:str):
+        """Return (columns...) of the university owning `private_key`, or None.
+
+        Exactly one indexed query on the fingerprint plus at most one bcrypt check; rows
+        without a fingerprint are never scanned here (see migrate_private_key_fingerprints).
+        """
+        fingerprint = self.private_key_fingerprint(private_key)
+        query = f"SELECT private_key, {columns} FROM universities WHERE private_key_fingerprint = %s;"
+        row = self.run_query(query, (fingerprint,), fetch_one=True)
+        if row and bcrypt.checkpw(private_key.encode('utf-8'), row[0].encode('utf-8')):
+            return row[1:]
+        return None
+
     def get_university_by_private_key(self, private_key:str):
         """Fetch a university by private key"""
         try:
-            hash_private_key = bcrypt.hashpw(private_key.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-            query = f"SELECT univ_id, name, address, created_at FROM universities WHERE private_key = '{hash_private_key}';"
-            result = self.run_query(query, fetch_one=True)
-            return result
+            return self._find_university_by_private_key(private_key, "univ_id, name, address, created_at")
         except Exception as e:
             logger.error(f"❌ Failed to fetch university: {e}")
             return None
@@ -407,12 +770,13 @@ class SupabaseDB:
             hash_private_key = bcrypt.hashpw(private_key.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
             public_key = private_key[::-1] 
             hash_public_key = bcrypt.hashpw(public_key.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-            query = f"""
+            query = """
             UPDATE universities
-            SET name = '{name}', address = '{address}', private_key = '{hash_private_key}', public_key = '{hash_public_key}'
-            WHERE univ_id = {univ_id};
+            SET name = %s, address = %s, private_key = %s, public_key = %s, private_key_fingerprint = %s
+            WHERE univ_id = %s;
             """
-            self.run_query(query)
+            self.run_query(query, (name, address, hash_private_key, hash_public_key,
+                                   self.private_key_fingerprint(private_key), univ_id))
             logger.info("✅ University updated successfully!")
         except Exception as e:
             logger.error(f"❌ Failed to update university: {e}")
@@ -420,15 +784,16 @@ class SupabaseDB:
     def update_university_by_private_key(self, private_key:str, name:str, address:str):
         """Update a university's details by private key"""
         try:
-            hash_private_key = bcrypt.hashpw(private_key.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-            public_key = private_key[::-1] 
-            hash_public_key = bcrypt.hashpw(public_key.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-            query = f"""
+            found = self._find_university_by_private_key(private_key, "univ_id")
+            if not found:
+                logger.error("❌ No university matches the given private key.")
+                return
+            query = """
             UPDATE universities
-            SET name = '{name}', address = '{address}', private_key = '{hash_private_key}', public_key = '{hash_public_key}'
-            WHERE private_key = '{hash_private_key}';
+            SET name = %s, address = %s
+            WHERE univ_id = %s;
             """
-            self.run_query(query)
+            self.run_query(query, (name, address, found[0]))
             logger.info("✅ University updated successfully!")
         except Exception as e:
             logger.error(f"❌ Failed to update university: {e}")
@@ -436,8 +801,8 @@ class SupabaseDB:
     def delete_university_by_univ_id(self, univ_id:int):
         """Delete a university by ID"""
         try:
-            query = f"DELETE FROM universities WHERE univ_id = {univ_id};"
-            self.run_query(query)
+            query = "DELETE FROM universities WHERE univ_id = %s;"
+            self.run_query(query, (univ_id,))
             logger.info("✅ University deleted successfully!")
         except Exception as e:
             logger.error(f"❌ Failed to delete university: {e}")
@@ -445,9 +810,12 @@ class SupabaseDB:
     def delete_university_by_private_key(self, private_key:str):
         """Delete a university by private key"""
         try:
-            hash_private_key = bcrypt.hashpw(private_key.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-            query = f"DELETE FROM universities WHERE private_key = '{hash_private_key}';"
-            self.run_query(query)
+            found = self._find_university_by_private_key(private_key, "univ_id")
+            if not found:
+                logger.error("❌ No university matches the given private key.")
+                return
+            query = "DELETE FROM universities WHERE univ_id = %s;"
+            self.run_query(query, (found[0],))
             logger.info("✅ University deleted successfully!")
         except Exception as e:
             logger.error(f"❌ Failed to delete university: {e}")
@@ -456,8 +824,8 @@ class SupabaseDB:
     def get_university_private_key_by_univ_id(self, univ_id:int) -> str:
         """Fetch a university's private key by ID"""
         try:
-            query = f"SELECT private_key FROM universities WHERE univ_id = {univ_id};"
-            result = self.run_query(query, fetch_one=True)
+            query = "SELECT private_key FROM universities WHERE univ_id = %s;"
+            result = self.run_query(query, (univ_id,), fetch_one=True)
             return result[0] if result else None
         except Exception as e:
             logger.error(f"❌ Failed to fetch private key: {e}")
@@ -466,8 +834,8 @@ class SupabaseDB:
     def get_university_private_key_by_name(self, name:str) -> str:
         """Fetch a university's private key by name"""
         try:
-            query = f"SELECT private_key FROM universities WHERE name = '{name.lower()}';"
-            result = self.run_query(query, fetch_one=True)
+            query = "SELECT private_key FROM universities WHERE name = %s;"
+            result = self.run_query(query, (name.lower(),), fetch_one=True)
             return result[0] if result else None
         except Exception as e:
             logger.error(f"❌ Failed to fetch private key: {e}")
@@ -476,8 +844,8 @@ class SupabaseDB:
     def get_university_univ_id_by_name(self, name:str) -> int:
         """Fetch a university's ID by name"""
         try:
-            query = f"SELECT univ_id FROM universities WHERE name = '{name.lower()}';"
-            result = self.run_query(query, fetch_one=True)
+            query = "SELECT univ_id FROM universities WHERE name = %s;"
+            result = self.run_query(query, (name.lower(),), fetch_one=True)
             return result[0] if result else None
         except Exception as e:
             logger.error(f"❌ Failed to fetch university ID: {e}")
@@ -486,9 +854,7 @@ class SupabaseDB:
     def get_university_univ_id_by_private_key(self, private_key:str) -> int:
         """Fetch a university's ID by private key"""
         try:
-            hash_private_key = bcrypt.hashpw(private_key.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-            query = f"SELECT univ_id FROM universities WHERE private_key = '{hash_private_key}';"
-            result = self.run_query(query, fetch_one=True)
+            result = self._find_university_by_private_key(private_key, "univ_id")
             return result[0] if result else None
         except Exception as e:
             logger.error(f"❌ Failed to fetch university ID: {e}")
@@ -509,12 +875,12 @@ class SupabaseDB:
     def get_university_students_by_univ_id(self, univ_id:int):
         """Fetch all students of a university by university ID"""
         try:
-            query = f"""
+            query = """
             SELECT student_id, name, email, roll_no, dob, passed_out_year, created_at
             FROM students
-            WHERE univ_id = {univ_id};
+            WHERE univ_id = %s;
             """
-            result = self.run_query(query, fetch_all=True)
+            result = self.run_query(query, (univ_id,), fetch_all=True)
             return result
         except Exception as e:
             logger.error(f"❌ Failed to fetch students: {e}")
@@ -523,14 +889,10 @@ class SupabaseDB:
     def get_university_students_by_private_key(self, private_key:str):
         """Fetch all students of a university by university private key"""
         try:
-            hash_private_key = bcrypt.hashpw(private_key.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-            query = f"""
-            SELECT s.student_id, s.name, s.email, s.roll_no, s.dob, s.passed_out_year, s.created_at
-            FROM students s JOIN universities u ON s.univ_id = u.univ_id
-            WHERE u.private_key = '{hash_private_key}';
-            """
-            result = self.run_query(query, fetch_all=True)
-            return result
+            found = self._find_university_by_private_key(private_key, "univ_id")
+            if not found:
+                return []
+            return self.get_university_students_by_univ_id(found[0])
         except Exception as e:
             logger.error(f"❌ Failed to fetch students: {e}")
             return []
@@ -538,9 +900,7 @@ class SupabaseDB:
     def get_university_website_by_private_key(self, private_key:str) -> str:
         """Fetch a university's website by private key"""
         try:
-            hash_private_key = bcrypt.hashpw(private_key.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-            query = f"SELECT university_website FROM universities WHERE private_key = '{hash_private_key}';"
-            result = self.run_query(query, fetch_one=True)
+            result = self._find_university_by_private_key(private_key, "university_website")
             return result[0] if result else None
         except Exception as e:
             logger.error(f"❌ Failed to fetch university website: {e}")
@@ -549,12 +909,12 @@ class SupabaseDB:
     def get_university_affiliate_colleges_by_univ_id(self, univ_id:int):
         """Fetch all affiliate colleges of a university by university ID"""
         try:
-            query = f"""
+            query = """
             SELECT clg_code, clg_name, clg_address, clg_web, created_at
             FROM affiliate_colleges
-            WHERE univ_id = {univ_id};
+            WHERE univ_id = %s;
             """
-            result = self.run_query(query, fetch_all=True)
+            result = self.run_query(query, (univ_id,), fetch_all=True)
             return result
         except Exception as e:
             logger.error(f"❌ Failed to fetch affiliate colleges: {e}")
@@ -563,14 +923,10 @@ class SupabaseDB:
     def get_university_affiliate_colleges_by_private_key(self, private_key:str):    
         """Fetch all affiliate colleges of a university by university private key"""
         try:
-            hash_private_key = bcrypt.hashpw(private_key.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-            query = f"""
-            SELECT ac.clg_code, ac.clg_name, ac.clg_address, ac.clg_web, ac.created_at
-            FROM affiliate_colleges ac JOIN universities u ON ac.univ_id = u.univ_id
-            WHERE u.private_key = '{hash_private_key}';
-            """
-            result = self.run_query(query, fetch_all=True)
-            return result
+            found = self._find_university_by_private_key(private_key, "univ_id")
+            if not found:
+                return []
+            return self.get_university_affiliate_colleges_by_univ_id(found[0])
         except Exception as e:
             logger.error(f"❌ Failed to fetch affiliate colleges: {e}")
             return []
@@ -582,11 +938,10 @@ class SupabaseDB:
 
 
     def close(self):
-        """Close cursor and connection"""
-        if self.cursor:
-            self.cursor.close()
-        if self.connection:
-            self.connection.close()
+        """Close every pooled connection"""
+        if self.pool is not None:
+            self.pool.closeall()
+            self.pool = None
         print("🔒 Connection closed.")
 
     
@@ -599,6 +954,6 @@ if __name__ == "__main__":
     print("Current Time:", result)
     
     # Insert example
-    # db.run_query("INSERT INTO users (name, email) VALUES ('Praveen', 'praveen@example.com');")
+    # db.run_query("INSERT INTO users (name, email) VALUES (%s, %s);", ("Praveen", "praveen@example.com"))
     
     db.close()
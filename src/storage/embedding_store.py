@@ -0,0 +1,188 @@
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+from src.core.config import settings
+from src.core.logging import get_logger
+
+logger = get_logger("Embedding Store")
+
+
+class EmbeddingStore:
+    """
+    One `bytea` embedding column (e.g. universities.signature_embeddings) as a contiguous,
+    L2-normalised NumPy matrix, so cosine similarity against every row is one matrix multiply.
+
+    Embeddings are stored in the DB as raw little-endian vectors of `source_dtype`
+    (EMBEDDING_SOURCE_DTYPE). `refresh` decodes them from the DB and writes a snapshot
+    under `settings.storage.cache_dir / "embeddings"`: a uniquely named
+    <table>.<column>.<version>.npy matrix plus <table>.<column>.ids.json, which names that
+    matrix and lists its row ids. `load` memory-maps that snapshot, so a restart does not
+    refetch or decode anything.
+
+    Usage:
+        store = EmbeddingStore("universities", "signature_embeddings")
+        if not store.load():
+            store.refresh(db)
+        store.top_k(signature_vectors, k=5)  # -> [[(univ_id, score), ...], ...]
+    """
+
+    def __init__(self, table: str, column: str, snapshot_dir: Path = None,
+                 dtype: str = None, source_dtype: str = None):
+        cfg = settings.embeddings
+        self.table = table
+        self.column = column
+        self.snapshot_dir = Path(snapshot_dir or settings.storage.cache_dir / "embeddings")
+        # dtype of the in-memory / snapshot matrix; float16 halves memory and snapshot size
+        self.dtype = np.dtype(dtype or cfg.dtype)
+        self.source_dtype = np.dtype(source_dtype or cfg.source_dtype).newbyteorder("<")
+        self.ids = []
+        self.matrix = np.empty((0, 0), dtype=self.dtype)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def dim(self) -> int:
+        return self.matrix.shape[1]
+
+    @property
+    def _ids_path(self) -> Path:
+        return self.snapshot_dir / f"{self.table}.{self.column}.ids.json"
+
+    @staticmethod
+    def _normalise(vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def decode(self, value) -> np.ndarray:
+        """Decode one bytea value (bytes / memoryview) into a float32 vector."""
+        return np.frombuffer(bytes(value), dtype=self.source_dtype).astype(np.float32)
+
+    def build(self, rows) -> int:
+        """Replace the contents with (id, bytea) rows. Rows whose length differs from the
+           most common dimension are skipped. Returns the number of rows kept."""
+        ids, vectors = [], []
+        for key, value in rows:
+            if value is None:
+                continue
+            ids.append(str(key))
+            vectors.append(self.decode(value))
+
+        if vectors:
+            dims = [len(v) for v in vectors]
+            dim = max(set(dims), key=dims.count)
+            kept = [(key, v) for key, v in zip(ids, vectors) if len(v) == dim]
+            if len(kept) < len(vectors):
+                logger.warning(f"⚠️ Skipped {len(vectors) - len(kept)} {self.table}.{self.column} "
+                               f"embeddings whose dimension is not {dim}.")
+            ids = [key for key, _ in kept]
+            matrix = self._normalise(np.stack([v for _, v in kept])).astype(self.dtype)
+        else:
+            matrix = np.empty((0, 0), dtype=self.dtype)
+
+        with self._lock:
+            self.ids = ids
+            self.matrix = np.ascontiguousarray(matrix)
+        logger.info(f"Loaded {len(ids)} {self.table}.{self.column} embeddings.")
+        return len(ids)
+
+    def refresh(self, db, save: bool = True) -> int:
+        """Rebuild from the database (SupabaseDB.get_embeddings) and write a new snapshot."""
+        count = self.build(db.get_embeddings(self.table, self.column))
+        if save:
+            self.save()
+        return count
+
+    def save(self):
+        """Write the snapshot atomically. The matrix goes to a new file that nothing refers to
+           yet, then one rename of the .ids.json switches readers to it, so a crash at any
+           point leaves either the old pair or the new pair, never a mix of the two."""
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            matrix, ids = self.matrix, list(self.ids)
+        matrix_name = f"{self.table}.{self.column}.{uuid.uuid4().hex}.npy"
+        np.save(self.snapshot_dir / matrix_name, matrix)
+        tmp_ids = self._ids_path.with_suffix(".tmp")
+        tmp_ids.write_text(json.dumps({"matrix": matrix_name, "ids": ids}))
+        os.replace(tmp_ids, self._ids_path)
+
+        for old in self.snapshot_dir.glob(f"{self.table}.{self.column}.*.npy"):
+            if old.name != matrix_name:
+                try:
+                    old.unlink()
+                except OSError:
+                    # still memory-mapped somewhere (Windows); the next save retries
+                    pass
+
+    def load(self) -> bool:
+        """Memory-map the snapshot if one exists; returns False when there is none."""
+        if not self._ids_path.exists():
+            return False
+        try:
+            snapshot = json.loads(self._ids_path.read_text())
+            ids = snapshot["ids"]
+            matrix = np.load(self.snapshot_dir / snapshot["matrix"], mmap_mode="r")
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"⚠️ Ignoring unreadable embedding snapshot {self._ids_path}: {e}")
+            return False
+        if len(ids) != matrix.shape[0]:
+            logger.warning(f"⚠️ Ignoring embedding snapshot {self._ids_path}: id count mismatch.")
+            return False
+        with self._lock:
+            self.ids = ids
+            self.matrix = matrix
+        logger.info(f"Mapped {len(ids)} {self.table}.{self.column} embeddings from snapshot.")
+        return True
+
+    def add(self, key, vector):
+        """Add or replace one row in memory (call save() to persist it in the snapshot)."""
+        vector = self._normalise(self.decode(vector) if isinstance(vector, (bytes, memoryview)) else vector)
+        with self._lock:
+            if len(self.ids) and vector.shape[-1] != self.dim:
+                raise ValueError(f"Expected a {self.dim}-dimensional embedding, got {vector.shape[-1]}")
+            key = str(key)
+            if key in self.ids:
+                matrix = np.array(self.matrix)
+                matrix[self.ids.index(key)] = vector
+                self.matrix = matrix
+            else:
+                rows = vector.reshape(1, -1).astype(self.dtype)
+                self.matrix = np.ascontiguousarray(np.vstack([self.matrix, rows]) if len(self.ids) else rows)
+                self.ids = self.ids + [key]
+
+    def top_k(self, queries, k: int = 5, min_score: float = None) -> list:
+        """Cosine top-k for a batch of query vectors (one per row, or a single vector).
+
+        Returns one list of (id, score) per query, best first. All queries are scored in a
+        single matrix multiply against the whole store.
+        """
+        queries = self._normalise(np.atleast_2d(queries))
+        with self._lock:
+            matrix, ids = self.matrix, self.ids
+        if not ids:
+            return [[] for _ in range(len(queries))]
+        if queries.shape[1] != matrix.shape[1]:
+            raise ValueError(f"Expected {matrix.shape[1]}-dimensional queries, got {queries.shape[1]}")
+
+        # float16 has no BLAS path, so score in float32
+        scores = queries @ matrix.astype(np.float32, copy=False).T
+        k = min(k, len(ids))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        results = []
+        for row_idx, row_scores in zip(top, top_scores):
+            results.append([(ids[i], float(s)) for i, s in zip(row_idx, row_scores)
+                            if min_score is None or s >= min_score])
+        return results
@@ -0,0 +1,168 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from src.core.config import settings
+from src.core.logging import get_logger
+from src.core.metrics import record_cache
+
+logger = get_logger("Result Cache")
+
+
+class ResultCache:
+    """
+    Content-addressed cache for classification results.
+
+    Two tiers:
+        - an in-process LRU (OrderedDict) bounded by `max_entries`
+        - an optional on-disk tier (one JSON file per key) under `settings.storage.cache_dir`,
+          bounded by `max_disk_bytes`; the least recently used files are evicted first
+
+    Keys come from `make_key`, a SHA-256 over the image bytes plus anything else the result
+    depends on (model names, prompt version), so a changed prompt never serves stale data.
+    """
+
+    def __init__(self, max_entries: int = None, use_disk: bool = None,
+                 disk_dir: Path = None, max_disk_bytes: int = None):
+        cfg = settings.cache
+        self.max_entries = max_entries if max_entries is not None else cfg.max_entries
+        self.use_disk = use_disk if use_disk is not None else cfg.use_disk
+        self.disk_dir = Path(disk_dir or settings.storage.cache_dir / "results")
+        self.max_disk_bytes = max_disk_bytes if max_disk_bytes is not None else cfg.max_disk_bytes
+
+        self._memory = OrderedDict()
+        self._disk_index = OrderedDict()  # key -> file size, oldest first
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.use_disk:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._load_disk_index()
+
+    @staticmethod
+    def make_key(image_bytes: bytes, *parts) -> str:
+        """Hash image bytes together with the model names / prompt version they were run with."""
+        h = hashlib.sha256(image_bytes)
+        for part in parts:
+            h.update(b"\0")
+            h.update(str(part).encode("utf-8"))
+        return h.hexdigest()
+
+    def get(self, key: str):
+        """Return a copy of the cached value for `key`, or None on a miss. Copies are deep,
+           so callers may mutate nested results without corrupting the cache."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                record_cache("hit")
+                return copy.deepcopy(self._memory[key])
+            on_disk = key in self._disk_index
+
+        if on_disk:
+            value = self._read_disk(key)
+            if value is not None:
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                    self._remember(key, copy.deepcopy(value))
+                record_cache("disk_hit")
+                return value
+
+        with self._lock:
+            self.misses += 1
+        record_cache("miss")
+        return None
+
+    def set(self, key: str, value: dict):
+        """Store a JSON-serialisable value in both tiers."""
+        with self._lock:
+            self._remember(key, copy.deepcopy(value))
+        if self.use_disk:
+            self._write_disk(key, value)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": len(self._disk_index),
+                "disk_bytes": self._disk_bytes,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            for key in list(self._disk_index):
+                self._remove_disk(key)
+
+    # ---------------- Internals ----------------
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.json"
+
+    def _load_disk_index(self):
+        files = sorted(self.disk_dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for path in files:
+            size = path.stat().st_size
+            self._disk_index[path.stem] = size
+            self._disk_bytes += size
+        logger.info(f"Loaded {len(self._disk_index)} cached results from {self.disk_dir}")
+
+    def _read_disk(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable cache entry {key}: {e}")
+            with self._lock:
+                self._remove_disk(key)
+            return None
+        with self._lock:
+            if key in self._disk_index:
+                self._disk_index.move_to_end(key)
+        return value
+
+    def _write_disk(self, key, value):
+        data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        path = self._path(key)
+        tmp = path.with_suffix(".tmp")
+        try:
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Failed to write cache entry {key}: {e}")
+            return
+        with self._lock:
+            self._disk_bytes -= self._disk_index.pop(key, 0)
+            self._disk_index[key] = len(data)
+            self._disk_bytes += len(data)
+            while self._disk_bytes > self.max_disk_bytes and len(self._disk_index) > 1:
+                oldest = next(iter(self._disk_index))
+                self._remove_disk(oldest)
+
+    def _remove_disk(self, key):
+        self._disk_bytes -= self._disk_index.pop(key, 0)
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
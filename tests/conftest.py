@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# keep test runs out of the tracked logs/ and cache/ directories
+_tmp = tempfile.mkdtemp(prefix="cert-tests-")
+os.environ.setdefault("LOG_FILE", os.path.join(_tmp, "app.log"))
+os.environ.setdefault("CACHE_DIR", os.path.join(_tmp, "cache"))
+os.environ.setdefault("OUTPUT_DIR", os.path.join(_tmp, "outputs"))
+os.environ.setdefault("TEMP_DIR", os.path.join(_tmp, "temp"))
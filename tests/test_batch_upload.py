@@ -0,0 +1,72 @@
+import asyncio
+import io
+import zipfile
+
+import pytest
+
+pytest.importorskip("fastapi")
+import main
+
+
+def _zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    return buffer.getvalue()
+
+
+def test_expand_upload_keeps_only_images():
+    data = _zip({"a.png": b"png", "notes.txt": b"text", "__MACOSX/a.png": b"meta"})
+    assert main.expand_upload("batch.zip", data) == [("a.png", b"png")]
+
+
+def test_expand_upload_refuses_zip_bomb_before_reading(monkeypatch):
+    monkeypatch.setattr(main.settings.batch, "max_compression_ratio", 100.0)
+    data = _zip({"bomb.png": b"\0" * (5 * 1024 * 1024)})
+    with pytest.raises(main.UploadTooLarge):
+        main.expand_upload("bomb.zip", data)
+
+
+def test_expand_upload_budget_spans_files(monkeypatch):
+    monkeypatch.setattr(main.settings.batch, "max_files", 2)
+    budget = {"files": 2, "bytes": 1024}
+    main.expand_upload("a.png", b"a", budget)
+    main.expand_upload("b.png", b"b", budget)
+    with pytest.raises(main.UploadTooLarge):
+        main.expand_upload("c.png", b"c", budget)
+
+
+def test_batch_runs_a_bounded_window_and_cancels_on_close(monkeypatch):
+    monkeypatch.setattr(main.settings.batch, "concurrency", 2)
+    monkeypatch.setattr(main, "get_ocr_pool", lambda: None)
+    state = {"running": 0, "peak": 0, "cancelled": 0}
+
+    async def classify(image_bytes, ocr_executor=None, template_key=None):
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        try:
+            await asyncio.sleep(0.01 if image_bytes == b"fast" else 10)
+        except asyncio.CancelledError:
+            state["cancelled"] += 1
+            raise
+        finally:
+            state["running"] -= 1
+        return {"parsed": {}}
+
+    monkeypatch.setattr(main, "classify_certificate", classify)
+
+    async def run():
+        items = [("0", b"fast"), ("1", b"slow"), ("2", b"slow"), ("3", b"slow")]
+        results = main._batch_results(items)
+        first = await results.__anext__()
+        # client goes away after the first line
+        await results.aclose()
+        await asyncio.sleep(0)
+        return first
+
+    assert '"file": "0"' in asyncio.run(run())
+    assert state["peak"] == 2
+    # "1" was in flight and is cancelled; "2" and "3" never started
+    assert state["cancelled"] == 1
+    assert state["running"] == 0
@@ -0,0 +1,121 @@
+import io
+
+import pytest
+
+pytest.importorskip("cryptography")
+pytest.importorskip("rich")
+from cryptography.fernet import InvalidToken
+
+from src.certificate_security import certificate_hash
+from src.certificate_security.certificate_hash import CertificateCipher
+
+PAYLOAD = {"certificate_id": "34254435435", "name": "Praveen"}
+
+
+@pytest.fixture
+def derivations(monkeypatch):
+    monkeypatch.setattr(certificate_hash, "PBKDF2_ITERATIONS", 1000)
+    certificate_hash._key_cache.clear()
+    calls = []
+    real = certificate_hash.PBKDF2HMAC
+
+    def counting(*args, **kwargs):
+        calls.append(kwargs.get("salt"))
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(certificate_hash, "PBKDF2HMAC", counting)
+    return calls
+
+
+def test_legacy_and_session_tokens_round_trip(derivations):
+    cipher = CertificateCipher()
+    session = cipher.open_session("pw")
+    assert cipher.decrypt(cipher.encrypt(PAYLOAD, "pw"), "pw") == PAYLOAD
+    assert cipher.decrypt(session.encrypt(PAYLOAD), "pw") == PAYLOAD
+
+
+def test_wrong_password_on_session_token_runs_pbkdf2_once(derivations):
+    cipher = CertificateCipher()
+    token = cipher.open_session("pw").encrypt(PAYLOAD)
+    derivations.clear()
+    with pytest.raises(InvalidToken):
+        cipher.decrypt(token, "wrong")
+    assert len(derivations) == 1
+
+
+def test_key_cache_does_not_hold_a_plain_password_hash(derivations):
+    import hashlib
+
+    CertificateCipher().encrypt(PAYLOAD, "pw")
+    unsalted = hashlib.sha256(b"pw").digest()
+    assert all(unsalted not in key for key in certificate_hash._key_cache)
+
+
+def _stream(data, chunk_size=16):
+    out = io.BytesIO()
+    CertificateCipher().encrypt_stream(io.BytesIO(data), out, "pw", chunk_size=chunk_size)
+    return out.getvalue()
+
+
+def _decrypt_stream(blob):
+    out = io.BytesIO()
+    CertificateCipher().decrypt_stream(io.BytesIO(blob), out, "pw")
+    return out.getvalue()
+
+
+def test_stream_round_trip(derivations):
+    data = bytes(range(256)) * 3
+    assert _decrypt_stream(_stream(data)) == data
+    assert _decrypt_stream(_stream(b"")) == b""
+
+
+def test_stream_rejects_oversized_header_chunk_size(derivations):
+    header = certificate_hash.STREAM_HEADER
+    magic, _, salt, prefix = header.unpack(_stream(b"abc")[:header.size])
+    forged = header.pack(magic, 0xFFFFFFFF, salt, prefix) + certificate_hash.STREAM_RECORD.pack(0x7FFFFFFF)
+    with pytest.raises(ValueError, match="chunk size"):
+        _decrypt_stream(forged)
+    with pytest.raises(ValueError):
+        _stream(b"abc", chunk_size=certificate_hash.STREAM_MAX_CHUNK_SIZE + 1)
+
+
+def test_stream_rejects_trailing_bytes(derivations):
+    with pytest.raises(ValueError, match="trailing"):
+        _decrypt_stream(_stream(b"payload" * 10) + b"junk")
+
+
+def test_bulk_unpicklable_item_fails_alone(monkeypatch):
+    import threading
+
+    monkeypatch.setattr(certificate_hash, "PBKDF2_ITERATIONS", 1000)
+    items = [(PAYLOAD, "pw"), ({"bad": threading.Lock()}, "pw"), (PAYLOAD, "pw")]
+    results = list(CertificateCipher().encrypt_many(items, processes=1))
+    assert [r.index for r in results] == [0, 1, 2]
+    assert [r.ok for r in results] == [True, False, True]
+    assert "pickle" in results[1].error
+
+
+def test_watermark_overlay_is_cached_per_size_text_and_font():
+    from PIL import Image
+
+    certificate_hash._watermark_overlay.cache_clear()
+    cipher = CertificateCipher()
+    image = Image.new("RGB", (400, 300), "white")
+
+    first = cipher.add_watermark(image)
+    second = cipher.add_watermark(image)
+    info = certificate_hash._watermark_overlay.cache_info()
+    assert (info.misses, info.hits) == (1, 1)
+    # the shared overlay is not modified by compositing
+    assert first.tobytes() == second.tobytes()
+    assert image.tobytes() == Image.new("RGB", (400, 300), "white").tobytes()
+
+    overlay = certificate_hash._watermark_overlay((400, 300), "VERIFIED", certificate_hash.WATERMARK_FONT)
+    assert certificate_hash._watermark_overlay((400, 300), "VERIFIED", certificate_hash.WATERMARK_FONT) is overlay
+
+    other_text = cipher.add_watermark(image, watermark_text="REVOKED")
+    other_size = cipher.add_watermark(Image.new("RGB", (300, 400), "white"))
+    assert certificate_hash._watermark_overlay.cache_info().misses == 3
+    assert other_text.tobytes() != first.tobytes()
+    assert other_size.size == (300, 400)
+    assert certificate_hash._watermark_overlay((300, 400), "VERIFIED", certificate_hash.WATERMARK_FONT) is not overlay
@@ -0,0 +1,78 @@
+import asyncio
+import io
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import main
+
+
+def _png():
+    buffer = io.BytesIO()
+    Image.linear_gradient("L").convert("RGB").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    keys = {"good-key": 7}
+    monkeypatch.setattr(main.certificate_db, "get_university_univ_id_by_private_key", keys.get)
+    monkeypatch.setattr(main.certificate_db, "update_certificate_image_hash",
+                        lambda cert_id, value, univ_id: cert_id == "c1" and univ_id == 7)
+    monkeypatch.setattr(main, "phash_index", main.PerceptualHashIndex())
+    return TestClient(main.app)
+
+
+def test_registering_an_image_hash_needs_the_university_key(client):
+    files = {"file": ("c.png", _png(), "image/png")}
+    assert client.post("/certificates/c1/image", files=files).status_code == 401
+    assert client.post("/certificates/c1/image", files=files,
+                       headers={"X-University-Key": "wrong"}).status_code == 401
+    assert len(main.phash_index) == 0
+
+    response = client.post("/certificates/c1/image", files=files, headers={"X-University-Key": "good-key"})
+    assert response.status_code == 200
+    assert len(main.phash_index) == 1
+
+
+def test_unknown_certificate_is_not_indexed(client):
+    response = client.post("/certificates/other/image", files={"file": ("c.png", _png(), "image/png")},
+                           headers={"X-University-Key": "good-key"})
+    assert response.status_code == 404
+    assert len(main.phash_index) == 0
+
+
+def test_upload_is_decoded_once_for_ocr_and_phash(monkeypatch):
+    decodes = []
+    real_load_image = main.load_image
+    monkeypatch.setattr(main, "load_image", lambda data: decodes.append(1) or real_load_image(data))
+    monkeypatch.setattr(main, "ocr_with_quality", lambda img: ("", main.assess_ocr_quality([], [])))
+
+    async def no_model(image_bytes, ocr_text, quality, known=None):
+        return {"method": "raw", "parsed": None, "raw": ""}
+
+    monkeypatch.setattr(main, "_classify_ocr_text", no_model)
+    result = asyncio.run(main.classify_certificate(_png()))
+    assert len(decodes) == 1
+    assert len(result["image_hash"]) == 16
+
+
+def test_near_duplicates_are_matched_before_ocr(monkeypatch):
+    image = _png()
+    index = main.PerceptualHashIndex()
+    index.add("issued-1", main.image_hash(main.load_image(image)))
+    monkeypatch.setattr(main, "phash_index", index)
+    monkeypatch.setattr(main.settings.phash, "short_circuit", True)
+    main.result_cache.clear()
+
+    def no_ocr(img):
+        raise AssertionError("OCR ran for a near-duplicate")
+
+    monkeypatch.setattr(main, "ocr_preprocessed", no_ocr)
+    result = asyncio.run(main.classify_certificate(image))
+    assert result["method"] == "near_duplicate"
+    assert result["near_duplicates"] == [{"cert_id": "issued-1", "distance": 0}]
@@ -0,0 +1,179 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+pytest.importorskip("bcrypt")
+from psycopg2 import pool as pg_pool
+
+from src.core.config import settings
+from src.storage import database
+from src.storage.database import SingleConnectionPool, SupabaseDB
+
+
+@pytest.fixture
+def db():
+    connection = sqlite3.connect(":memory:", check_same_thread=False)
+    db = SupabaseDB(pool=SingleConnectionPool(connection), paramstyle="qmark")
+    db.run_query("CREATE TABLE admins (name TEXT, email TEXT UNIQUE)")
+    yield db
+    db.close()
+
+
+def test_run_query_binds_params_and_fetches(db):
+    db.run_query("INSERT INTO admins (name, email) VALUES (%s, %s)", ("A", "a@x.org"))
+    db.run_query("INSERT INTO admins (name, email) VALUES (%s, %s)", ("B'); DROP TABLE admins;--", "b@x.org"))
+    assert db.run_query("SELECT COUNT(*) FROM admins", fetch_one=True) == (2,)
+    assert db.run_query("SELECT name FROM admins WHERE email = %s", ("a@x.org",), fetch_all=True) == [("A",)]
+
+
+def test_transaction_rolls_back_every_statement(db):
+    with pytest.raises(sqlite3.IntegrityError):
+        with db.transaction() as cur:
+            db.run_query("INSERT INTO admins (name, email) VALUES (%s, %s)", ("A", "a@x.org"), cursor=cur)
+            db.run_query("INSERT INTO admins (name, email) VALUES (%s, %s)", ("A", "a@x.org"), cursor=cur)
+    assert db.run_query("SELECT COUNT(*) FROM admins", fetch_one=True) == (0,)
+
+
+class RecordingPool:
+    def __init__(self, connection):
+        self.connection = connection
+        self.returned = []
+
+    def getconn(self):
+        return self.connection
+
+    def putconn(self, conn, close=False):
+        self.returned.append(close)
+
+
+def test_checkout_waits_then_raises_pool_error(monkeypatch):
+    monkeypatch.setattr(settings.database, "pool_max", 1)
+    monkeypatch.setattr(settings.database, "pool_timeout", 0.05)
+    db = SupabaseDB(pool=RecordingPool(object()))
+    with db.connection():
+        with pytest.raises(pg_pool.PoolError):
+            with db.connection():
+                pass
+    # the slot is free again once the first block exits
+    with db.connection():
+        pass
+
+
+def test_broken_connection_is_closed_by_the_pool():
+    pool = RecordingPool(object())
+    db = SupabaseDB(pool=pool)
+    with db.connection():
+        pass
+    with pytest.raises(psycopg2.OperationalError):
+        with db.connection():
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+    assert pool.returned == [False, True]
+
+
+def test_connect_raises_when_the_database_is_unreachable(monkeypatch):
+    def refuse(*args, **kwargs):
+        raise psycopg2.OperationalError("connection refused")
+
+    monkeypatch.setattr(database.pg_pool, "ThreadedConnectionPool", refuse)
+    db = SupabaseDB()
+    with pytest.raises(psycopg2.OperationalError):
+        db.connect()
+    assert db.pool is None
+
+
+
+def test_concurrent_first_connects_build_one_pool(monkeypatch):
+    created = []
+
+    def slow_pool(*args, **kwargs):
+        time.sleep(0.05)  # long enough for every thread to find no pool yet
+        created.append(object())
+        return created[-1]
+
+    monkeypatch.setattr(database.pg_pool, "ThreadedConnectionPool", slow_pool)
+    monkeypatch.setattr(database, "register_db_pool", lambda pool: None)
+    db = SupabaseDB()
+    start = threading.Barrier(8)
+
+    def first_request():
+        start.wait()
+        db.connect()
+
+    threads = [threading.Thread(target=first_request) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(created) == 1
+    assert db.pool is created[0]
+
+@pytest.fixture
+def universities(db, monkeypatch):
+    monkeypatch.setattr(settings.security, "key_fingerprint_secret", "test-fingerprint-secret")
+    db.run_query("""CREATE TABLE universities (univ_id INTEGER PRIMARY KEY, name TEXT, address TEXT,
+                    created_at TEXT, private_key TEXT, private_key_fingerprint TEXT UNIQUE)""")
+    for univ_id, key, fingerprint in ((1, "key-one", True), (2, "key-legacy", False)):
+        hashed = database.bcrypt.hashpw(key.encode(), database.bcrypt.gensalt(4)).decode()
+        db.run_query("INSERT INTO universities (univ_id, name, private_key, private_key_fingerprint) VALUES (%s, %s, %s, %s)",
+                     (univ_id, f"univ {univ_id}", hashed, db.private_key_fingerprint(key) if fingerprint else None))
+    checks = []
+    real_checkpw = database.bcrypt.checkpw
+    monkeypatch.setattr(database.bcrypt, "checkpw", lambda pw, h: checks.append(pw) or real_checkpw(pw, h))
+    return db, checks
+
+
+def test_private_key_lookup_is_one_query_and_one_bcrypt_check(universities):
+    db, checks = universities
+    assert db._find_university_by_private_key("key-one", "univ_id") == (1,)
+    assert len(checks) == 1
+    # unknown and legacy keys cost no bcrypt work at all
+    assert db._find_university_by_private_key("not-a-key", "univ_id") is None
+    assert db._find_university_by_private_key("key-legacy", "univ_id") is None
+    assert len(checks) == 1
+
+
+def test_backfill_makes_legacy_rows_findable(universities):
+    db, checks = universities
+    assert db.backfill_private_key_fingerprints(["key-legacy"]) == 1
+    checks.clear()
+    assert db._find_university_by_private_key("key-legacy", "univ_id") == (2,)
+    assert len(checks) == 1
+
+
+def test_fingerprint_requires_its_own_secret(monkeypatch):
+    monkeypatch.setattr(settings.security, "key_fingerprint_secret", None)
+    with pytest.raises(RuntimeError):
+        SupabaseDB(pool=object()).private_key_fingerprint("key")
+
+
+def test_bulk_csv_empty_cells_are_null_and_dob_is_a_date(db, tmp_path):
+    db.run_query("""CREATE TABLE students (name TEXT, email TEXT, password TEXT, roll_no TEXT,
+                    dob DATE, univ_id TEXT, passed_out_year INTEGER)""")
+    csv_path = tmp_path / "students.csv"
+    csv_path.write_text("name,email,password,roll_no,dob,univ_id,passed_out_year\n"
+                        "Asha,a@x.org,pw,R1,07-03-2001,,2023\n"
+                        "Ravi,r@x.org,pw,R2,31-02-2001,U1,\n"
+                        "Mina,m@x.org,pw,R3,2001-03-07,U1,2022\n")
+    stats = db.bulk_insert_students(csv_path, bcrypt_rounds=4, processes=1)
+    assert (stats["rows"], stats["skipped"]) == (1, 2)
+    assert db.run_query("SELECT dob, univ_id, passed_out_year FROM students", fetch_all=True) == [
+        ("2001-03-07", None, 2023)]
+
+    db.run_query("CREATE TABLE certificates (%s)" % ", ".join(database.CERTIFICATE_COLUMNS))
+    certs = tmp_path / "certificates.csv"
+    certs.write_text("roll_no,batch_year,issued_date,signature_embeddings\nR1,,,\n")
+    db.bulk_insert_certificates(certs)
+    assert db.run_query("SELECT roll_no, batch_year, issued_date, signature_embeddings FROM certificates",
+                        fetch_one=True) == ("R1", None, None, None)
+
+
+def test_image_hash_update_reports_whether_a_row_changed(db):
+    db.run_query("CREATE TABLE certificates (cert_id TEXT, univ_id INTEGER, image_hash TEXT)")
+    db.run_query("INSERT INTO certificates (cert_id, univ_id) VALUES (%s, %s)", ("c1", 1))
+    assert db.update_certificate_image_hash("c1", "00ff00ff00ff00ff", univ_id=1) is True
+    assert db.update_certificate_image_hash("c1", "ffffffffffffffff", univ_id=2) is False
+    assert db.update_certificate_image_hash("missing", "ffffffffffffffff") is False
+    assert db.run_query("SELECT image_hash FROM certificates", fetch_one=True) == ("00ff00ff00ff00ff",)
@@ -0,0 +1,32 @@
+import threading
+
+import pytest
+
+pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+
+import app
+
+
+def test_debug_writer_drops_artifacts_when_its_queue_is_full(tmp_path, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    written = []
+
+    def slow_write(self, base, img, results):
+        started.set()
+        release.wait(5)
+        written.append(base)
+
+    monkeypatch.setattr(app.DebugArtifactWriter, "_write", slow_write)
+    writer = app.DebugArtifactWriter(output_dir=tmp_path, maxsize=1)
+    img = np.zeros((4, 4, 3), dtype=np.uint8)
+
+    assert writer.submit("a", img, [])
+    started.wait(5)  # "a" is being written, the queue is empty again
+    assert writer.submit("b", img, [])
+    assert not writer.submit("c", img, [])
+
+    release.set()
+    writer.flush()
+    assert written == ["a", "b"]
+
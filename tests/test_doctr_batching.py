@@ -0,0 +1,48 @@
+import asyncio
+import sys
+import types
+
+from src.certificate_data_extraction import certificate_image_data_extraction as extraction
+from src.certificate_data_extraction import CertificateDataExtractor
+
+
+class StubPredictor:
+    """Echoes each page back as a one-word line, recording every batch it is given."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, pages):
+        self.batches.append(list(pages))
+        exported = [{"blocks": [{"lines": [{"words": [{"value": page}]}]}]} for page in pages]
+        return types.SimpleNamespace(export=lambda: {"pages": exported})
+
+
+def test_concurrent_run_doctr_calls_share_one_lazily_loaded_predictor_batch(monkeypatch):
+    predictor, loads = StubPredictor(), []
+
+    def ocr_predictor(**kwargs):
+        loads.append(kwargs)
+        return predictor
+
+    doctr = types.ModuleType("doctr")
+    doctr.models = types.SimpleNamespace(ocr_predictor=ocr_predictor)
+    monkeypatch.setitem(sys.modules, "doctr", doctr)
+    monkeypatch.setitem(sys.modules, "doctr.models", doctr.models)
+    monkeypatch.setattr(extraction, "_predictor", None)
+    monkeypatch.setattr(extraction, "load_document", lambda path: [f"page of {path}"])
+
+    extractor = CertificateDataExtractor(max_batch_size=8, max_wait_ms=200)
+    assert loads == []  # nothing is loaded until the first OCR request
+
+    async def run():
+        try:
+            return await asyncio.gather(*(extractor.run_doctr(p) for p in ("a.png", "b.png", "c.png")))
+        finally:
+            await extractor.batcher.close()
+
+    texts = asyncio.run(run())
+    assert texts == ["page of a.png", "page of b.png", "page of c.png"]
+    assert len(loads) == 1
+    assert len(predictor.batches) == 1
+    assert sorted(predictor.batches[0]) == ["page of a.png", "page of b.png", "page of c.png"]
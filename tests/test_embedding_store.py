@@ -0,0 +1,117 @@
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.storage.embedding_store import EmbeddingStore
+
+
+def _blob(*values):
+    return np.asarray(values, dtype="<f4").tobytes()
+
+
+ROWS = [
+    ("u1", _blob(1, 0, 0)),
+    ("u2", _blob(0, 1, 0)),
+    ("u3", _blob(1, 1, 0)),
+    ("bad", _blob(1, 0)),  # wrong dimension, skipped
+    ("none", None),
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = EmbeddingStore("universities", "signature_embeddings", snapshot_dir=tmp_path, dtype="float32")
+    assert store.build(ROWS) == 3
+    return store
+
+
+def _reopen(store, **kwargs):
+    return EmbeddingStore(store.table, store.column, snapshot_dir=store.snapshot_dir, **kwargs)
+
+
+def test_build_normalises_and_skips_odd_rows(store):
+    assert store.ids == ["u1", "u2", "u3"]
+    assert store.dim == 3
+    assert np.allclose(np.linalg.norm(store.matrix, axis=1), 1.0)
+
+
+def test_top_k_orders_by_cosine_score(store):
+    (first,) = store.top_k([1, 0.2, 0], k=3)
+    assert [key for key, _ in first] == ["u1", "u3", "u2"]
+    scores = [score for _, score in first]
+    assert scores == sorted(scores, reverse=True)
+
+    batch = store.top_k([[0, 1, 0], [1, 0, 0]], k=1)
+    assert [[key for key, _ in row] for row in batch] == [["u2"], ["u1"]]
+    assert store.top_k([1, 0.2, 0], k=3, min_score=0.5)[0][-1][0] == "u3"
+
+
+def test_save_and_load_memory_maps_the_snapshot(store):
+    store.save()
+    loaded = _reopen(store)
+    assert loaded.load()
+    assert isinstance(loaded.matrix, np.memmap)
+    assert loaded.ids == store.ids
+    assert loaded.top_k([0, 1, 0], k=1)[0][0][0] == "u2"
+
+
+def test_resave_replaces_the_previous_matrix_file(store):
+    store.save()
+    store.add("u4", [0, 0, 1])
+    store.save()
+    assert len(list(store.snapshot_dir.glob("*.npy"))) == 1
+    loaded = _reopen(store)
+    assert loaded.load() and loaded.ids == ["u1", "u2", "u3", "u4"]
+
+
+def test_load_rejects_a_mismatched_or_missing_snapshot(store):
+    assert not _reopen(store).load()
+
+    store.save()
+    snapshot = json.loads(store._ids_path.read_text())
+    store._ids_path.write_text(json.dumps({**snapshot, "ids": snapshot["ids"][:2]}))
+    assert not _reopen(store).load()
+
+    store._ids_path.write_text(json.dumps({**snapshot, "matrix": "gone.npy"}))
+    assert not _reopen(store).load()
+
+
+def test_add_appends_replaces_and_checks_the_dimension(store):
+    store.add("u4", _blob(0, 0, 2))
+    assert store.top_k([0, 0, 1], k=1)[0][0][0] == "u4"
+
+    store.add("u1", [0, 0, -1])
+    assert len(store) == 4
+    assert store.top_k([0, 0, -1], k=1)[0][0] == ("u1", pytest.approx(1.0))
+
+    with pytest.raises(ValueError):
+        store.add("u5", [1, 0])
+
+
+def test_add_to_a_loaded_snapshot_leaves_the_file_untouched(store):
+    store.save()
+    loaded = _reopen(store)
+    loaded.load()
+    loaded.add("u1", [0, 0, 1])
+    assert loaded.top_k([1, 0, 0], k=1)[0][0][0] == "u3"
+    reloaded = _reopen(store)
+    assert reloaded.load() and reloaded.top_k([1, 0, 0], k=1)[0][0][0] == "u1"
+
+
+def test_float16_store_halves_the_matrix_and_scores_the_same(store, tmp_path):
+    half = EmbeddingStore("universities", "signature_embeddings", snapshot_dir=tmp_path / "half", dtype="float16")
+    half.build(ROWS)
+    assert half.matrix.dtype == np.float16
+    assert half.matrix.nbytes * 2 == store.matrix.nbytes
+
+    query = [0.3, 0.9, 0.1]
+    expected = store.top_k(query, k=3)[0]
+    got = half.top_k(query, k=3)[0]
+    assert [key for key, _ in got] == [key for key, _ in expected]
+    assert [score for _, score in got] == pytest.approx([score for _, score in expected], abs=1e-3)
+
+    half.save()
+    loaded = _reopen(half, dtype="float16")
+    assert loaded.load() and loaded.matrix.dtype == np.float16
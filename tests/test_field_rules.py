@@ -0,0 +1,50 @@
+from src.certificate_data_extraction.field_rules import (CERTIFICATE_FIELDS, UPLOAD_FIELDS, extract_fields,
+                                                          missing_fields, to_upload_fields)
+
+# All-caps OCR output as Tesseract returns it for typical university certificates
+JNTU = """JAWAHARLAL NEHRU TECHNOLOGICAL UNIVERSITY ANANTAPUR
+PROVISIONAL CERTIFICATE
+This is to certify that KONDA RAVI KUMAR
+bearing Hall Ticket No. 19F61A0512 of Sri Venkateswara College of Engineering
+has been admitted to the degree of BACHELOR OF TECHNOLOGY in COMPUTER SCIENCE AND ENGINEERING
+EXAMINATION HELD IN MARCH 2023
+"""
+
+INTERMEDIATE = """BOARD OF INTERMEDIATE EDUCATION
+MEMORANDUM OF MARKS
+SEAT ALLOTTED AT CENTRE: HYDERABAD
+NAME OF THE CANDIDATE: MOHAMMED IRFAN
+REGD. NO. 2145678901
+"""
+
+
+def test_heuristic_issuing_authority_is_not_trusted():
+    extracted = extract_fields(JNTU, UPLOAD_FIELDS)
+    authority = extracted["Issuing Authority"]
+    assert authority["value"].startswith("JAWAHARLAL NEHRU TECHNOLOGICAL UNIVERSITY")
+    # no label anchors it, so the LLM is still asked
+    assert "Issuing Authority" in missing_fields(extracted, min_confidence=0.7)
+    assert "Certificate Title" in missing_fields(extracted, min_confidence=0.7)
+    assert extracted["Full Name"] == {"value": "KONDA RAVI KUMAR", "confidence": 0.75}
+
+
+def test_jntu_roll_number_and_loose_exam_year():
+    extracted = extract_fields(JNTU, CERTIFICATE_FIELDS)
+    assert extracted["roll_no"] == {"value": "19F61A0512", "confidence": 0.9}
+    assert extracted["examination_year"]["value"] == "2023"
+    assert "examination_year" in missing_fields(extracted, min_confidence=0.7)
+
+
+def test_bare_seat_anchor_does_not_capture_a_word():
+    extracted = extract_fields(INTERMEDIATE, CERTIFICATE_FIELDS)
+    assert extracted["roll_no"]["value"] == "2145678901"
+    assert extract_fields("SEAT ALLOTTED AT CENTRE", ["roll_no"])["roll_no"]["value"] is None
+    assert extracted["student_name"]["value"] == "MOHAMMED IRFAN"
+
+
+def test_to_upload_fields_maps_certificate_names():
+    mapped = to_upload_fields({"student_name": {"value": "Asha Rao", "confidence": 0.9, "box": []},
+                               "cgpa": {"value": "8.1", "confidence": 0.9, "box": []}})
+    assert list(mapped) == UPLOAD_FIELDS
+    assert mapped["Full Name"] == {"value": "Asha Rao", "confidence": 0.9}
+    assert mapped["Certificate ID"] == {"value": None, "confidence": 0.0}
@@ -0,0 +1,49 @@
+import asyncio
+import time
+
+from src.jobs import JobQueue, JobStore
+from src.jobs.store import DONE, QUEUED, RUNNING
+
+
+def test_claim_is_atomic(tmp_path):
+    first, second = JobStore(tmp_path / "jobs.sqlite3"), JobStore(tmp_path / "jobs.sqlite3")
+    job_id = first.create("a.png", b"img")
+    assert first.claim(job_id, "worker-1", 60) is True
+    assert second.claim(job_id, "worker-2", 60) is False
+    assert second.get(job_id)["status"] == RUNNING
+
+
+def test_only_expired_leases_are_recovered(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    live, dead = store.create("live.png", b"1"), store.create("dead.png", b"2")
+    store.claim(live, "alive", 60)
+    store.claim(dead, "crashed", -1)
+    assert store.recover_stale() == [dead]
+    assert store.get(dead)["status"] == QUEUED
+    assert store.get(live)["status"] == RUNNING
+
+
+def test_queues_sharing_a_store_run_each_job_once(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    seeded = JobStore(path)
+    job_ids = [seeded.create(f"{i}.png", str(i).encode()) for i in range(5)]
+    runs = []
+
+    async def handler(payload):
+        runs.append(payload)
+        await asyncio.sleep(0.01)
+        return {"payload": payload.decode()}
+
+    async def run():
+        queues = [JobQueue(handler, workers=2, store=JobStore(path)) for _ in range(3)]
+        for queue in queues:
+            await queue.start()
+        deadline = time.time() + 5
+        while time.time() < deadline and any(seeded.get(j)["status"] != DONE for j in job_ids):
+            await asyncio.sleep(0.02)
+        for queue in queues:
+            await queue.stop()
+
+    asyncio.run(run())
+    assert sorted(runs) == sorted(str(i).encode() for i in range(5))
+    assert all(seeded.get(j)["status"] == DONE for j in job_ids)
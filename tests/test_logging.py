@@ -0,0 +1,30 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from src.core import logging as app_logging
+from src.core.config import settings
+
+
+def _log_in_worker(message):
+    app_logging.get_logger("Fork Test").info(message)
+    return app_logging._listener is None
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_forked_workers_log_through_the_parent_listener():
+    app_logging.get_logger("Fork Test")
+    message = f"from a pool worker {time.time()}"
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("fork")) as pool:
+        # no listener (and so no file handler) of its own in the worker
+        assert pool.submit(_log_in_worker, message).result() is True
+
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        if message in settings.storage.log_file.read_text(encoding="utf-8"):
+            break
+        time.sleep(0.05)
+    assert message in settings.storage.log_file.read_text(encoding="utf-8")
+    assert app_logging._listener is not None
@@ -0,0 +1,69 @@
+import importlib.util
+import sys
+
+import pytest
+
+from src.core import metrics
+
+
+def _load_metrics_without_prometheus(monkeypatch):
+    # a None entry makes `from prometheus_client import ...` raise ImportError
+    monkeypatch.setitem(sys.modules, "prometheus_client", None)
+    monkeypatch.setattr(metrics.settings.monitoring, "enable_metrics", True)
+    spec = importlib.util.spec_from_file_location("metrics_without_prometheus", metrics.__file__)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_metrics_are_no_ops_without_prometheus_client(monkeypatch):
+    fallback = _load_metrics_without_prometheus(monkeypatch)
+    assert not fallback.PROMETHEUS_AVAILABLE and not fallback.ENABLED
+    assert not hasattr(fallback, "REQUESTS")
+
+    fallback.start_metrics_server()
+    fallback.record_request("GET", "/cache/stats", 200, 0.01)
+    fallback.observe_stage("ocr", 0.5)
+    fallback.record_routing("text")
+    fallback.record_cache("hit")
+    fallback.record_tokens("model", 10, 20)
+    fallback.record_job("done")
+    fallback.register_db_pool(object())
+    fallback.register_job_queue(object())
+    with fallback.track_stage("ocr"), fallback.track_in_flight():
+        pass
+    assert not fallback._server_started
+
+
+def test_track_stage_still_raises_through_the_no_op(monkeypatch):
+    fallback = _load_metrics_without_prometheus(monkeypatch)
+    with pytest.raises(ValueError):
+        with fallback.track_stage("ocr"):
+            raise ValueError("stage failed")
+
+
+@pytest.fixture
+def requests(monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    import main
+
+    recorded = []
+    monkeypatch.setattr(main.metrics, "record_request",
+                        lambda method, path, status, seconds: recorded.append((method, path, status)))
+    from fastapi.testclient import TestClient
+    return TestClient(main.app), recorded
+
+
+def test_middleware_labels_requests_by_route_template(requests):
+    client, recorded = requests
+    client.post("/certificates/c-123/image", files={"file": ("c.png", b"png", "image/png")})
+    client.post("/certificates/c-456/image", files={"file": ("c.png", b"png", "image/png")})
+    client.get("/cache/stats?verbose=1")
+    client.get("/no/such/page/42")
+    assert recorded == [
+        ("POST", "/certificates/{cert_id}/image", 401),
+        ("POST", "/certificates/{cert_id}/image", 401),
+        ("GET", "/cache/stats", 200),
+        ("GET", "unmatched", 404),
+    ]
@@ -0,0 +1,77 @@
+import asyncio
+import json
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from benchmarks.stub_ollama import GENERATE_ANSWER, StubOllama
+from src.core.config import settings
+from src.llm.ollama_client import OllamaClient
+
+
+async def _generate_text(client, payload=None):
+    parts = []
+    async for line in client.stream_generate(payload or {"model": "m", "prompt": "p"}):
+        parts.append(json.loads(line).get("response", ""))
+    return "".join(parts)
+
+
+def test_stream_generate_yields_every_chunk():
+    with StubOllama(latency_ms=0, chunk_chars=5) as stub:
+        client = OllamaClient(base_url=stub.base_url)
+
+        async def run():
+            try:
+                return await _generate_text(client)
+            finally:
+                await client.aclose()
+
+        assert json.loads(asyncio.run(run())) == GENERATE_ANSWER
+
+
+def test_client_survives_several_event_loops():
+    # the semaphore and connection pool are per loop, so a contended semaphore from
+    # one asyncio.run must not break the next
+    with StubOllama(latency_ms=20) as stub:
+        client = OllamaClient(base_url=stub.base_url, max_concurrency=1)
+
+        async def run():
+            texts = await asyncio.gather(*(_generate_text(client) for _ in range(3)))
+            return [json.loads(t) for t in texts]
+
+        for _ in range(2):
+            assert asyncio.run(run()) == [GENERATE_ANSWER] * 3
+
+
+def test_error_status_is_yielded_not_raised():
+    with StubOllama(latency_ms=0, error_status=404) as stub:
+        client = OllamaClient(base_url=stub.base_url)
+
+        async def run():
+            return [line async for line in client.stream_generate({"model": "missing"})]
+
+        lines = asyncio.run(run())
+        assert json.loads(lines[0]) == {"error": "stub error 404"}
+
+
+def test_per_call_timeout_keeps_connect_timeout():
+    timeout = OllamaClient._timeout(5)
+    assert timeout.read == 5
+    assert timeout.connect == settings.ollama.connect_timeout
+
+
+def test_error_body_is_raw_output_not_parsed_json(monkeypatch):
+    main = pytest.importorskip("main")
+    with StubOllama(latency_ms=0, error_status=500) as stub:
+        monkeypatch.setattr(main, "ollama_client", OllamaClient(base_url=stub.base_url))
+
+        async def run():
+            try:
+                return await main.call_ollama_text_model("text")
+            finally:
+                await main.ollama_client.aclose()
+
+        parsed, raw, first_json_s = asyncio.run(run())
+    assert parsed is None and first_json_s is None
+    assert "stub error 500" in raw
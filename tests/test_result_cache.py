@@ -0,0 +1,37 @@
+from src.storage.result_cache import ResultCache
+
+
+def test_lru_evicts_oldest_entry():
+    cache = ResultCache(max_entries=2, use_disk=False)
+    cache.set("a", {"v": 1})
+    cache.set("b", {"v": 2})
+    cache.get("a")
+    cache.set("c", {"v": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1}
+    assert cache.get("c") == {"v": 3}
+
+
+def test_mutating_results_does_not_corrupt_cache():
+    cache = ResultCache(max_entries=4, use_disk=False)
+    value = {"parsed": {"Full Name": "A"}}
+    cache.set("k", value)
+    value["parsed"]["Full Name"] = "changed before get"
+
+    hit = cache.get("k")
+    hit["parsed"]["Full Name"] = "changed after get"
+    assert cache.get("k") == {"parsed": {"Full Name": "A"}}
+
+
+def test_disk_tier_survives_a_new_instance(tmp_path):
+    cache = ResultCache(max_entries=4, use_disk=True, disk_dir=tmp_path)
+    key = ResultCache.make_key(b"image", "model", "1")
+    cache.set(key, {"parsed": {"x": 1}})
+
+    reopened = ResultCache(max_entries=4, use_disk=True, disk_dir=tmp_path)
+    assert reopened.get(key) == {"parsed": {"x": 1}}
+    assert reopened.stats()["disk_hits"] == 1
+
+
+def test_key_depends_on_every_part():
+    assert ResultCache.make_key(b"img", "m", "1") != ResultCache.make_key(b"img", "m", "2")
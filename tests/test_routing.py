@@ -0,0 +1,44 @@
+import pytest
+
+from src.core.config import settings
+from src.llm import routing
+
+GOOD = ("This is to certify that Praveen Kumar of the University has successfully completed "
+        "the Bachelor of Engineering degree").split()
+GARBAGE = "xq#@ lkjw zzv ~~ qpwo 1l1l rrtx vbnq ,,; zxcq".split()
+
+
+@pytest.fixture(autouse=True)
+def builtin_vocabulary(monkeypatch):
+    # don't depend on whether /usr/share/dict/words exists on this machine
+    monkeypatch.setattr(routing, "_vocabulary", set(routing.COMMON_WORDS))
+    monkeypatch.setattr(settings.routing, "ocr_quality_threshold", 0.6)
+    monkeypatch.setattr(settings.routing, "min_words", 8)
+
+
+@pytest.mark.parametrize("case, words, confidences, route, score_range", [
+    ("good", GOOD, [92] * len(GOOD), "text", (0.9, 1.0)),
+    ("good but low confidence", GOOD, [20] * len(GOOD), "vision", (0.5, 0.6)),
+    ("good without confidences", GOOD, [-1] * len(GOOD), "vision", (0.4, 0.5)),
+    ("too few words", GOOD[:4], [95] * 4, "vision", (0.6, 1.0)),
+    ("garbage", GARBAGE, [20] * len(GARBAGE), "vision", (0.0, 0.2)),
+    ("empty", [], [], "vision", (0.0, 0.0)),
+])
+def test_route_by_ocr_quality(case, words, confidences, route, score_range):
+    quality = routing.assess_ocr_quality(words, confidences)
+    assert score_range[0] <= quality.score <= score_range[1], case
+    assert quality.n_words == len(words)
+    assert routing.choose_route(quality) == route, case
+
+
+@pytest.mark.parametrize("words, confidences, expected", [
+    (GOOD, [92] * len(GOOD), {"mean_conf": 92.0, "word_ratio": 0.889, "keyword_hits": 3}),
+    # -1 (no confidence) is ignored; digits split identifiers into alphabetic tokens
+    (["Roll", "No:", "1MS19CS001", "CGPA", "9.20"], [80, -1, 60, 70, -1],
+     {"mean_conf": 70.0, "word_ratio": 0.8, "keyword_hits": 2}),
+    (GARBAGE, [20] * len(GARBAGE), {"mean_conf": 20.0, "word_ratio": 0.0, "keyword_hits": 0}),
+    ([], [], {"mean_conf": 0.0, "word_ratio": 0.0, "keyword_hits": 0, "n_words": 0, "score": 0.0}),
+])
+def test_assess_ocr_quality_components(words, confidences, expected):
+    quality = routing.assess_ocr_quality(words, confidences).to_dict()
+    assert {key: quality[key] for key in expected} == expected
@@ -0,0 +1,47 @@
+import pytest
+
+from src.llm.stream_json import IncrementalJsonParser
+
+
+def _feed_all(chunks):
+    parser = IncrementalJsonParser()
+    for chunk in chunks:
+        if parser.feed(chunk) is not None:
+            break
+    return parser.result
+
+
+@pytest.mark.parametrize("chunks, expected", [
+    # the backslash ends one chunk, the escaped quote starts the next
+    (['{"name": "say \\', '"hi\\" }"}'], {"name": 'say "hi" }'}),
+    (['{"name": "a\\\\', '"}'], {"name": "a\\"}),
+    # braces and quotes inside strings don't change the depth
+    (['{"note": "{ not } an { object", "x": {"y": "}"}}'], {"note": "{ not } an { object", "x": {"y": "}"}}),
+    (['{"note": "{{', '{"', ', "n": 1}'], {"note": "{{{", "n": 1}),
+    # an unparseable candidate is skipped for the next object
+    (['Here: {name: Praveen} and then ', '{"name": "Praveen"}'], {"name": "Praveen"}),
+    (["{'name': 'Praveen'}"], {"name": "Praveen"}),
+])
+def test_parses_the_first_complete_object(chunks, expected):
+    assert _feed_all(chunks) == expected
+
+
+def test_each_character_as_its_own_chunk():
+    text = 'prefix {"a": "x\\"}{", "b": [1, {"c": 2}]} suffix'
+    assert _feed_all(list(text)) == {"a": 'x"}{', "b": [1, {"c": 2}]}
+
+
+@pytest.mark.parametrize("chunks", [
+    ['{"name": "Praveen", "roll_no": '],
+    ['{"name": "unterminated }'],
+    ["no json here at all"],
+    [],
+])
+def test_stream_ending_without_a_complete_object_yields_none(chunks):
+    assert _feed_all(chunks) is None
+
+
+def test_feeding_after_a_result_keeps_the_first_object():
+    parser = IncrementalJsonParser()
+    assert parser.feed('{"a": 1}') == {"a": 1}
+    assert parser.feed('{"a": 2}') == {"a": 1}
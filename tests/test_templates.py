@@ -0,0 +1,54 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from PIL import Image
+
+from src.certificate_data_extraction import templates
+from src.certificate_data_extraction.templates import FieldBox, LayoutTemplate
+
+TEMPLATE = LayoutTemplate(key="T1", fields=(
+    FieldBox("student_name", (0.1, 0.1, 0.5, 0.1)),
+    FieldBox("roll_no", (0.1, 0.3, 0.5, 0.1)),
+))
+
+
+def _fake_ocr_field(crop, field_box, lang):
+    return f"{field_box.name} value", 0.95
+
+
+def _ocr_in_worker():
+    return templates.ocr_fields(Image.new("RGB", (200, 100), "white"), TEMPLATE)
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_field_ocr_works_in_forked_workers_after_the_parent_used_its_pool(monkeypatch):
+    monkeypatch.setattr(templates, "_ocr_field", _fake_ocr_field)
+    assert _ocr_in_worker()["roll_no"]["value"] == "roll_no value"
+    assert templates._field_pool is not None
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("fork")) as pool:
+        fields = pool.submit(_ocr_in_worker).result(timeout=10)
+    assert fields["student_name"]["value"] == "student_name value"
+
+
+def test_partially_read_template_sends_only_missing_fields_onwards(monkeypatch):
+    main = pytest.importorskip("main")
+    templates.get_registry().register(TEMPLATE)
+    fields = {"student_name": {"value": "Asha Rao", "confidence": 0.95, "box": [0, 0, 1, 1]},
+              "roll_no": {"value": "21A91A0501", "confidence": 0.95, "box": [0, 0, 1, 1]}}
+    monkeypatch.setattr(main, "decode_for_ocr", lambda image_bytes: (None, 0, {}))
+    monkeypatch.setattr(main, "ocr_template_image", lambda img, key: (fields, {}))
+    monkeypatch.setattr(main, "ocr_preprocessed", lambda img: ("", None, {}))
+    seen = {}
+
+    async def rest_of_pipeline(image_bytes, ocr_text, quality, known=None):
+        seen["known"] = known
+        return {"method": "rules+mistral", "parsed": {"Full Name": known["Full Name"]["value"]}}
+
+    monkeypatch.setattr(main, "_classify_ocr_text", rest_of_pipeline)
+    main.result_cache.clear()
+    result = asyncio.run(main.classify_certificate(b"not decoded here", template_key="T1"))
+    assert set(seen["known"]) == {"Full Name"}
+    assert result["template"] == "T1"
+    assert result["parsed"]["Full Name"] == "Asha Rao"